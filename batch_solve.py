@@ -0,0 +1,235 @@
+import argparse
+import csv
+import glob
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import highspy
+
+from solver_backend import solve_solver_v2
+from template_parser import _parse_template
+from views.results_page import (
+    OUTPUT_DOWNLOAD_NAME,
+    _build_output_workbook,
+    _export_inputs,
+    _export_tables,
+    _get_output_template_path,
+)
+
+
+# Solves many event workbooks (filled-in input templates) from the command line, e.g. a season's events overnight.
+# Each workbook is parsed and solved the way the app does it (method "auto" picks the strategy from the model size)
+# in a pool of worker processes, and its Model_Output workbook is written to the output directory. Every finished
+# workbook is appended to summary.csv there at once, so an interrupted run loses only the solves in flight: running
+# the same command again skips workbooks already solved (same path and content) and retries the failed ones.
+# Run from the repository root:
+#
+#   python batch_solve.py EVENTS [EVENTS ...] [--output batch_output] [--time-limit SECONDS] [--workers N]
+#                         [--threads N] [--method auto|mip|decomposition|profiles|heuristic]
+#
+# EVENTS may be workbooks, directories (every .xlsx in them) or glob patterns ("events/2026-*.xlsx").
+
+_SUMMARY_NAME = "summary.csv"
+
+_SUMMARY_FIELDS = (
+    "workbook",
+    "sha256",
+    "status",
+    "method",
+    "participants",
+    "tables",
+    "rounds",
+    "objective",
+    "gap",
+    "seconds",
+    "output",
+    "error",
+)
+
+# Solve methods offered on the command line; portfolio is left out because it runs its own process pool.
+_BATCH_METHODS = ("auto", "mip", "decomposition", "profiles", "heuristic")
+
+
+# Workbooks named by the command-line arguments, in a stable order and without duplicates. Excel's lock files
+# (~$name.xlsx) are skipped.
+def _find_workbooks(patterns: list[str]) -> list[Path]:
+    found = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.glob("*.xlsx"))
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+        found.extend(match for match in matches if match.suffix.lower() == ".xlsx" and not match.name.startswith("~$"))
+    return list(dict.fromkeys(match.resolve() for match in found))
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+# Rows of an existing summary, keyed by (workbook, sha256); later rows for the same workbook replace earlier ones.
+def _read_summary(summary_path: Path) -> dict[tuple[str, str], dict]:
+    if not summary_path.exists():
+        return {}
+    with open(summary_path, newline="", encoding="utf-8") as handle:
+        return {(row["workbook"], row["sha256"]): row for row in csv.DictReader(handle)}
+
+
+def _append_summary(summary_path: Path, row: dict) -> None:
+    new_file = not summary_path.exists()
+    with open(summary_path, "a", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=_SUMMARY_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+# Output workbook path for an input workbook; the input's parent directory name is kept in the file name so events
+# with the same file name in different directories do not overwrite each other.
+def _output_path(output_dir: Path, workbook: Path) -> Path:
+    return output_dir / f"{workbook.parent.name}_{workbook.stem}_{OUTPUT_DOWNLOAD_NAME}"
+
+
+# Runs once in every worker process. HiGHS sizes its task scheduler once per process, from the threads option of
+# the first model it runs, so a trivial model run here caps every solve of the process at threads.
+def _init_worker(threads: int) -> None:
+    model = highspy.Highs()
+    model.setOptionValue("output_flag", False)
+    model.setOptionValue("threads", int(threads))
+    model.addVar(0.0, 1.0)
+    model.run()
+
+
+# Parses, solves and writes one workbook in a worker process and returns its summary row.
+def _solve_workbook(workbook: Path, sha256: str, output: Path, method: str, time_limit_seconds: float) -> dict:
+    started = time.monotonic()
+    row = dict.fromkeys(_SUMMARY_FIELDS, "")
+    row.update(workbook=str(workbook), sha256=sha256, method=method)
+    try:
+        parsed = _parse_template(workbook)
+        event_setup = parsed["event_setup"]
+        row.update(
+            participants=len(parsed["participants_df"]),
+            tables=event_setup["number_of_tables"],
+            rounds=event_setup["number_of_rounds"],
+        )
+        stats = {}
+        participant_results, schedule_results, objective, gap = solve_solver_v2(
+            df=parsed["participants_df"],
+            time_limit_seconds=time_limit_seconds,
+            characteristics=parsed["characteristics"],
+            num_tables=event_setup["number_of_tables"],
+            num_rounds=event_setup["number_of_rounds"],
+            min_people_per_table=event_setup["min_people_per_table"],
+            max_people_per_table=event_setup["max_people_per_table"],
+            trait_targets=parsed["trait_targets"],
+            trait_max_allowed=parsed["trait_max_allowed"],
+            trait_min_required=parsed["trait_min_required"],
+            locked_tables=parsed["locks"],
+            separation_pairs=parsed["participant_locks"],
+            method=method,
+            stats=stats,
+        )
+        inputs = _export_inputs(
+            participant_results,
+            schedule_results,
+            event_setup,
+            parsed["characteristics"],
+            parsed["trait_targets"],
+            parsed["trait_max_allowed"],
+            parsed["trait_min_required"],
+        )
+        pending = output.with_name(f".{output.name}.partial")
+        pending.write_bytes(_build_output_workbook(_export_tables(inputs), inputs))
+        os.replace(pending, output)
+    except Exception as exc:
+        row.update(status="failed", error=f"{type(exc).__name__}: {exc}", seconds=round(time.monotonic() - started, 2))
+        return row
+    row.update(
+        status="solved",
+        method=stats["method"],
+        objective=objective,
+        gap="" if gap is None else gap,
+        seconds=round(time.monotonic() - started, 2),
+        output=str(output),
+    )
+    return row
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Solve many event workbooks and write their output workbooks.")
+    parser.add_argument("events", nargs="+", help="workbooks, directories of workbooks or glob patterns")
+    parser.add_argument("--output", type=Path, default=Path("batch_output"))
+    parser.add_argument("--time-limit", type=float, default=600.0, help="solver time limit per workbook (seconds)")
+    parser.add_argument("--workers", type=int, default=None, help="parallel solves (default: CPUs / threads)")
+    parser.add_argument("--threads", type=int, default=1, help="HiGHS threads per solve")
+    parser.add_argument("--method", choices=_BATCH_METHODS, default="auto")
+    args = parser.parse_args(argv)
+
+    if args.threads < 1:
+        parser.error("--threads must be at least 1")
+    if _get_output_template_path() is None:
+        parser.error("the packaged output template is missing from the repo")
+    workbooks = _find_workbooks(args.events)
+    if not workbooks:
+        parser.error("no .xlsx workbooks matched")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    summary_path = args.output / _SUMMARY_NAME
+    finished = _read_summary(summary_path)
+    jobs = []
+    for workbook in workbooks:
+        sha256 = _file_sha256(workbook)
+        output = _output_path(args.output, workbook)
+        previous = finished.get((str(workbook), sha256))
+        if previous is not None and previous["status"] == "solved" and output.exists():
+            continue
+        jobs.append((workbook, sha256, output))
+    print(f"{len(workbooks)} workbooks, {len(workbooks) - len(jobs)} already solved, {len(jobs)} to solve")
+    if not jobs:
+        return
+
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    # Spawned workers import NumPy afresh, so the BLAS thread caps set here apply to them as well.
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(args.threads)
+    context = multiprocessing.get_context("spawn")
+    solved = failed = 0
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)), mp_context=context, initializer=_init_worker, initargs=(args.threads,)
+    ) as pool:
+        futures = [
+            pool.submit(_solve_workbook, workbook, sha256, output, args.method, args.time_limit)
+            for workbook, sha256, output in jobs
+        ]
+        try:
+            for future in as_completed(futures):
+                row = future.result()
+                _append_summary(summary_path, row)
+                if row["status"] == "solved":
+                    solved += 1
+                    gap = "-" if row["gap"] == "" else f"{float(row['gap']):.1%}"
+                    print(
+                        f"solved  {Path(row['workbook']).name:<40}{row['method']:<14}"
+                        f"objective {float(row['objective']):>12,.1f}  gap {gap:>7}{row['seconds']:>9.1f}s"
+                    )
+                else:
+                    failed += 1
+                    print(f"failed  {Path(row['workbook']).name:<40}{row['error']}")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print(f"Interrupted; run the same command again to resume. Summary: {summary_path}")
+            raise SystemExit(130) from None
+
+    print(f"{solved} solved, {failed} failed. Summary: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import highspy
+import numpy as np
+
+from benchmarks.synthetic import synthetic_event
+from solver_backend import (
+    _FORMULATIONS,
+    _assignment_from_solution,
+    _build_model,
+    _prepare_parameters,
+    _relative_gap,
+    _schedule_objective,
+    _solve_with_pair_cuts,
+)
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module; peak RSS is then left out of the report.
+    resource = None
+
+
+# Measures how the solver scales with participants, tables, rounds and trait cardinality on synthetic events
+# (see benchmarks.synthetic). Every case runs in a fresh process so its peak RSS is its own, and times
+# _prepare_parameters, _build_model and model.run separately. The report is written as JSON (with the commit and
+# environment it ran on) and CSV, one row per case and formulation, in a stable order so reports from two commits
+# can be diffed directly. Run from the repository root:
+#
+#   python -m benchmarks.scaling [--grid quick|default] [--formulation full compact] [--time-limit SECONDS]
+#                                [--output benchmarks/results/scaling]
+
+_REPORT_FIELDS = (
+    "case",
+    "formulation",
+    "num_people",
+    "num_tables",
+    "num_rounds",
+    "trait_cardinality",
+    "num_traits",
+    "num_locks",
+    "num_separations",
+    "prepare_seconds",
+    "build_seconds",
+    "solve_seconds",
+    "rows",
+    "cols",
+    "nonzeros",
+    "status",
+    "objective",
+    "dual_bound",
+    "gap",
+    "mip_nodes",
+    "peak_rss_mb",
+)
+
+
+def _case(num_people: int, num_tables: int, num_rounds: int, trait_cardinality: tuple[int, ...], **extra) -> dict:
+    name = f"n{num_people}_t{num_tables}_r{num_rounds}_k{'x'.join(map(str, trait_cardinality))}"
+    if extra.get("num_locks") or extra.get("num_separations"):
+        name += f"_l{extra.get('num_locks', 0)}_s{extra.get('num_separations', 0)}"
+    return {
+        "case": name,
+        "num_people": num_people,
+        "num_tables": num_tables,
+        "num_rounds": num_rounds,
+        "trait_cardinality": trait_cardinality,
+        "num_locks": extra.get("num_locks", 0),
+        "num_separations": extra.get("num_separations", 0),
+    }
+
+
+# Size grids: "quick" is a smoke test, "default" spans participants (with tables at about six per table), rounds
+# and trait cardinality, plus locked and separated variants of the sample-sized event.
+_GRIDS = {
+    "quick": [
+        _case(12, 3, 2, (2, 2)),
+        _case(24, 4, 3, (3, 2, 2), num_locks=1, num_separations=1),
+    ],
+    "default": [
+        _case(num_people, num_people // 6, num_rounds, trait_cardinality)
+        for num_people in (12, 24, 36, 60)
+        for num_rounds in (2, 3, 4)
+        for trait_cardinality in ((2, 2), (3, 2, 2), (5, 3, 3, 2))
+    ]
+    + [
+        _case(30, 6, 3, (3, 2, 2), num_locks=6),
+        _case(30, 6, 3, (3, 2, 2), num_separations=3),
+        _case(30, 6, 3, (3, 2, 2), num_locks=3, num_separations=3),
+    ],
+}
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Runs one case in the current (fresh) process and returns its report row.
+def _run_case(case: dict, formulation: str, time_limit_seconds: float, seed: int) -> dict:
+    inputs = synthetic_event(
+        case["num_people"],
+        case["num_tables"],
+        case["num_rounds"],
+        trait_cardinality=case["trait_cardinality"],
+        num_locks=case["num_locks"],
+        num_separations=case["num_separations"],
+        seed=seed,
+    )
+
+    started = time.perf_counter()
+    params = _prepare_parameters(**inputs)
+    prepared = time.perf_counter()
+    model, columns = _build_model(params, formulation=formulation)
+    built = time.perf_counter()
+    model.setOptionValue("random_seed", seed)
+    model.setOptionValue("time_limit", float(time_limit_seconds))
+    objective = bound = gap = None
+    # The compact model is only complete together with its repeat-meeting cuts, so it is solved the way
+    # solve_solver_v2 solves it; model sizes are then those of the final cut round.
+    if formulation == "compact":
+        try:
+            _, objective, bound = _solve_with_pair_cuts(model, columns, params, time_limit_seconds=time_limit_seconds)
+            gap = _relative_gap(objective, bound)
+        except RuntimeError:
+            pass
+    else:
+        model.run()
+    solved = time.perf_counter()
+
+    info = model.getInfo()
+    if formulation == "full" and info.primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible:
+        objective = _schedule_objective(params, _assignment_from_solution(model.getSolution().col_value, columns))
+        bound = float(info.mip_dual_bound)
+        gap = _relative_gap(objective, bound)
+    return {
+        **case,
+        "formulation": formulation,
+        "trait_cardinality": "x".join(map(str, case["trait_cardinality"])),
+        "num_traits": len(params["trait_keys"]),
+        "prepare_seconds": round(prepared - started, 4),
+        "build_seconds": round(built - prepared, 4),
+        "solve_seconds": round(solved - built, 4),
+        "rows": model.getNumRow(),
+        "cols": model.getNumCol(),
+        "nonzeros": model.getNumNz(),
+        "status": str(model.getModelStatus()).rsplit(".", 1)[-1],
+        "objective": objective,
+        "dual_bound": bound,
+        "gap": gap,
+        "mip_nodes": int(info.mip_node_count),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _write_report(output: Path, metadata: dict, rows: list[dict]) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output.with_suffix(".json"), "w", encoding="utf-8") as handle:
+        json.dump({"metadata": metadata, "results": rows}, handle, indent=2)
+        handle.write("\n")
+    with open(output.with_suffix(".csv"), "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=_REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark solver scaling on synthetic events.")
+    parser.add_argument("--grid", choices=sorted(_GRIDS), default="default")
+    parser.add_argument("--formulation", nargs="+", choices=_FORMULATIONS, default=["full"])
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results/scaling"))
+    args = parser.parse_args(argv)
+
+    metadata = {
+        "commit": _git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "highs": highspy.Highs().version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "grid": args.grid,
+        "time_limit_seconds": args.time_limit,
+        "seed": args.seed,
+    }
+
+    runs = [(case, formulation) for case in _GRIDS[args.grid] for formulation in args.formulation]
+    rows = []
+    # One case at a time, each in a new process, so timings do not compete and peak RSS is per case.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = [
+            pool.submit(_run_case, case, formulation, args.time_limit, args.seed) for case, formulation in runs
+        ]
+        for future in futures:
+            row = future.result()
+            rows.append(row)
+            print(
+                f"{row['case']:<28}{row['formulation']:<9}{row['cols']:>9} cols{row['rows']:>10} rows"
+                f"{row['build_seconds']:>8.2f}s build{row['solve_seconds']:>8.1f}s solve  {row['status']}"
+            )
+
+    _write_report(args.output, metadata, rows)
+    print(f"Wrote {args.output.with_suffix('.json')} and {args.output.with_suffix('.csv')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import itertools
+import time
+from pathlib import Path
+
+import highspy
+import numpy as np
+
+from benchmarks.synthetic import synthetic_event
+from solver_backend import (
+    _FORMULATIONS,
+    _SYMMETRY_BREAKING,
+    _assignment_from_solution,
+    _build_model,
+    _prepare_parameters,
+    _schedule_objective,
+)
+from template_parser import TEMPLATE_PATH, _parse_template
+
+
+# Compares the node count, solve time and bound of the whole-event model with every combination of the optional
+# symmetry-breaking pieces of _build_model. Every run is cold (no warm start) and single-threaded so the
+# numbers only reflect the model. The sample template locks a participant to every table, so only the
+# "rounds" piece applies to it; the synthetic unlocked events exercise the table pieces. Run from the repository root:
+#
+#   python -m benchmarks.symmetry_breaking [--workbook PATH] [--time-limit SECONDS] [--repeats N]
+
+
+# Solve inputs for the workbook at path, in the form _prepare_parameters expects.
+def _workbook_inputs(path: Path) -> dict:
+    parsed = _parse_template(path)
+    event_setup = parsed["event_setup"]
+    return {
+        "df": parsed["participants_df"],
+        "characteristics": parsed["characteristics"],
+        "num_tables": event_setup["number_of_tables"],
+        "num_rounds": event_setup["number_of_rounds"],
+        "min_people_per_table": event_setup["min_people_per_table"],
+        "max_people_per_table": event_setup["max_people_per_table"],
+        "trait_targets": parsed["trait_targets"],
+        "trait_max_allowed": parsed["trait_max_allowed"],
+        "trait_min_required": parsed["trait_min_required"],
+        "locked_tables": parsed["locks"],
+        "separation_pairs": parsed["participant_locks"],
+    }
+
+
+def _run(
+    inputs: dict,
+    symmetry_breaking: tuple[str, ...],
+    *,
+    formulation: str,
+    detect_symmetry: bool,
+    time_limit_seconds: float,
+    seed: int,
+) -> dict:
+    params = _prepare_parameters(**inputs)
+    model, columns = _build_model(params, formulation=formulation, symmetry_breaking=symmetry_breaking)
+    model.setOptionValue("threads", 1)
+    model.setOptionValue("random_seed", seed)
+    model.setOptionValue("mip_detect_symmetry", detect_symmetry)
+    model.setOptionValue("time_limit", float(time_limit_seconds))
+    started = time.perf_counter()
+    model.run()
+    elapsed = time.perf_counter() - started
+    info = model.getInfo()
+    objective = float("nan")
+    if info.primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible:
+        objective = _schedule_objective(params, _assignment_from_solution(model.getSolution().col_value, columns))
+    return {
+        "status": str(model.getModelStatus()).rsplit(".", 1)[-1],
+        "seconds": elapsed,
+        "nodes": int(info.mip_node_count),
+        "objective": objective,
+        "bound": float(info.mip_dual_bound),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the symmetry-breaking options of the full model.")
+    parser.add_argument("--workbook", type=Path, default=TEMPLATE_PATH)
+    parser.add_argument("--formulation", choices=_FORMULATIONS, default="full")
+    parser.add_argument("--time-limit", type=float, default=120.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    instances = {
+        "sample template": _workbook_inputs(args.workbook),
+        "unlocked, 9 people, 3 tables, 2 rounds": synthetic_event(
+            9, 3, 2, trait_cardinality=(2, 3), min_people_per_table=3, max_people_per_table=3
+        ),
+        "unlocked, 12 people, 4 tables, 2 rounds": synthetic_event(
+            12, 4, 2, trait_cardinality=(2, 3), min_people_per_table=3, max_people_per_table=3
+        ),
+    }
+    # The first row is a reference: the plain model with HiGHS' own symmetry detection switched off.
+    variants = [((), False)] + [
+        (combo, True)
+        for k in range(len(_SYMMETRY_BREAKING) + 1)
+        for combo in itertools.combinations(_SYMMETRY_BREAKING, k)
+    ]
+    for name, inputs in instances.items():
+        print(f"\n=== {name} ({args.formulation}, {args.repeats} seeds, {args.time_limit:.0f}s limit) ===")
+        print(f"{'symmetry breaking':<34}{'solved':>8}{'nodes':>10}{'seconds':>10}{'objective':>11}{'bound':>10}")
+        for combo, detect_symmetry in variants:
+            runs = [
+                _run(
+                    inputs,
+                    combo,
+                    formulation=args.formulation,
+                    detect_symmetry=detect_symmetry,
+                    time_limit_seconds=args.time_limit,
+                    seed=seed,
+                )
+                for seed in range(args.repeats)
+            ]
+            label = ", ".join(combo) or "none"
+            if not detect_symmetry:
+                label += " (no HiGHS symmetry)"
+            solved = sum(run["status"] == "kOptimal" for run in runs)
+            print(
+                f"{label:<34}{solved:>6}/{len(runs)}"
+                f"{np.median([run['nodes'] for run in runs]):>10.0f}"
+                f"{np.median([run['seconds'] for run in runs]):>10.1f}"
+                f"{np.nanmin([run['objective'] for run in runs]):>11.1f}"
+                f"{max(run['bound'] for run in runs):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+# Reproducible synthetic events for benchmarking the solver. synthetic_event returns the problem keyword arguments of
+# solve_solver_v2 (the same keys _prepare_parameters takes), with a roster shaped like _transform_participants output:
+# Participant_ID and Name followed by one text column per characteristic. The same arguments always give the same
+# event, so reports from different commits compare like with like.
+
+
+# Builds an event of num_people participants over num_tables tables and num_rounds rounds.
+# trait_cardinality gives the number of traits of each characteristic (one characteristic per entry); traits are
+# drawn with skewed frequencies so some are rare, as in real rosters. Each trait's target is its expected count per
+# table. Table sizes default to one either side of the even split. num_locks participants are locked to distinct
+# tables (1-based, as the template gives them) and num_separations disjoint pairs of the others are kept apart.
+def synthetic_event(
+    num_people: int,
+    num_tables: int,
+    num_rounds: int,
+    *,
+    trait_cardinality: tuple[int, ...] = (3, 2, 2),
+    num_locks: int = 0,
+    num_separations: int = 0,
+    min_people_per_table: int | None = None,
+    max_people_per_table: int | None = None,
+    seed: int = 0,
+) -> dict:
+    if num_locks > num_tables:
+        raise ValueError("Each locked participant needs a table of their own.")
+    if num_locks + 2 * num_separations > num_people:
+        raise ValueError("Not enough participants for the requested locks and separation pairs.")
+    rng = np.random.default_rng(seed)
+
+    ids = [f"P{i + 1:04d}" for i in range(num_people)]
+    roster = {"Participant_ID": ids, "Name": [f"Participant {i + 1}" for i in range(num_people)]}
+    trait_targets = {}
+    for c, cardinality in enumerate(trait_cardinality):
+        characteristic = f"Characteristic {c + 1}"
+        traits = [f"{characteristic} Trait {k + 1}" for k in range(cardinality)]
+        shares = rng.dirichlet(np.full(cardinality, 2.0))
+        values = rng.choice(traits, size=num_people, p=shares)
+        roster[characteristic] = values
+        for trait in traits:
+            trait_targets[(characteristic, trait)] = float(max(1, round((values == trait).sum() / num_tables)))
+
+    if min_people_per_table is None:
+        min_people_per_table = max(1, num_people // num_tables - 1)
+    if max_people_per_table is None:
+        max_people_per_table = -(-num_people // num_tables) + 1
+
+    shuffled = [ids[i] for i in rng.permutation(num_people)]
+    locked_tables = {participant_id: table + 1 for table, participant_id in enumerate(shuffled[:num_locks])}
+    separated = shuffled[num_locks : num_locks + 2 * num_separations]
+    separation_pairs = list(zip(separated[0::2], separated[1::2]))
+
+    return {
+        "df": pd.DataFrame(roster),
+        "characteristics": [f"Characteristic {c + 1}" for c in range(len(trait_cardinality))],
+        "num_tables": num_tables,
+        "num_rounds": num_rounds,
+        "min_people_per_table": min_people_per_table,
+        "max_people_per_table": max_people_per_table,
+        "trait_targets": trait_targets,
+        "locked_tables": locked_tables,
+        "separation_pairs": separation_pairs,
+    }
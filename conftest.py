@@ -0,0 +1,2 @@
+# Puts the repository root on sys.path so the tests import the app modules (solver_backend, template_parser, ...) the
+# same way the app and scripts do.
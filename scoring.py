@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+# Table-level scores of a finished schedule, computed from an integer-coded assignment (person x round -> 0-based
+# table, -1 for not seated) in single bincount passes rather than by filtering the schedule per round and table.
+# Arrays are indexed [round, table] or [round, table, trait], with traits in the column order of the solver's
+# participants x trait-values incidence matrix B (see solver_backend._prepare_parameters). The results page, its
+# exports and the solver's own schedule checks all score schedules through these functions.
+
+
+# Assignment matrix of a schedule table with Round, Table (both 1-based) and Person_Index columns, as
+# solver_backend._result_frames returns it. Rows without a round or table are left out.
+def schedule_assignment(schedule_results: pd.DataFrame, num_people: int) -> np.ndarray:
+    if schedule_results.empty:
+        return np.full((num_people, 0), -1, dtype=np.int64)
+    seated = schedule_results.dropna(subset=["Round", "Table", "Person_Index"])
+    rounds = seated["Round"].to_numpy(dtype=np.int64) - 1
+    tables = seated["Table"].to_numpy(dtype=np.int64) - 1
+    people = seated["Person_Index"].to_numpy(dtype=np.int64)
+    assignment = np.full((num_people, int(rounds.max(initial=-1)) + 1), -1, dtype=np.int64)
+    assignment[people, rounds] = tables
+    return assignment
+
+
+# Number of people seated at every table of every round.
+def table_sizes(assignment: np.ndarray, num_tables: int) -> np.ndarray:
+    num_r = assignment.shape[1]
+    person, round_idx = np.nonzero(assignment >= 0)
+    codes = round_idx * num_tables + assignment[person, round_idx]
+    return np.bincount(codes, minlength=num_r * num_tables).reshape(num_r, num_tables)
+
+
+# Incidence-weighted trait counts at every table of every round: counts[r, t, c] is the sum of incidence[i, c] over
+# the people i seated at table t in round r.
+def table_trait_counts(incidence: np.ndarray, assignment: np.ndarray, num_tables: int) -> np.ndarray:
+    num_r = assignment.shape[1]
+    num_c = incidence.shape[1]
+    holder, trait = np.nonzero(incidence)
+    tables = assignment[holder]
+    seated = tables >= 0
+    round_idx = np.broadcast_to(np.arange(num_r), tables.shape)[seated]
+    trait_idx = np.broadcast_to(trait[:, None], tables.shape)[seated]
+    weights = np.broadcast_to(incidence[holder, trait][:, None], tables.shape)[seated]
+    codes = (round_idx * num_tables + tables[seated]) * num_c + trait_idx
+    counts = np.bincount(codes, weights=weights, minlength=num_r * num_tables * num_c)
+    return counts.reshape(num_r, num_tables, num_c)
+
+
+# Diversity score of every table: the number of traits present at it, counting only traits whose column is set in
+# in_scope (e.g. the traits of the characteristics shown on the results page).
+def diversity_scores(trait_counts: np.ndarray, in_scope: np.ndarray) -> np.ndarray:
+    return ((trait_counts > 0) & in_scope).sum(axis=2)
+
+
+# Spread of the per-round balance: every occupied table's diversity score is normalized by the number of
+# characteristics and by its size, the normalized scores are averaged per round, and the population standard
+# deviation of those averages is returned (0 for fewer than two rounds with seated people).
+def balance_std_dev(diversity: np.ndarray, sizes: np.ndarray, num_characteristics: int) -> float:
+    occupied = sizes > 0
+    normalized = diversity / max(1, num_characteristics) / np.maximum(sizes, 1)
+    rounds = occupied.any(axis=1)
+    if rounds.sum() < 2:
+        return 0.0
+    averages = (normalized * occupied).sum(axis=1)[rounds] / occupied.sum(axis=1)[rounds]
+    return max(0.0, float(np.sqrt(((averages - averages.mean()) ** 2).mean())))
+
+
+# Distance of every count from its [lower, upper] range (0 inside it). lower and upper hold one bound per trait
+# column, NaN where the trait has none.
+def bound_deviations(trait_counts: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    below = np.where(np.isnan(lower), 0.0, np.maximum(lower - trait_counts, 0.0))
+    above = np.where(np.isnan(upper), 0.0, np.maximum(trait_counts - upper, 0.0))
+    return below + above
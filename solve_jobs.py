@@ -0,0 +1,150 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from solver_backend import solve_solver_v2
+
+
+# Background solves for the Streamlit app. Each solve runs on a worker thread (HiGHS releases the GIL while it
+# searches) and is keyed by the browser session that started it and a hash of the uploaded workbook (see solve_key),
+# so Streamlit reruns and browser refreshes reconnect to the same run instead of starting over, while two sessions
+# uploading the same file get runs of their own. Pages poll SolveJob.snapshot() for the latest incumbent and may call
+# SolveJob.stop() to end the run early and keep the best schedule found so far. Running jobs are kept until they
+# finish; finished and failed jobs are dropped after _JOBS_FINISHED_TTL_SECONDS and, beyond
+# _JOBS_MAX_FINISHED of them, by least recent use.
+_JOBS: OrderedDict[str, "SolveJob"] = OrderedDict()
+_JOBS_LOCK = threading.Lock()
+_JOBS_MAX_FINISHED = 16
+_JOBS_FINISHED_TTL_SECONDS = 3600.0
+
+
+# Content hash of an uploaded workbook.
+def workbook_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# Job key for the solve of the workbook with hash workbook_hash started by the browser session session_id.
+def solve_key(session_id: str, workbook_hash: str) -> str:
+    return f"{session_id}:{workbook_hash}"
+
+
+class SolveJob:
+    def __init__(self, key: str, solve_kwargs: dict) -> None:
+        self.key = key
+        self._solve_kwargs = solve_kwargs
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._started = time.monotonic()
+        self._status = "running"
+        self._incumbent = None
+        self._history = []
+        self._result = None
+        self._stats = {}
+        self._error = None
+        self._finished = None
+        self._thread = threading.Thread(target=self._run, name=f"solve-{key[:12]}", daemon=True)
+
+    def _run(self) -> None:
+        try:
+            result = solve_solver_v2(
+                on_incumbent=self._record, stop_event=self._stop_event, stats=self._stats, **self._solve_kwargs
+            )
+        except Exception as exc:
+            with self._lock:
+                self._status = "failed"
+                self._error = str(exc)
+                self._finished = time.monotonic()
+            return
+        with self._lock:
+            self._result = result
+            self._status = "done"
+            self._finished = time.monotonic()
+
+    # Called on the worker thread by solve_solver_v2 for every improving schedule.
+    def _record(self, incumbent: dict) -> None:
+        with self._lock:
+            self._incumbent = incumbent
+            self._history.append(
+                {
+                    "elapsed_seconds": incumbent["elapsed_seconds"],
+                    "objective": incumbent["objective"],
+                    "gap": incumbent["gap"],
+                }
+            )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    # Monotonic time the job finished or failed, None while it is running.
+    def finished_at(self) -> float | None:
+        with self._lock:
+            return self._finished
+
+    # Asks the solver to stop; the job then finishes with the best schedule found so far.
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    # Thread-safe view of the job: status ("running", "done" or "failed"), whether a stop was requested,
+    # elapsed time, the latest incumbent (objective, gap, result frames), the incumbent history,
+    # the final solve_solver_v2 result and its solver stats (timings, model size, bound history) once done
+    # and the error message if it failed.
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": self._status,
+                "stopping": self._stop_event.is_set() and self._status == "running",
+                "elapsed_seconds": time.monotonic() - self._started,
+                "incumbent": self._incumbent,
+                "history": list(self._history),
+                "result": self._result,
+                "stats": self._stats if self._status == "done" else None,
+                "error": self._error,
+            }
+
+
+# Returns the job for key (see solve_key), starting a solve with solve_kwargs (passed to solve_solver_v2) unless one
+# is already running or finished under the same key. A failed job is replaced by a new one.
+def start_solve(key: str, **solve_kwargs) -> SolveJob:
+    with _JOBS_LOCK:
+        _evict_finished_jobs()
+        job = _JOBS.get(key)
+        if job is not None and job.snapshot()["status"] != "failed":
+            _JOBS.move_to_end(key)
+            return job
+        job = SolveJob(key, solve_kwargs)
+        _JOBS[key] = job
+        job.start()
+        return job
+
+
+def get_solve(key: str) -> SolveJob | None:
+    with _JOBS_LOCK:
+        _evict_finished_jobs()
+        job = _JOBS.get(key)
+        if job is not None:
+            _JOBS.move_to_end(key)
+        return job
+
+
+# Drops finished and failed jobs older than the TTL, then the least recently used ones beyond _JOBS_MAX_FINISHED.
+# Callers hold _JOBS_LOCK.
+def _evict_finished_jobs() -> None:
+    now = time.monotonic()
+    finished = []
+    for key, job in _JOBS.items():
+        finished_at = job.finished_at()
+        if finished_at is not None:
+            finished.append((key, finished_at))
+    expired = [key for key, finished_at in finished if now - finished_at > _JOBS_FINISHED_TTL_SECONDS]
+    kept = [key for key, finished_at in finished if now - finished_at <= _JOBS_FINISHED_TTL_SECONDS]
+    for key in expired + kept[: max(0, len(kept) - _JOBS_MAX_FINISHED)]:
+        del _JOBS[key]
+
+
+# Forgets the job for key (stopping it if it is still running), so the next start_solve runs afresh.
+def discard_solve(key: str) -> None:
+    with _JOBS_LOCK:
+        job = _JOBS.pop(key, None)
+    if job is not None:
+        job.stop()
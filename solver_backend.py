@@ -1,6 +1,20 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Callable, Mapping
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait
+from pathlib import Path
+
 import highspy # Imports HiGHS 
 import numpy as np 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import scoring
 
 # Helper functions for data extraction, cleaning, and model preparation. 
 # These functions handle the transformation of raw input data into the structured format required by the optimization model, 
@@ -47,6 +61,45 @@ def _normalize_trait_dict(raw: dict | None) -> dict[tuple[str, str], float]:
     return out
 
 
+# Read-only dict-of-tuples view that is built from the parameter arrays the first time it is read,
+# so legacy callers of params["b"], params["v"], ... keep working without the solver paying for the dicts.
+class _LazyDictView(Mapping):
+    def __init__(self, build) -> None:
+        self._build = build
+        self._data = None
+
+    def _materialize(self) -> dict:
+        if self._data is None:
+            self._data = self._build()
+            self._build = None
+        return self._data
+
+    def __getitem__(self, key):
+        return self._materialize()[key]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+
+def _per_table_view(trait_keys: list[tuple[str, str]], values: np.ndarray, T: range) -> _LazyDictView:
+    return _LazyDictView(lambda: {
+        (k, a, t): float(values[c]) for c, (k, a) in enumerate(trait_keys) for t in T
+    })
+
+
+# Hard-bound view keyed (k, a, t); unset bounds are left out, as in the original dicts.
+def _bound_view(trait_keys: list[tuple[str, str]], values: np.ndarray, T: range) -> _LazyDictView:
+    return _LazyDictView(lambda: {
+        (k, a, t): float(values[c, t])
+        for c, (k, a) in enumerate(trait_keys)
+        for t in T
+        if np.isfinite(values[c, t])
+    })
+
+
 def _prepare_parameters(
     df: pd.DataFrame,
     *,
@@ -125,78 +178,49 @@ def _prepare_parameters(
     w1_bar_default = float(w1_value if w1_bar_value is None else w1_bar_value)
     w2_bar_default = float(w2_value if w2_bar_value is None else w2_bar_value)
 
-    b = {}
-    for i in I:
-        for k in K:
-            for a in Ak[k]:
-                b[i, k, a] = 0
+    trait_keys = [(k, a) for k in K for a in Ak[k]]
+    num_traits = len(trait_keys)
+    trait_position = {key: c for c, key in enumerate(trait_keys)}
+    trait_characteristic = np.array([K.index(k) for k, _ in trait_keys], dtype=np.int64)
 
-    for idx, row in work_df.iterrows():
-        i = idx
-        for k in K:
-            if k in work_df.columns and pd.notna(row[k]):
-                val = str(row[k]).strip()
-                if val in Ak[k]:
-                    b[i, k, val] = 1
-
-    v = {}
+    # Participants x trait-values incidence matrix: B[i, c] = 1 when participant i holds trait_keys[c].
+    # Each characteristic is coded against its Ak[k] categories, so blank and unknown values get code -1.
+    B = np.zeros((len(work_df), num_traits), dtype=np.float64)
+    offset = 0
     for k in K:
-        for a in Ak[k]:
-            target_value = float(trait_targets_map.get((k, a), v_target))
-            for t in T:
-                v[k, a, t] = target_value
-
-    v_bar_dict = None
-    if v_bar is not None:
-        v_bar_dict = {}
-        for k in K:
-            for a in Ak[k]:
-                for t in T:
-                    key = (k, a, t)
-                    if key not in v_bar:
-                        raise ValueError(f"Missing hard upper bound for {key}")
-                    v_bar_dict[key] = float(v_bar[key])
-
-    if trait_max_map:
-        if v_bar_dict is None:
-            v_bar_dict = {}
-        for (k, a), max_allowed in trait_max_map.items():
-            if k not in Ak or a not in Ak[k]:
-                continue
-            for t in T:
-                v_bar_dict[k, a, t] = float(max_allowed)
-
-    v_under_dict = None
-    if v_under is not None:
-        v_under_dict = {}
-        for k in K:
-            for a in Ak[k]:
+        column = work_df[k]
+        text = column.astype(str).str.strip().where(column.notna())
+        codes = pd.Categorical(text, categories=Ak[k]).codes
+        holders = np.flatnonzero(codes >= 0)
+        B[holders, offset + codes[holders]] = 1.0
+        offset += len(Ak[k])
+
+    # Per-trait settings. Targets and weights never vary across tables, so they are stored once per trait;
+    # hard bounds are traits x tables because callers may pass them per (k, a, t). Unset bounds are +/-inf.
+    v_arr = np.array([trait_targets_map.get(key, v_target) for key in trait_keys], dtype=np.float64)
+    w1_arr = np.full(num_traits, float(w1_value))
+    w2_arr = np.full(num_traits, float(w2_value))
+    w1_bar_arr = np.full(num_traits, w1_bar_default)
+    w2_bar_arr = np.full(num_traits, w2_bar_default)
+
+    def _bound_matrix(explicit: dict | None, per_trait: dict, fill: float, label: str) -> np.ndarray | None:
+        if explicit is None and not per_trait:
+            return None
+        matrix = np.full((num_traits, len(T)), fill, dtype=np.float64)
+        if explicit is not None:
+            for c, (k, a) in enumerate(trait_keys):
                 for t in T:
                     key = (k, a, t)
-                    if key not in v_under:
-                        raise ValueError(f"Missing hard lower bound for {key}")
-                    v_under_dict[key] = float(v_under[key])
-
-    if trait_min_map:
-        if v_under_dict is None:
-            v_under_dict = {}
-        for (k, a), min_required in trait_min_map.items():
-            if k not in Ak or a not in Ak[k]:
-                continue
-            for t in T:
-                v_under_dict[k, a, t] = float(min_required)
+                    if key not in explicit:
+                        raise ValueError(f"Missing hard {label} bound for {key}")
+                    matrix[c, t] = float(explicit[key])
+        for key, bound in per_trait.items():
+            if key in trait_position:
+                matrix[trait_position[key], :] = float(bound)
+        return matrix
 
-    w1_bar = {}
-    w2_bar = {}
-    w1 = {}
-    w2 = {}
-    for k in K:
-        for a in Ak[k]:
-            for t in T:
-                w1_bar[k, a, t] = w1_bar_default
-                w2_bar[k, a, t] = w2_bar_default
-                w1[k, a, t] = float(w1_value)
-                w2[k, a, t] = float(w2_value)
+    v_bar_arr = _bound_matrix(v_bar, trait_max_map, np.inf, "upper")
+    v_under_arr = _bound_matrix(v_under, trait_min_map, -np.inf, "lower")
 
     locked_indices = {}
     id_to_index = {
@@ -248,14 +272,27 @@ def _prepare_parameters(
         "l": l,
         "u": u,
         "lam": float(lam),
-        "b": b,
-        "v": v,
-        "v_bar": v_bar_dict,
-        "v_under": v_under_dict,
-        "w1_bar": w1_bar,
-        "w2_bar": w2_bar,
-        "w1": w1,
-        "w2": w2,
+        "trait_keys": trait_keys,
+        "trait_characteristic": trait_characteristic,
+        "B": B,
+        "v_arr": v_arr,
+        "v_bar_arr": v_bar_arr,
+        "v_under_arr": v_under_arr,
+        "w1_bar_arr": w1_bar_arr,
+        "w2_bar_arr": w2_bar_arr,
+        "w1_arr": w1_arr,
+        "w2_arr": w2_arr,
+        # Dict-of-tuples forms of the arrays above, only materialized if a caller reads them.
+        "b": _LazyDictView(lambda: {
+            (i, k, a): int(B[i, c]) for i in I for c, (k, a) in enumerate(trait_keys)
+        }),
+        "v": _per_table_view(trait_keys, v_arr, T),
+        "v_bar": None if v_bar_arr is None else _bound_view(trait_keys, v_bar_arr, T),
+        "v_under": None if v_under_arr is None else _bound_view(trait_keys, v_under_arr, T),
+        "w1_bar": _per_table_view(trait_keys, w1_bar_arr, T),
+        "w2_bar": _per_table_view(trait_keys, w2_bar_arr, T),
+        "w1": _per_table_view(trait_keys, w1_arr, T),
+        "w2": _per_table_view(trait_keys, w2_arr, T),
         "locked_indices": locked_indices,
         "separation_pairs_indices": separation_indices,
     }
@@ -283,8 +320,9 @@ def _add_row(model: highspy.Highs, lower: float, upper: float, indices: list[int
     val = np.array(values, dtype=np.float64)
     model.addRow(lower, upper, num_nz, idx, val)
 
-# Builds the optimization model using the HiGHS library. This function takes the prepared parameters and constructs the decision variables, objective function, and constraints according to the problem formulation.
-def _build_model(params: dict) -> tuple[highspy.Highs, dict, dict]:
+# Builds the optimization model one variable and one row at a time through _add_var/_add_row.
+# Kept as the reference formulation: _build_model must produce exactly the same model as this function.
+def _build_model_rowwise(params: dict) -> tuple[highspy.Highs, dict, dict]:
     K = params["K"]
     Ak = params["Ak"]
     I = params["I"]
@@ -575,107 +613,2751 @@ def _build_model(params: dict) -> tuple[highspy.Highs, dict, dict]:
     return model, Y, W
 
 
-def solve_solver_v2(
-    df: pd.DataFrame,
-    debug: bool = False,
-    time_limit_seconds: float | None = None,
-    v_target: float = 5.0,
-    lam: float = 100.0,
-    w1_value: float = 10.0,
-    w2_value: float = 20.0,
-    w1_bar_value: float | None = None,
-    w2_bar_value: float | None = None,
-    v_bar: dict | None = None,
-    v_under: dict | None = None,
-    characteristics: list[str] | None = None,
-    num_tables: int = 6,
-    num_rounds: int = 3,
-    min_people_per_table: int = 4,
-    max_people_per_table: int = 6,
-    trait_targets: dict | None = None,
-    trait_max_allowed: dict | None = None,
-    trait_min_required: dict | None = None,
-    locked_tables: dict | None = None,
-    separation_pairs: list | None = None,
-) -> tuple[pd.DataFrame, pd.DataFrame, float, float | None]:
-    params = _prepare_parameters(
-        df,
-        v_target=v_target,
-        lam=lam,
-        w1_value=w1_value,
-        w2_value=w2_value,
-        w1_bar_value=w1_bar_value,
-        w2_bar_value=w2_bar_value,
-        v_bar=v_bar,
-        v_under=v_under,
-        characteristics=characteristics,
-        num_tables=num_tables,
-        num_rounds=num_rounds,
-        min_people_per_table=min_people_per_table,
-        max_people_per_table=max_people_per_table,
-        trait_targets=trait_targets,
-        trait_max_allowed=trait_max_allowed,
-        trait_min_required=trait_min_required,
-        locked_tables=locked_tables,
-        separation_pairs=separation_pairs,
+# Pair-meeting formulations accepted by _build_model and solve_solver_v2. "compact" is for large events only (see
+# _solve_with_pair_cuts).
+_FORMULATIONS = ("full", "compact")
+
+# Solve methods accepted by solve_solver_v2: the HiGHS MIP, or the seating heuristic on its own.
+# "profiles" balances tables over trait profiles before seating individuals (see _build_profile_model).
+# "auto" picks one of mip, decomposition, profiles and heuristic from the model size (see preflight_estimate).
+_METHODS = ("mip", "heuristic", "decomposition", "portfolio", "profiles", "auto")
+
+# Optional symmetry-breaking pieces of _build_model (see _symmetric_tables and _reversible_rounds).
+_SYMMETRY_BREAKING = ("tables", "first_seats", "rounds")
+
+# Cost parameters of the E1_bar, E2_bar, E1 and E2 deviation columns, in that order.
+_DEVIATION_COSTS = ("w1_bar_arr", "w2_bar_arr", "w1_arr", "w2_arr")
+
+
+# Accumulates blocks of columns and rows as NumPy arrays so the whole model can be handed to HiGHS
+# in a single passModel call instead of one addVar/addRow call per variable or constraint.
+class _ColumnarModel:
+    def __init__(self) -> None:
+        self.num_col = 0
+        self.num_row = 0
+        self._col_lower: list[np.ndarray] = []
+        self._col_upper: list[np.ndarray] = []
+        self._col_cost: list[np.ndarray] = []
+        self._integrality: list[np.ndarray] = []
+        self._row_lower: list[np.ndarray] = []
+        self._row_upper: list[np.ndarray] = []
+        self._row_length: list[np.ndarray] = []
+        self._row_index: list[np.ndarray] = []
+        self._row_value: list[np.ndarray] = []
+        self.row_families: dict[str, dict[str, int]] = {}
+        self.offset = 0.0
+
+    # Adds a block of variables and returns their column indices laid out in the requested shape.
+    # lb, ub and cost may be scalars or arrays broadcastable to that shape.
+    def add_vars(
+        self,
+        shape: tuple[int, ...],
+        lb,
+        ub,
+        cost=0.0,
+        integrality: highspy.HighsVarType = highspy.HighsVarType.kContinuous,
+    ) -> np.ndarray:
+        count = int(np.prod(shape, dtype=np.int64))
+        columns = np.arange(self.num_col, self.num_col + count, dtype=np.int32).reshape(shape)
+        self._col_lower.append(np.broadcast_to(np.asarray(lb, dtype=np.float64), shape).ravel())
+        self._col_upper.append(np.broadcast_to(np.asarray(ub, dtype=np.float64), shape).ravel())
+        self._col_cost.append(np.broadcast_to(np.asarray(cost, dtype=np.float64), shape).ravel())
+        self._integrality.append(np.full(count, int(integrality), dtype=np.int32))
+        self.num_col += count
+        return columns
+
+    # Adds a block of rows that all have the same number of entries. indices has shape (rows, width);
+    # values, lower and upper are broadcast against it. family names the constraint family the rows belong to;
+    # row_families keeps the row and nonzero count of each.
+    def add_rows(self, lower, upper, indices, values, *, family: str) -> None:
+        indices = np.asarray(indices, dtype=np.int32)
+        if indices.ndim != 2:
+            raise ValueError("Row indices must be a 2-D array of shape (rows, width).")
+        num_rows, width = indices.shape
+        if num_rows == 0:
+            return
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), indices.shape)
+        self._row_lower.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (num_rows,)).ravel())
+        self._row_upper.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (num_rows,)).ravel())
+        self._row_length.append(np.full(num_rows, width, dtype=np.int64))
+        self._row_index.append(indices.ravel())
+        self._row_value.append(values.ravel())
+        self.num_row += num_rows
+        counts = self.row_families.setdefault(family, {"rows": 0, "nonzeros": 0})
+        counts["rows"] += num_rows
+        counts["nonzeros"] += num_rows * width
+
+    def to_highs(self) -> highspy.Highs:
+        def _concat(blocks: list[np.ndarray], dtype) -> np.ndarray:
+            if not blocks:
+                return np.zeros(0, dtype=dtype)
+            return np.ascontiguousarray(np.concatenate(blocks), dtype=dtype)
+
+        row_length = _concat(self._row_length, np.int64)
+        starts = np.zeros(self.num_row, dtype=np.int32)
+        if self.num_row > 1:
+            starts[1:] = np.cumsum(row_length[:-1], dtype=np.int64)
+        index = _concat(self._row_index, np.int32)
+
+        model = highspy.Highs()
+        model.setOptionValue("output_flag", False)
+        model.passModel(
+            self.num_col,
+            self.num_row,
+            int(index.size),
+            int(highspy.MatrixFormat.kRowwise),
+            int(highspy.ObjSense.kMinimize),
+            float(self.offset),
+            _concat(self._col_cost, np.float64),
+            _concat(self._col_lower, np.float64),
+            _concat(self._col_upper, np.float64),
+            _concat(self._row_lower, np.float64),
+            _concat(self._row_upper, np.float64),
+            starts,
+            index,
+            _concat(self._row_value, np.float64),
+            _concat(self._integrality, np.int32),
+        )
+        return model
+
+
+# Pairs whose meetings the hard constraints already decide: a separated pair, or two participants locked to
+# different tables, never meet, and two participants locked to the same table meet in every round. Returns the
+# endpoints (i < j, in np.triu_indices order) of the remaining pairs and the number of pairs that always meet.
+def _open_pairs(params: dict) -> tuple[np.ndarray, np.ndarray, int]:
+    n = len(params["I"])
+    pair_i, pair_j = np.triu_indices(n, k=1)
+    locked_table = np.full(n, -1, dtype=np.int64)
+    for i, locked_table_idx in params["locked_indices"].items():
+        locked_table[i] = locked_table_idx
+    both_locked = (locked_table[pair_i] >= 0) & (locked_table[pair_j] >= 0)
+    always_meet = both_locked & (locked_table[pair_i] == locked_table[pair_j])
+
+    decided = both_locked
+    if params["separation_pairs_indices"]:
+        low, high = np.array(sorted(params["separation_pairs_indices"]), dtype=np.int64).T
+        decided[low * n - low * (low + 1) // 2 + (high - low - 1)] = True
+    return pair_i[~decided], pair_j[~decided], int(always_meet.sum())
+
+
+# Bounds that follow from the roster and event settings alone, applied by _build_model before the model reaches
+# HiGHS. Every round seats all n participants at tables of l to u people that fill in order, so the first
+# ceil(n / u) tables are always used and tables from floor(n / l) on never are. No table holds more of a trait than
+# its u largest holder weights (nor more than a hard upper bound allows, nor anything at a table that is never
+# used), which caps the over-target deviation; counts are never negative, which caps the under-target deviation.
+# Hard upper bounds the cap already satisfies, and lower bounds of zero or less, need no row.
+# Locked participants are substituted out: their seats are fixed through the Y bounds (which also keep a separated
+# partner away from the locked table), their tables are fixed used, and the people and trait weights they bring to
+# every table (locked_count, locked_traits) move to the right-hand sides of the rows that sum over movable people.
+# Returns per-person seat bounds and the movable mask, per-table W bounds, per-(trait, table) deviation and count
+# caps, masks of the implied bound rows, the separations left for rows, and the count of each kind of reduction
+# (reported with the model size, see _model_stats).
+def _presolve_bounds(params: dict) -> dict:
+    n = len(params["I"])
+    num_t = len(params["T"])
+    l = params["l"]
+    u = params["u"]
+    incidence = params["B"]
+    targets = params["v_arr"]
+    v_bar = params["v_bar_arr"]
+    v_under = params["v_under_arr"]
+
+    always_used = min(num_t, -(-n // u)) if u > 0 else 0
+    never_used = min(num_t, n // l) if l > 0 else num_t
+    w_lower = (np.arange(num_t) < always_used).astype(np.float64)
+    w_upper = (np.arange(num_t) < never_used).astype(np.float64)
+
+    locked_table = np.full(n, -1, dtype=np.int64)
+    for i, locked_table_idx in params["locked_indices"].items():
+        locked_table[i] = locked_table_idx
+    locked_people = np.flatnonzero(locked_table >= 0)
+    locked_at = locked_table[locked_people]
+    lock_cells = np.zeros((len(locked_people), num_t))
+    lock_cells[np.arange(len(locked_people)), locked_at] = 1.0
+    locked_count = lock_cells.sum(axis=0)
+    locked_traits = incidence[locked_people].T @ lock_cells
+    w_lower[locked_at] = 1.0
+
+    seat_lower = np.zeros((n, num_t))
+    seat_upper = np.repeat(w_upper[None, :], n, axis=0)
+    seat_upper[locked_people] = 0.0
+    seat_upper[locked_people, locked_at] = 1.0
+    seat_lower[locked_people, locked_at] = 1.0
+    free_separations = []
+    partners_fixed = 0
+    for i, j in sorted(params["separation_pairs_indices"]):
+        # Pairs with neither person locked keep their rows, and so do pairs locked to the same table, whose
+        # rows make the model infeasible as they should.
+        if locked_table[i] == locked_table[j]:
+            free_separations.append((i, j))
+            continue
+        for locked, partner in ((i, j), (j, i)):
+            if locked_table[locked] >= 0 and seat_upper[partner, locked_table[locked]] > 0.0:
+                seat_upper[partner, locked_table[locked]] = 0.0
+                partners_fixed += 1
+
+    largest = np.sort(incidence, axis=0)[::-1][: max(u, 0)].sum(axis=0)
+    holder_cap = np.broadcast_to(largest[:, None], (len(targets), num_t))
+    count_cap = holder_cap * w_upper[None, :]
+    if v_bar is not None:
+        count_cap = np.fmin(count_cap, np.maximum(v_bar, 0.0))
+    over_cap = np.ceil(np.maximum(count_cap - targets[:, None], 0.0))
+    under_cap = np.broadcast_to(np.ceil(np.maximum(targets, 0.0))[:, None], count_cap.shape)
+
+    upper_implied = np.zeros(count_cap.shape, dtype=bool)
+    if v_bar is not None:
+        upper_implied = np.isfinite(v_bar) & (v_bar >= 0.0) & ((holder_cap <= v_bar) | (w_upper[None, :] == 0.0))
+    lower_implied = np.zeros(count_cap.shape, dtype=bool)
+    if v_under is not None:
+        lower_implied = np.isfinite(v_under) & (v_under <= 0.0)
+
+    num_r = len(params["R"])
+    return {
+        "seat_lower": seat_lower,
+        "seat_upper": seat_upper,
+        "movable": locked_table < 0,
+        "locked_count": locked_count,
+        "locked_traits": locked_traits,
+        "separations": free_separations,
+        "w_lower": w_lower,
+        "w_upper": w_upper,
+        "over_cap": over_cap,
+        "under_cap": under_cap,
+        "upper_implied": upper_implied,
+        "lower_implied": lower_implied,
+        "reductions": {
+            "used_tables_fixed": int(w_lower.sum() * num_r),
+            "unused_tables_fixed": int((num_t - never_used) * num_r),
+            "seats_fixed": int(n * (num_t - never_used) * num_r),
+            "locked_seats_fixed": int(len(locked_people) * num_t * num_r),
+            "separated_seats_fixed": int(partners_fixed * num_r),
+            "deviation_bounds_tightened": int(
+                (over_cap.size + (over_cap < 1.0).sum() + under_cap.size + (under_cap < 1.0).sum()) * num_r
+            ),
+            "trait_rows_dropped": int((upper_implied.sum() + lower_implied.sum()) * num_r),
+        },
+    }
+
+
+# Tables that a relabeling of the whole event (the same permutation in every round) may swap freely: tables every
+# schedule uses (the prefix rule always uses the first ceil(n / u) tables), that no lock names, that the anchor
+# does not occupy, and whose hard trait bounds match. The consecutive-round rule ties the tables of one round to
+# the next, so tables are only interchangeable across the whole event, never round by round.
+def _symmetric_tables(params: dict, *, anchor: bool = True) -> np.ndarray:
+    n = len(params["I"])
+    num_t = len(params["T"])
+    locked_indices = params["locked_indices"]
+    always_used = min(num_t, -(-n // params["u"])) if n else 0
+    excluded = set(locked_indices.values())
+    if anchor and n > 0 and 0 not in locked_indices:
+        excluded.add(0)
+    tables = [t for t in range(always_used) if t not in excluded]
+
+    for bounds in (params["v_bar_arr"], params["v_under_arr"]):
+        if bounds is not None and tables:
+            tables = [t for t in tables if np.array_equal(bounds[:, t], bounds[:, tables[0]])]
+    return np.array(tables, dtype=np.int64)
+
+
+# Whether reversing the order of the rounds maps schedules onto schedules. Reversal keeps every pair of consecutive
+# rounds consecutive, and locks, separations and per-table bounds are the same in every round; only the anchor
+# pins round 1, so with an anchor every table must be interchangeable to move the anchored person back to table 1.
+def _reversible_rounds(params: dict, *, anchor: bool = True) -> bool:
+    n = len(params["I"])
+    if len(params["R"]) < 2:
+        return False
+    if not anchor or n == 0 or 0 in params["locked_indices"]:
+        return True
+    return len(_symmetric_tables(params, anchor=False)) == len(params["T"])
+
+
+# Builds the optimization model using the HiGHS library. This function takes the prepared parameters and constructs
+# the decision variables, objective function, and constraints according to the problem formulation.
+# Every variable family and constraint family is assembled as a NumPy block and the whole model is passed to HiGHS
+# at once. Variables and rows are created in the same order as _build_model_rowwise; with presolve=False both produce
+# the same model. presolve (the default) applies the bounds of _presolve_bounds to W, Y and the E* deviations and
+# leaves out the hard trait-bound rows they imply; it also substitutes locked participants out of every row (their
+# Y columns stay, fixed by their bounds, so the column layout is the same); columns["presolve"] counts the reductions.
+# Returns the model and a dict of column-index arrays: Y[i, t, r], W[t, r], E*[trait, t, r], P[pair, r], H[pair],
+# plus the pair endpoints pair_i/pair_j and the trait_keys order used for the E* arrays.
+# formulation="compact" omits P, H and the constraint (8)/(9) rows (see _solve_with_pair_cuts). The full formulation
+# creates them for every pair; with presolve, only for the pairs _open_pairs leaves undecided, and every pair locked
+# to the same table pays its lambda * (R - 1) through the objective offset instead, so the objective is unchanged.
+# anchor=False drops constraint (5), for models whose first round is not the event's first round. met_pairs, a
+# pair of index arrays (i, j) with i < j, lists pairs that already met outside the model's rounds; each of their
+# meetings inside the model costs lambda through columns Q[met pair, r] (see _solve_round_window).
+# symmetry_breaking adds any of the _SYMMETRY_BREAKING pieces on top of constraints (5) and (6):
+#   "tables"      orders the interchangeable tables of _symmetric_tables by the lowest-indexed person they seat in
+#                 round 1 (a person may open the next such table only if someone before them sits at the previous);
+#   "first_seats" fixes the k-th eligible person of round 1 away from every interchangeable table after the k-th;
+#   "rounds"      when _reversible_rounds, requires the first round's deviation cost to be at most the last round's.
+# Each piece only removes relabeled copies of schedules; _canonical_assignment maps a schedule onto the copy kept.
+def _build_model(
+    params: dict,
+    *,
+    formulation: str = "full",
+    anchor: bool = True,
+    met_pairs: tuple[np.ndarray, np.ndarray] | None = None,
+    symmetry_breaking: tuple[str, ...] = (),
+    presolve: bool = True,
+) -> tuple[highspy.Highs, dict[str, np.ndarray]]:
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+    l = params["l"]
+    u = params["u"]
+    lam = params["lam"]
+    trait_keys = params["trait_keys"]
+    incidence = params["B"]
+    v_bar = params["v_bar_arr"]
+    v_under = params["v_under_arr"]
+    locked_indices = params["locked_indices"]
+    separation_pairs_indices = params["separation_pairs_indices"]
+    if formulation not in _FORMULATIONS:
+        raise ValueError(f"Unknown formulation {formulation!r}; expected one of {', '.join(_FORMULATIONS)}.")
+    unknown = set(symmetry_breaking) - set(_SYMMETRY_BREAKING)
+    if unknown:
+        raise ValueError(
+            f"Unknown symmetry breaking {', '.join(sorted(unknown))}; expected any of {', '.join(_SYMMETRY_BREAKING)}."
+        )
+
+    inf = highspy.kHighsInf
+    integer = highspy.HighsVarType.kInteger
+    builder = _ColumnarModel()
+
+    num_traits = len(trait_keys)
+    trait_shape = (num_traits, num_t, num_r)
+
+    def _per_trait(values: np.ndarray) -> np.ndarray:
+        return values[:, None, None]
+
+    if presolve:
+        bounds = _presolve_bounds(params)
+        seat_lower = bounds["seat_lower"][:, :, None]
+        seat_upper = bounds["seat_upper"][:, :, None]
+        w_lower = bounds["w_lower"][:, None]
+        w_upper = bounds["w_upper"][:, None]
+        over_cap = bounds["over_cap"][:, :, None]
+        under_cap = bounds["under_cap"][:, :, None]
+        upper_implied = bounds["upper_implied"]
+        lower_implied = bounds["lower_implied"]
+        unlocked = np.flatnonzero(bounds["movable"])
+        locked_count = np.repeat(bounds["locked_count"], num_r)
+        locked_traits = np.repeat(bounds["locked_traits"], num_r, axis=1)
+        separations = bounds["separations"]
+    else:
+        bounds = None
+        seat_lower, seat_upper, w_lower, w_upper, over_cap, under_cap = 0.0, 1.0, 0.0, 1.0, inf, inf
+        upper_implied = lower_implied = np.zeros((num_traits, num_t), dtype=bool)
+        unlocked = np.arange(n)
+        locked_count = np.zeros(num_t * num_r)
+        locked_traits = np.zeros((num_traits, num_t * num_r))
+        separations = separation_pairs_indices
+
+    # Decision variables, created in the same order as the formulation lists them.
+    Y = builder.add_vars((n, num_t, num_r), seat_lower, seat_upper, integrality=integer)
+    W = builder.add_vars((num_t, num_r), w_lower, w_upper, integrality=integer)
+    E1_bar = builder.add_vars(
+        trait_shape, 0.0, np.minimum(over_cap, 1.0), cost=_per_trait(params["w1_bar_arr"]), integrality=integer
     )
-    model, Y, W = _build_model(params)
-    model.setOptionValue("output_flag", bool(debug))
-    if time_limit_seconds is not None:
-        model.setOptionValue("time_limit", float(time_limit_seconds))
-    model.run()
+    E2_bar = builder.add_vars(trait_shape, 0.0, over_cap, cost=_per_trait(params["w2_bar_arr"]), integrality=integer)
+    E1 = builder.add_vars(
+        trait_shape, 0.0, np.minimum(under_cap, 1.0), cost=_per_trait(params["w1_arr"]), integrality=integer
+    )
+    E2 = builder.add_vars(trait_shape, 0.0, under_cap, cost=_per_trait(params["w2_arr"]), integrality=integer)
+
+    # The compact formulation leaves repeat meetings out of the initial model; _solve_with_pair_cuts
+    # adds excess-meeting columns and cuts only for pairs that actually meet more than once.
+    if formulation == "full" and presolve:
+        pair_i, pair_j, always_meet = _open_pairs(params)
+        builder.offset += lam * max(num_r - 1, 0) * always_meet
+    elif formulation == "full":
+        pair_i, pair_j = np.triu_indices(len(params["I"]), k=1)
+    else:
+        pair_i = pair_j = np.zeros(0, dtype=np.int64)
+    num_pairs = len(pair_i)
+    P = builder.add_vars((num_pairs, num_r), 0.0, 1.0, cost=lam, integrality=integer)
+    H = builder.add_vars((num_pairs,), 0.0, 1.0, cost=-lam, integrality=integer)
+
+    # Formulation constraints (2) and (3): table size bounds when table (t, r) is used. Rows sum over the unlocked
+    # people; the locked people seated at the table move to the right-hand side.
+    num_unlocked = len(unlocked)
+    table_rows = np.concatenate([Y[unlocked].transpose(1, 2, 0), W[:, :, None]], axis=2).reshape(
+        num_t * num_r, num_unlocked + 1
+    )
+    builder.add_rows(-locked_count, inf, table_rows, np.append(np.ones(num_unlocked), -float(l)), family="table_size")
+    builder.add_rows(-inf, -locked_count, table_rows, np.append(np.ones(num_unlocked), -float(u)), family="table_size")
+
+    # Formulation constraint (4): each person is assigned to exactly one table per round.
+    seat_rows = Y[unlocked].transpose(0, 2, 1).reshape(num_unlocked * num_r, num_t)
+    builder.add_rows(1.0, 1.0, seat_rows, 1.0, family="one_table_per_round")
+
+    # Extension: no participant stays at the same table in consecutive rounds unless locked.
+    if num_r > 1:
+        movable = np.array([i for i in range(n) if i not in locked_indices], dtype=np.int64)
+        consecutive = np.stack([Y[movable, :, :-1], Y[movable, :, 1:]], axis=-1)
+        builder.add_rows(-inf, 1.0, consecutive.reshape(-1, 2), 1.0, family="consecutive_rounds")
+
+    # Extension: enforce user-provided table locks (presolve fixes them through the Y bounds instead).
+    if locked_indices and not presolve:
+        lock_rows = np.array([Y[i, locked_table_idx, :] for i, locked_table_idx in locked_indices.items()])
+        builder.add_rows(1.0, 1.0, lock_rows.reshape(-1, 1), 1.0, family="locks")
+
+    # Formulation constraint (5): anchor one person to break symmetry.
+    if anchor and n > 0 and 0 not in locked_indices:
+        builder.add_rows(1.0, 1.0, Y[0, 0, 0].reshape(1, 1), 1.0, family="anchor")
+
+    # Formulation constraint (10): separated pairs never share a table in any round.
+    for i, j in separations:
+        separation_rows = np.stack([Y[i], Y[j]], axis=-1).reshape(-1, 2)
+        builder.add_rows(-inf, 1.0, separation_rows, 1.0, family="separations")
+
+    # Formulation constraint (6): used tables fill sequentially.
+    if num_t > 1:
+        order_rows = np.stack([W[:-1, :], W[1:, :]], axis=-1).reshape(-1, 2)
+        builder.add_rows(0.0, inf, order_rows, [1.0, -1.0], family="table_order")
+
+    # Extension: optional symmetry breaking in round 1 over the interchangeable tables.
+    symmetric = _symmetric_tables(params, anchor=anchor) if {"tables", "first_seats"} & set(symmetry_breaking) else []
+    if len(symmetric) > 1:
+        anchored = anchor and 0 not in locked_indices
+        eligible = np.array(
+            [i for i in range(n) if i not in locked_indices and not (anchored and i == 0)], dtype=np.int64
+        )
+        if "tables" in symmetry_breaking:
+            for rank, i in enumerate(eligible):
+                earlier = Y[eligible[:rank][None, :], symmetric[:-1][:, None], 0]
+                opening_rows = np.concatenate([Y[i, symmetric[1:], 0][:, None], earlier], axis=1)
+                builder.add_rows(-inf, 0.0, opening_rows, np.append(1.0, -np.ones(rank)), family="symmetry_breaking")
+        if "first_seats" in symmetry_breaking:
+            for rank, i in enumerate(eligible[: len(symmetric) - 1]):
+                builder.add_rows(0.0, 0.0, Y[i, symmetric[rank + 1 :], 0][:, None], 1.0, family="symmetry_breaking")
+
+    # Extension: optional round-reversal symmetry breaking on the per-round deviation cost.
+    if "rounds" in symmetry_breaking and num_traits and _reversible_rounds(params, anchor=anchor):
+        round_costs = np.stack(
+            [np.broadcast_to(params[key][:, None], (num_traits, num_t)) for key in _DEVIATION_COSTS]
+        ).ravel()
+        first_last = [np.stack([E1_bar, E2_bar, E1, E2])[..., r].ravel() for r in (0, num_r - 1)]
+        builder.add_rows(
+            -inf,
+            0.0,
+            np.concatenate(first_last)[None, :],
+            np.concatenate([round_costs, -round_costs]),
+            family="symmetry_breaking",
+        )
+
+    # Formulation constraint (7) and the optional hard trait bounds share the holder columns of each trait.
+    holders = [np.flatnonzero(incidence[unlocked, c]) for c in range(num_traits)]
+    holders = [unlocked[holder_idx] for holder_idx in holders]
+    holder_values = [incidence[holder_idx, c] for c, holder_idx in enumerate(holders)]
+
+    def _trait_count_columns(c: int) -> np.ndarray:
+        return Y[holders[c]].transpose(1, 2, 0).reshape(num_t * num_r, len(holders[c]))
+
+    deviation_values = np.array([-1.0, -1.0, 1.0, 1.0])
+    for c in range(num_traits):
+        deviations = np.stack([E1_bar[c], E2_bar[c], E1[c], E2[c]], axis=-1).reshape(num_t * num_r, 4)
+        target = params["v_arr"][c] - locked_traits[c]
+        builder.add_rows(
+            target,
+            target,
+            np.concatenate([_trait_count_columns(c), deviations], axis=1),
+            np.concatenate([holder_values[c], deviation_values]),
+            family="trait_targets",
+        )
+
+    # Extension: optional hard upper and lower bounds on trait counts (traits without a bound, and bounds presolve
+    # found implied, are skipped).
+    if v_bar is not None:
+        for c in range(num_traits):
+            upper = np.repeat(v_bar[c], num_r)
+            bounded = np.isfinite(upper) & ~np.repeat(upper_implied[c], num_r)
+            if (len(holders[c]) or locked_traits[c].any()) and bounded.any():
+                builder.add_rows(
+                    -inf,
+                    upper[bounded] - locked_traits[c][bounded],
+                    _trait_count_columns(c)[bounded],
+                    holder_values[c],
+                    family="trait_upper_bounds",
+                )
+
+    if v_under is not None:
+        for c in range(num_traits):
+            lower = np.repeat(v_under[c], num_r)
+            bounded = np.isfinite(lower) & ~np.repeat(lower_implied[c], num_r)
+            if (len(holders[c]) or locked_traits[c].any()) and bounded.any():
+                builder.add_rows(
+                    lower[bounded] - locked_traits[c][bounded],
+                    inf,
+                    _trait_count_columns(c)[bounded],
+                    holder_values[c],
+                    family="trait_lower_bounds",
+                )
 
+    # Formulation constraint (8): P[i, j, r] = 1 if and only if i and j share a table in round r.
+    # One block per half of the linking: P >= Yi + Yj - 1, P <= 1 - Yi + Yj, P <= 1 + Yi - Yj.
+    # With presolve, a pair with one locked person meets exactly when the other sits at the locked table, which
+    # takes one row per round instead of three per table and round.
+    if num_pairs:
+        linked = np.ones(num_pairs, dtype=bool)
+        if presolve:
+            pair_table = np.full(n, -1, dtype=np.int64)
+            pair_table[list(locked_indices)] = list(locked_indices.values())
+            linked = (pair_table[pair_i] < 0) & (pair_table[pair_j] < 0)
+            half = np.flatnonzero(~linked)
+            other = np.where(pair_table[pair_i[half]] >= 0, pair_j[half], pair_i[half])
+            table = np.maximum(pair_table[pair_i[half]], pair_table[pair_j[half]])
+            half_link = np.stack([P[half], Y[other, table]], axis=-1).reshape(-1, 2)
+            builder.add_rows(0.0, 0.0, half_link, [1.0, -1.0], family="pair_meetings")
+        num_linked = int(linked.sum())
+        pair_link = np.stack(
+            [
+                np.broadcast_to(P[linked][:, None, :], (num_linked, num_t, num_r)),
+                Y[pair_i[linked]],
+                Y[pair_j[linked]],
+            ],
+            axis=-1,
+        ).reshape(-1, 3)
+        builder.add_rows(-1.0, inf, pair_link, [1.0, -1.0, -1.0], family="pair_meetings")
+        builder.add_rows(-inf, 1.0, pair_link, [1.0, 1.0, -1.0], family="pair_meetings")
+        builder.add_rows(-inf, 1.0, pair_link, [1.0, -1.0, 1.0], family="pair_meetings")
+        del pair_link
+
+        # Formulation constraint (9): H[i, j] = 1 if the pair meets in any round, and 0 otherwise.
+        met_rows = np.stack([np.broadcast_to(H[:, None], (num_pairs, num_r)), P], axis=-1).reshape(-1, 2)
+        builder.add_rows(0.0, inf, met_rows, [1.0, -1.0], family="pairs_met")
+        builder.add_rows(
+            -inf, 0.0, np.concatenate([H[:, None], P], axis=1), np.append(1.0, -np.ones(num_r)), family="pairs_met"
+        )
+
+    # Repeat meetings with rounds outside the model: Q[met pair, r] >= Y[i, t, r] + Y[j, t, r] - 1 for every t.
+    if met_pairs is None:
+        met_i = met_j = np.zeros(0, dtype=np.int64)
+    else:
+        met_i, met_j = (np.asarray(side, dtype=np.int64) for side in met_pairs)
+    Q = builder.add_vars((len(met_i), num_r), 0.0, 1.0, cost=lam)
+    if len(met_i):
+        met_link = np.stack(
+            [np.broadcast_to(Q[:, None, :], (len(met_i), num_t, num_r)), Y[met_i], Y[met_j]],
+            axis=-1,
+        ).reshape(-1, 3)
+        builder.add_rows(-1.0, inf, met_link, [1.0, -1.0, -1.0], family="met_before")
+
+    columns = {
+        "Y": Y,
+        "W": W,
+        "E1_bar": E1_bar,
+        "E2_bar": E2_bar,
+        "E1": E1,
+        "E2": E2,
+        "P": P,
+        "H": H,
+        "pair_i": pair_i,
+        "pair_j": pair_j,
+        "Q": Q,
+        "met_i": met_i,
+        "met_j": met_j,
+        "trait_keys": trait_keys,
+        "row_families": builder.row_families,
+        "presolve": None if bounds is None else bounds["reductions"],
+    }
+    return builder.to_highs(), columns
+
+
+# Reads the table per participant and round out of a solved model: assignment[i, r] is the 0-based table index,
+# or -1 when the participant is not seated at a used table in that round.
+def _assignment_from_solution(col_value, columns: dict) -> np.ndarray:
+    col_value = np.asarray(col_value, dtype=np.float64)
+    seated = col_value[columns["Y"]] > 0.5
+    seated &= (col_value[columns["W"]] > 0.5)[None, :, :]
+    return np.where(seated.any(axis=1), seated.argmax(axis=1), -1)
+
+
+# Cost of deviating d seats from a trait target, split the same way the model splits it:
+# the first seat over (under) costs w1_bar (w1) and every further seat costs w2_bar (w2).
+def _deviation_cost(deviation: np.ndarray, w1_bar, w2_bar, w1, w2) -> np.ndarray:
+    over = np.maximum(deviation, 0.0)
+    under = np.maximum(-deviation, 0.0)
+    over_cost = np.where(
+        w1_bar <= w2_bar,
+        w1_bar * np.minimum(over, 1.0) + w2_bar * np.maximum(over - 1.0, 0.0),
+        w2_bar * over,
+    )
+    under_cost = np.where(
+        w1 <= w2,
+        w1 * np.minimum(under, 1.0) + w2 * np.maximum(under - 1.0, 0.0),
+        w2 * under,
+    )
+    return over_cost + under_cost
+
+
+# Number of rounds each pair shares a table, as an n x n matrix (diagonal is zero).
+def _pair_meeting_counts(assignment: np.ndarray) -> np.ndarray:
+    n = assignment.shape[0]
+    counts = np.zeros((n, n), dtype=np.int32)
+    for r in range(assignment.shape[1]):
+        tables = assignment[:, r]
+        counts += (tables[:, None] == tables[None, :]) & (tables[:, None] >= 0)
+    np.fill_diagonal(counts, 0)
+    return counts
+
+
+# Trait deviation cost of each round of a schedule (the objective without the repeat-meeting penalty).
+def _round_deviation_costs(params: dict, assignment: np.ndarray) -> np.ndarray:
+    counts = scoring.table_trait_counts(params["B"], assignment, len(params["T"])).transpose(2, 1, 0)
+    return _deviation_cost(
+        counts - params["v_arr"][:, None, None],
+        params["w1_bar_arr"][:, None, None],
+        params["w2_bar_arr"][:, None, None],
+        params["w1_arr"][:, None, None],
+        params["w2_arr"][:, None, None],
+    ).sum(axis=(0, 1))
+
+
+# Evaluates the formulation objective (1) on a finished schedule, so every solve mode reports the same quantity:
+# weighted trait deviations over every (table, round) plus lambda for every repeat meeting of a pair.
+def _schedule_objective(params: dict, assignment: np.ndarray) -> float:
+    balance = _round_deviation_costs(params, assignment).sum()
+    meetings = np.triu(_pair_meeting_counts(assignment), k=1)
+    repeats = np.maximum(meetings - 1, 0).sum()
+    return float(balance + params["lam"] * repeats)
+
+
+# Whether the repeat-meeting terms can change the objective. With a single round a pair meets at most once, so H = P
+# and the +lambda P and -lambda H costs cancel exactly; with lambda = 0 they cost nothing. Otherwise the pair columns
+# and their linking rows are dead weight, and the model is solved without them (the compact formulation, whose
+# repeat-meeting cuts are then never needed).
+def _pair_terms_matter(params: dict) -> bool:
+    return len(params["R"]) > 1 and params["lam"] != 0.0
+
+
+# Relative gap with the same definition HiGHS uses for mip_gap.
+def _relative_gap(objective: float, bound: float) -> float:
+    if objective == bound:
+        return 0.0
+    if objective == 0.0:
+        return float("inf")
+    return abs(objective - bound) / abs(objective)
+
+
+def _check_solution_status(model: highspy.Highs) -> None:
     status = model.getModelStatus()
     info = model.getInfo()
     if status != highspy.HighsModelStatus.kOptimal:
         if (
-            status == highspy.HighsModelStatus.kTimeLimit
+            status in (highspy.HighsModelStatus.kTimeLimit, highspy.HighsModelStatus.kInterrupt)
             and info.primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible
         ):
             pass
         else:
             raise RuntimeError(f"Optimization failed with status {status}")
 
-    solution = model.getSolution()
-    col_value = solution.col_value
 
+# Connects a running solve to its caller: publishes each improving schedule to on_incumbent and stops HiGHS
+# once stop_event (anything with is_set(), e.g. a threading.Event) is set. on_incumbent receives a dict with
+# objective, gap (None without a global bound), elapsed_seconds and the participant/schedule result frames;
+# it runs on the solving thread. Only schedules that beat every earlier one are published.
+class _SolveMonitor:
+    def __init__(self, params: dict, *, on_incumbent: Callable[[dict], None] | None = None, stop_event=None) -> None:
+        self.params = params
+        self.on_incumbent = on_incumbent
+        self.stop_event = stop_event
+        self.started = time.monotonic()
+        self.best_objective = float("inf")
+
+    def stop_requested(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def publish(self, assignment: np.ndarray, bound: float | None = None) -> None:
+        if self.on_incumbent is None:
+            return
+        objective = _schedule_objective(self.params, assignment)
+        if objective >= self.best_objective:
+            return
+        self.best_objective = objective
+        participant_results, schedule_results = _result_frames(self.params, assignment)
+        self.on_incumbent(
+            {
+                "objective": objective,
+                "gap": None if bound is None or not np.isfinite(bound) else _relative_gap(objective, bound),
+                "elapsed_seconds": time.monotonic() - self.started,
+                "participant_results": participant_results,
+                "schedule_results": schedule_results,
+            }
+        )
+
+    # Subscribes to the model's callbacks. to_schedule maps the model's assignment onto the whole event when the
+    # model covers only some rounds; the model's dual bound is then not a bound on the event and is not reported.
+    def attach(self, model: highspy.Highs, columns: dict, to_schedule=None) -> None:
+        if self.on_incumbent is not None:
+
+            def _publish_improving(event) -> None:
+                assignment = _assignment_from_solution(event.data_out.mip_solution, columns)
+                if to_schedule is not None:
+                    self.publish(to_schedule(assignment))
+                else:
+                    self.publish(assignment, float(event.data_out.mip_dual_bound))
+
+            model.cbMipImprovingSolution.subscribe(_publish_improving)
+        if self.stop_event is not None:
+
+            def _interrupt_on_stop(event) -> None:
+                if self.stop_requested():
+                    event.interrupt()
+
+            model.cbMipInterrupt.subscribe(_interrupt_on_stop)
+
+
+# Minimum time between two bound samples taken from HiGHS's interrupt callback; HiGHS's own MIP log lines and every
+# improving solution are always recorded.
+_PROGRESS_SAMPLE_SECONDS = 0.5
+
+# Variable families of _build_model and _build_profile_model, reported with the model size.
+_COLUMN_FAMILIES = ("Y", "X", "W", "E1_bar", "E2_bar", "E1", "E2", "P", "H", "Q")
+
+
+# Rows, columns and nonzeros of a model built by _build_model, with rows and nonzeros per constraint family and
+# columns per variable family. Rows and columns added after the build (the pair cuts and excess-meeting columns of
+# _solve_with_pair_cuts) are reported as the "pair_cuts" family. "presolve" holds the reductions _presolve_bounds
+# made before the build.
+def _model_stats(model: highspy.Highs, columns: dict) -> dict:
+    row_families = {family: dict(counts) for family, counts in columns["row_families"].items()}
+    column_families = {family: int(columns[family].size) for family in _COLUMN_FAMILIES if family in columns}
+    added_rows = model.getNumRow() - sum(counts["rows"] for counts in row_families.values())
+    added_columns = model.getNumCol() - sum(column_families.values())
+    if added_rows:
+        row_families["pair_cuts"] = {
+            "rows": added_rows,
+            "nonzeros": model.getNumNz() - sum(counts["nonzeros"] for counts in row_families.values()),
+        }
+    if added_columns:
+        column_families["pair_cuts"] = added_columns
+    return {
+        "rows": int(model.getNumRow()),
+        "columns": int(model.getNumCol()),
+        "nonzeros": int(model.getNumNz()),
+        "row_families": row_families,
+        "column_families": column_families,
+        "presolve": columns.get("presolve"),
+    }
+
+
+# Instrumentation behind solve_solver_v2's stats and stats_log arguments. It fills the stats dict with:
+#   "method"     the solve method actually run (after "auto" is resolved);
+#   "timings"    seconds per phase: prepare, cache, warm_start, build, run, seating and extract (only the phases
+#                that ran);
+#   "model"      the size of the solved MIP (see _model_stats), or None for methods without a whole-event model;
+#   "progress"   the MIP's primal bound, dual bound and gap over time, as records with elapsed_seconds measured
+#                from the start of the solve, taken from the HiGHS callbacks;
+#   "highs_log"  the HiGHS log lines, captured whether or not debug also prints them;
+#   "result"     the returned objective and gap.
+# With stats_log, every record is also appended to that file as one JSON line as soon as it is taken, so a long
+# solve can be followed from outside the process. Bounds that are not known yet are written as null.
+class _SolveStats:
+    def __init__(self, stats: dict | None, log_path: str | Path | None = None) -> None:
+        self.stats = {} if stats is None else stats
+        self.enabled = stats is not None or log_path is not None
+        self.log_path = None if log_path is None else Path(log_path)
+        self.started = time.monotonic()
+        self._last_sample = -float("inf")
+        self.stats.update(method=None, timings={}, model=None, progress=[], highs_log=[], result=None)
+
+    def _emit(self, record: dict) -> None:
+        if self.log_path is None:
+            return
+        with self.log_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
+
+    def method(self, method: str) -> None:
+        self.stats["method"] = method
+        self._emit({"event": "method", "method": method})
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            timings = self.stats["timings"]
+            timings[name] = timings.get(name, 0.0) + seconds
+            self._emit({"event": "phase", "phase": name, "seconds": seconds})
+
+    def model(self, model: highspy.Highs, columns: dict) -> None:
+        if not self.enabled:
+            return
+        self.stats["model"] = _model_stats(model, columns)
+        self._emit({"event": "model", **self.stats["model"]})
+
+    def result(self, objective: float, gap: float | None) -> None:
+        self.stats["result"] = {"objective": objective, "gap": gap}
+        self._emit({"event": "result", "objective": objective, "gap": gap})
+
+    def _sample(self, primal: float, dual: float, nodes: int) -> None:
+        finite = np.isfinite(primal) and np.isfinite(dual)
+        record = {
+            "elapsed_seconds": time.monotonic() - self.started,
+            "primal_bound": float(primal) if np.isfinite(primal) else None,
+            "dual_bound": float(dual) if np.isfinite(dual) else None,
+            "gap": _relative_gap(float(primal), float(dual)) if finite else None,
+            "nodes": int(nodes),
+        }
+        self.stats["progress"].append(record)
+        self._emit({"event": "progress", **record})
+
+    # Subscribes to the model's callbacks. HiGHS only runs its logging callbacks while output_flag is set, so the
+    # log is turned on and kept off the console unless debug asked for it.
+    def attach(self, model: highspy.Highs, *, debug: bool = False) -> None:
+        if not self.enabled:
+            return
+        model.setOptionValue("output_flag", True)
+        model.setOptionValue("log_to_console", bool(debug))
+
+        def _record_log(event) -> None:
+            message = event.message.rstrip("\n")
+            self.stats["highs_log"].append(message)
+            self._emit({"event": "log", "message": message})
+
+        def _record_bounds(event) -> None:
+            data = event.data_out
+            self._last_sample = time.monotonic()
+            self._sample(data.mip_primal_bound, data.mip_dual_bound, data.mip_node_count)
+
+        def _sample_bounds(event) -> None:
+            if time.monotonic() - self._last_sample >= _PROGRESS_SAMPLE_SECONDS:
+                _record_bounds(event)
+
+        def _record_solution(event) -> None:
+            data = event.data_out
+            self._last_sample = time.monotonic()
+            self._sample(data.objective_function_value, data.mip_dual_bound, data.mip_node_count)
+
+        model.cbLogging.subscribe(_record_log)
+        model.cbMipLogging.subscribe(_record_bounds)
+        model.cbMipInterrupt.subscribe(_sample_bounds)
+        model.cbMipImprovingSolution.subscribe(_record_solution)
+
+
+# Builds the participant and schedule result frames returned by solve_solver_v2 from an assignment matrix.
+def _result_frames(params: dict, assignment: np.ndarray) -> tuple[pd.DataFrame, pd.DataFrame]:
     work_df = params["df"].copy()
     I = params["I"]
-    T = params["T"]
     R = params["R"]
     work_df["Person_Index"] = list(I)
 
-    row_assignments = {}
-    round_table_rows = []
     for r in R:
-        for t in T:
-            if col_value[W[t, r]] > 0.5:
-                people_in_t = [i for i in I if col_value[Y[i, t, r]] > 0.5]
-                people_in_t.sort()
-                for i in people_in_t:
-                    row_assignments[(i, r)] = t + 1
-                    round_table_rows.append(
-                        {
-                            "Round": r + 1,
-                            "Table": t + 1,
-                            "Person_Index": i,
-                            "Participant_ID": work_df.at[i, "Participant_ID"],
-                        }
+        col = f"Round_{r + 1}_Table"
+        work_df[col] = [int(assignment[i, r]) + 1 if assignment[i, r] >= 0 else None for i in I]
+
+    person, round_idx = np.nonzero(assignment >= 0)
+    table = assignment[person, round_idx]
+    order = np.lexsort((person, table, round_idx))
+    person, round_idx, table = person[order], round_idx[order], table[order]
+    if len(person) == 0:
+        return work_df, pd.DataFrame([])
+
+    schedule_df = pd.DataFrame(
+        {
+            "Round": (round_idx + 1).astype(np.int64),
+            "Table": (table + 1).astype(np.int64),
+            "Person_Index": person.astype(np.int64),
+            "Participant_ID": work_df["Participant_ID"].to_numpy()[person],
+        }
+    )
+    schedule_df = schedule_df.sort_values(["Round", "Table", "Participant_ID"], kind="stable")
+    return work_df, schedule_df
+
+
+# Penalty per seat of violation of a hard trait bound inside the heuristic. Large enough that no
+# combination of soft deviation and repeat-meeting costs can outweigh a single violation.
+_HEURISTIC_HARD_PENALTY = 1.0e6
+
+# Default search time for method="heuristic".
+_HEURISTIC_DEFAULT_SECONDS = 10.0
+# Random kicks in a row that may fail to improve the best schedule before the heuristic's local search gives up.
+_HEURISTIC_MAX_STALE_KICKS = 20
+# Cap and share of the MIP time limit spent on the warm start, and the cap for pair-free models (see solve_solver_v2).
+_WARM_START_MAX_SECONDS = 10.0
+_WARM_START_TIME_SHARE = 0.1
+_WARM_START_PAIR_FREE_SECONDS = 1.0
+
+
+# Checks an assignment against every hard constraint of _build_model: one table per person and round,
+# used tables forming a prefix with sizes in [l, u], locks, the anchor, separations, the consecutive-round rule
+# and the hard trait bounds. A schedule that passes is a valid MIP start.
+def _is_feasible_assignment(params: dict, assignment: np.ndarray) -> bool:
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+    l = params["l"]
+    u = params["u"]
+    locked_indices = params["locked_indices"]
+    if assignment.shape != (n, num_r) or n == 0:
+        return assignment.shape == (n, num_r)
+    if (assignment < 0).any() or (assignment >= num_t).any():
+        return False
+
+    sizes = scoring.table_sizes(assignment, num_t).T
+    used = sizes > 0
+    if ((sizes > 0) & ((sizes < l) | (sizes > u))).any():
+        return False
+    if num_t > 1 and (used[1:] & ~used[:-1]).any():
+        return False
+
+    for i, locked_table_idx in locked_indices.items():
+        if (assignment[i] != locked_table_idx).any():
+            return False
+    if 0 not in locked_indices and assignment[0, 0] != 0:
+        return False
+    for i, j in params["separation_pairs_indices"]:
+        if (assignment[i] == assignment[j]).any():
+            return False
+    if num_r > 1:
+        movable = np.array([i not in locked_indices for i in range(n)], dtype=bool)
+        if ((assignment[:, 1:] == assignment[:, :-1]) & movable[:, None]).any():
+            return False
+
+    incidence = params["B"]
+    has_holders = incidence.sum(axis=0) > 0
+    for counts in scoring.table_trait_counts(incidence, assignment, num_t).transpose(0, 2, 1):
+        if params["v_bar_arr"] is not None and (counts > params["v_bar_arr"])[has_holders].any():
+            return False
+        if params["v_under_arr"] is not None and (counts < params["v_under_arr"])[has_holders].any():
+            return False
+    return True
+
+
+# Construction-plus-local-search seating heuristic, used on its own (method="heuristic") and as a MIP start.
+#
+# For each admissible number of used tables m (the first m tables, sizes in [l, u]) it seats every round greedily:
+# locked participants and the anchor first, then everyone else in order of trait rarity, each at the table where
+# they add the least deviation cost and repeat-meeting penalty. The best construction is then improved by
+# first-improvement local search over move and pair-swap neighborhoods, with random kicks from each local optimum.
+# Every move respects locks, the anchor, separations, table size bounds and the no-same-table-consecutive-rounds
+# rule; hard trait bounds are handled as a large penalty. The search ends at the time limit, when stop_event is set,
+# after max_stale_kicks kicks in a row without a new best (0 stops at the first local optimum), or once the best
+# cost reaches lower_bound (the objective is never negative). With a monitor, each new feasible best is published.
+# A feasible start_assignment replaces the construction, so the local search continues from it.
+# Returns an (n, R) table-index matrix, or None when no schedule satisfying every hard constraint was found.
+def _heuristic_assignment(
+    params: dict,
+    *,
+    time_limit_seconds: float | None = None,
+    seed: int = 0,
+    stop_event=None,
+    start_assignment: np.ndarray | None = None,
+    max_stale_kicks: int = _HEURISTIC_MAX_STALE_KICKS,
+    lower_bound: float = 0.0,
+    monitor: "_SolveMonitor | None" = None,
+) -> np.ndarray | None:
+    started = time.monotonic()
+    budget = _HEURISTIC_DEFAULT_SECONDS if time_limit_seconds is None else max(0.0, float(time_limit_seconds))
+    deadline = started + budget
+
+    def _out_of_time() -> bool:
+        return time.monotonic() >= deadline or (stop_event is not None and stop_event.is_set())
+
+    def _publish(assignment: np.ndarray) -> None:
+        if monitor is not None and _is_feasible_assignment(params, assignment):
+            monitor.publish(assignment)
+
+    rng = np.random.default_rng(seed)
+
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+    l = params["l"]
+    u = params["u"]
+    lam = float(params["lam"])
+    locked_indices = params["locked_indices"]
+    if n == 0:
+        return np.zeros((0, num_r), dtype=np.int64)
+
+    incidence = params["B"] > 0
+    has_holders = incidence.any(axis=0)
+    held = [np.flatnonzero(incidence[i]) for i in range(n)]
+    v = params["v_arr"]
+    w1_bar, w2_bar = params["w1_bar_arr"], params["w2_bar_arr"]
+    w1, w2 = params["w1_arr"], params["w2_arr"]
+    v_bar = params["v_bar_arr"]
+    v_under = params["v_under_arr"]
+
+    partners: list[list[int]] = [[] for _ in range(n)]
+    for i, j in params["separation_pairs_indices"]:
+        partners[i].append(j)
+        partners[j].append(i)
+
+    # fixed[i, r] marks seats the search may never change: locks in every round, the anchor in round 1.
+    fixed_table = np.full((n, num_r), -1, dtype=np.int64)
+    for i, locked_table_idx in locked_indices.items():
+        fixed_table[i, :] = locked_table_idx
+    if 0 not in locked_indices:
+        fixed_table[0, 0] = 0
+    fixed = fixed_table >= 0
+    movable_person = np.array([i not in locked_indices for i in range(n)], dtype=bool)
+
+    # Cost of one (trait, table) cell at a given count, including hard-bound penalties.
+    def _cell_cost(traits: np.ndarray, tables, count: np.ndarray) -> np.ndarray:
+        cost = _deviation_cost(count - v[traits], w1_bar[traits], w2_bar[traits], w1[traits], w2[traits])
+        if v_bar is not None:
+            cost = cost + _HEURISTIC_HARD_PENALTY * np.maximum(count - v_bar[traits, tables], 0.0) * has_holders[traits]
+        if v_under is not None:
+            cost = cost + _HEURISTIC_HARD_PENALTY * np.maximum(v_under[traits, tables] - count, 0.0) * has_holders[traits]
+        return cost
+
+    def _total_cost(assignment: np.ndarray) -> float:
+        cost = _schedule_objective(params, assignment)
+        if v_bar is None and v_under is None:
+            return cost
+        all_traits = np.arange(incidence.shape[1])[:, None]
+        all_tables = np.arange(num_t)[None, :]
+        for counts in scoring.table_trait_counts(incidence, assignment, num_t).transpose(0, 2, 1):
+            base = _deviation_cost(
+                counts - v[:, None], w1_bar[:, None], w2_bar[:, None], w1[:, None], w2[:, None]
+            )
+            cost += float((_cell_cost(all_traits, all_tables, counts) - base).sum())
+        return cost
+
+    def _construct(num_used: int) -> np.ndarray | None:
+        sizes = np.full(num_used, n // num_used, dtype=np.int64)
+        sizes[: n % num_used] += 1
+        assignment = np.full((n, num_r), -1, dtype=np.int64)
+        meet = np.zeros((n, n), dtype=np.int32)
+        rarity = (incidence / np.maximum(incidence.sum(axis=0), 1)).sum(axis=1)
+        for r in range(num_r):
+            counts = np.zeros((incidence.shape[1], num_t), dtype=np.float64)
+            occupancy = np.zeros(num_t, dtype=np.int64)
+            seated_first = np.flatnonzero(fixed[:, r])
+            for i in seated_first:
+                t = fixed_table[i, r]
+                if t >= num_used:
+                    return None
+                assignment[i, r] = t
+                occupancy[t] += 1
+                counts[held[i], t] += 1
+            if (occupancy[:num_used] > u).any():
+                return None
+            target = np.maximum(sizes, occupancy[:num_used])
+            others = np.flatnonzero(~fixed[:, r])
+            others = others[np.lexsort((rng.random(len(others)), -rarity[others]))]
+            for i in others:
+                allowed = np.ones(num_used, dtype=bool)
+                if r > 0 and movable_person[i]:
+                    allowed[assignment[i, r - 1]] = False
+                for j in partners[i]:
+                    if assignment[j, r] >= 0:
+                        allowed[assignment[j, r]] = False
+                open_tables = allowed & (occupancy[:num_used] < target)
+                if not open_tables.any():
+                    open_tables = allowed & (occupancy[:num_used] < u)
+                if not open_tables.any():
+                    return None
+                candidates = np.flatnonzero(open_tables)
+                traits = held[i][:, None]
+                current = counts[held[i]][:, candidates]
+                delta = (_cell_cost(traits, candidates[None, :], current + 1) - _cell_cost(traits, candidates[None, :], current)).sum(axis=0)
+                if lam > 0.0:
+                    seated = assignment[:, r] >= 0
+                    met_before = np.bincount(
+                        assignment[seated, r],
+                        weights=(meet[i, seated] >= 1).astype(np.float64),
+                        minlength=num_t,
                     )
+                    delta = delta + lam * met_before[candidates]
+                order = np.lexsort((rng.random(len(candidates)), occupancy[candidates], delta))
+                t = candidates[order[0]]
+                assignment[i, r] = t
+                occupancy[t] += 1
+                counts[held[i], t] += 1
+            if (occupancy[:num_used] < l).any():
+                return None
+            tables = assignment[:, r]
+            meet += (tables[:, None] == tables[None, :]).astype(np.int32)
+        np.fill_diagonal(meet, 0)
+        return assignment
+
+    # Admissible numbers of used tables: every table of a round needs at least l people, and locks must fit.
+    min_used = max(1, -(-n // u), max(locked_indices.values(), default=-1) + 1)
+    max_used = min(num_t, n // l)
+    best_assignment = None
+    best_cost = float("inf")
+    if start_assignment is not None and _is_feasible_assignment(params, start_assignment):
+        best_assignment = start_assignment.copy()
+    for num_used in range(max_used, min_used - 1, -1) if best_assignment is None else ():
+        candidate = _construct(num_used)
+        if candidate is None:
+            continue
+        cost = _total_cost(candidate)
+        if cost < best_cost:
+            best_assignment, best_cost = candidate, cost
+        if _out_of_time() and best_assignment is not None:
+            break
+    if best_assignment is None:
+        return None
+    _publish(best_assignment)
+
+    assignment = best_assignment.copy()
+    num_used = int(assignment.max()) + 1
+    counts = np.zeros((incidence.shape[1], num_t, num_r), dtype=np.float64)
+    sizes = np.zeros((num_t, num_r), dtype=np.int64)
+    for r in range(num_r):
+        np.add.at(sizes[:, r], assignment[:, r], 1)
+        for i in range(n):
+            counts[held[i], assignment[i, r], r] += 1
+    meet = _pair_meeting_counts(assignment)
+    table_range = np.arange(num_used)
+
+    def _leave_delta(i: int, t: int, r: int, exclude: int = -1) -> float:
+        traits = held[i]
+        current = counts[traits, t, r]
+        delta = float((_cell_cost(traits, t, current - 1) - _cell_cost(traits, t, current)).sum())
+        if lam > 0.0:
+            members = assignment[:, r] == t
+            members[i] = False
+            if exclude >= 0:
+                members[exclude] = False
+            delta -= lam * float(np.count_nonzero(meet[i, members] >= 2))
+        return delta
+
+    def _join_delta(i: int, t: int, r: int, exclude: int = -1, shift=None) -> float:
+        traits = held[i]
+        current = counts[traits, t, r]
+        if shift is not None:
+            current = current + shift[traits]
+        delta = float((_cell_cost(traits, t, current + 1) - _cell_cost(traits, t, current)).sum())
+        if lam > 0.0:
+            members = assignment[:, r] == t
+            members[i] = False
+            if exclude >= 0:
+                members[exclude] = False
+            delta += lam * float(np.count_nonzero(meet[i, members] >= 1))
+        return delta
+
+    def _allowed_tables(i: int, r: int) -> np.ndarray:
+        allowed = np.ones(num_used, dtype=bool)
+        if movable_person[i]:
+            if r > 0:
+                allowed[assignment[i, r - 1]] = False
+            if r + 1 < num_r:
+                allowed[assignment[i, r + 1]] = False
+        for j in partners[i]:
+            allowed[assignment[j, r]] = False
+        return allowed
+
+    def _apply(i: int, r: int, t_new: int) -> None:
+        t_old = assignment[i, r]
+        members_old = np.flatnonzero(assignment[:, r] == t_old)
+        members_old = members_old[members_old != i]
+        members_new = np.flatnonzero(assignment[:, r] == t_new)
+        meet[i, members_old] -= 1
+        meet[members_old, i] -= 1
+        meet[i, members_new] += 1
+        meet[members_new, i] += 1
+        counts[held[i], t_old, r] -= 1
+        counts[held[i], t_new, r] += 1
+        sizes[t_old, r] -= 1
+        sizes[t_new, r] += 1
+        assignment[i, r] = t_new
+
+    # Tries every move of (i, r) to another table and a sample of swaps; applies the best improving one.
+    def _improve_seat(i: int, r: int) -> bool:
+        t = int(assignment[i, r])
+        allowed = _allowed_tables(i, r)
+        best_delta = -1e-9
+        best_move = None
+        if sizes[t, r] > l:
+            open_tables = allowed & (sizes[:num_used, r] < u)
+            open_tables[t] = False
+            leave = _leave_delta(i, t, r)
+            for t_new in table_range[open_tables]:
+                delta = leave + _join_delta(i, int(t_new), r)
+                if delta < best_delta:
+                    best_delta, best_move = delta, ("move", int(t_new), -1)
+
+        candidates = np.flatnonzero((assignment[:, r] != t) & ~fixed[:, r])
+        if len(candidates):
+            sample = rng.choice(candidates, size=min(8, len(candidates)), replace=False)
+            for j in sample:
+                j = int(j)
+                t_j = int(assignment[j, r])
+                if not allowed[t_j] or not _allowed_tables(j, r)[t]:
+                    continue
+                # Moving i to t_j and j to t at the same time: each side sees the other's traits already gone.
+                shift_i = np.zeros(incidence.shape[1])
+                shift_i[held[j]] -= 1
+                shift_j = np.zeros(incidence.shape[1])
+                shift_j[held[i]] -= 1
+                delta = (
+                    _leave_delta(i, t, r, exclude=-1)
+                    + _leave_delta(j, t_j, r, exclude=-1)
+                    + _join_delta(i, t_j, r, exclude=j, shift=shift_i)
+                    + _join_delta(j, t, r, exclude=i, shift=shift_j)
+                )
+                if delta < best_delta:
+                    best_delta, best_move = delta, ("swap", t_j, j)
+
+        if best_move is None:
+            return False
+        kind, t_new, j = best_move
+        if kind == "move":
+            _apply(i, r, t_new)
+        else:
+            _apply(i, r, t_new)
+            _apply(j, r, t)
+        return True
+
+    seats = [(i, r) for i in range(n) for r in range(num_r) if not fixed[i, r]]
+    best_cost = _total_cost(assignment)
+    best_assignment = assignment.copy()
+    stale_kicks = 0
+    while seats and best_cost > lower_bound + 1e-9 and not _out_of_time():
+        improved = False
+        for position in rng.permutation(len(seats)):
+            i, r = seats[position]
+            if _improve_seat(i, r):
+                improved = True
+            if _out_of_time():
+                break
+        if improved:
+            continue
 
-    for r in R:
-        col = f"Round_{r + 1}_Table"
-        work_df[col] = [row_assignments.get((i, r), None) for i in I]
+        # Local optimum: keep it if best, then kick a few random seats and search again.
+        cost = _total_cost(assignment)
+        if cost < best_cost - 1e-9:
+            best_cost, best_assignment = cost, assignment.copy()
+            stale_kicks = 0
+            _publish(best_assignment)
+        elif cost > best_cost + 1e-9:
+            assignment[:] = best_assignment
+            counts[:] = 0
+            sizes[:] = 0
+            for r in range(num_r):
+                np.add.at(sizes[:, r], assignment[:, r], 1)
+                for i in range(n):
+                    counts[held[i], assignment[i, r], r] += 1
+            meet[:] = _pair_meeting_counts(assignment)
+        if stale_kicks >= max_stale_kicks or best_cost <= lower_bound + 1e-9:
+            break
+        stale_kicks += 1
+        for _ in range(max(1, len(seats) // 20)):
+            i, r = seats[rng.integers(len(seats))]
+            t = int(assignment[i, r])
+            options = np.flatnonzero(_allowed_tables(i, r) & (sizes[:num_used, r] < u))
+            options = options[options != t]
+            if len(options) and sizes[t, r] > l:
+                _apply(i, r, int(rng.choice(options)))
+
+    cost = _total_cost(assignment)
+    if cost < best_cost:
+        best_cost, best_assignment = cost, assignment.copy()
+    if not _is_feasible_assignment(params, best_assignment):
+        return None
+    return best_assignment
+
+
+# The relabeled copy of a feasible schedule that the symmetry_breaking pieces of _build_model keep, so it can still
+# serve as a MIP start: rounds reversed if the first round costs more than the last (with the anchored person's
+# table swapped back to table 1), then the interchangeable tables renumbered by the lowest index they seat in round 1.
+def _canonical_assignment(
+    params: dict,
+    assignment: np.ndarray,
+    symmetry_breaking: tuple[str, ...],
+    *,
+    anchor: bool = True,
+) -> np.ndarray:
+    assignment = assignment.copy()
+    if "rounds" in symmetry_breaking and params["B"].shape[1] and _reversible_rounds(params, anchor=anchor):
+        round_costs = _round_deviation_costs(params, assignment)
+        if round_costs[0] > round_costs[-1]:
+            assignment = assignment[:, ::-1].copy()
+            if anchor and 0 not in params["locked_indices"]:
+                relabel = np.arange(len(params["T"]))
+                relabel[[0, assignment[0, 0]]] = relabel[[assignment[0, 0], 0]]
+                assignment = relabel[assignment]
+
+    symmetric = _symmetric_tables(params, anchor=anchor) if {"tables", "first_seats"} & set(symmetry_breaking) else []
+    if len(symmetric) > 1:
+        first_seated = [np.flatnonzero(assignment[:, 0] == t).min() for t in symmetric]
+        relabel = np.arange(len(params["T"]))
+        relabel[symmetric[np.argsort(first_seated)]] = symmetric
+        assignment = relabel[assignment]
+    return assignment
+
+
+# Full column vector for the model built by _build_model that encodes a given schedule, used as a MIP start.
+def _mip_start_values(params: dict, columns: dict, assignment: np.ndarray, num_col: int) -> np.ndarray:
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+    values = np.zeros(num_col, dtype=np.float64)
+
+    seats = np.zeros((n, num_t, num_r), dtype=np.float64)
+    person, round_idx = np.nonzero(assignment >= 0)
+    seats[person, assignment[person, round_idx], round_idx] = 1.0
+    values[columns["Y"]] = seats
+    values[columns["W"]] = (seats.sum(axis=0) > 0).astype(np.float64)
+
+    counts = np.einsum("ic,itr->ctr", params["B"], seats)
+    deviation = counts - params["v_arr"][:, None, None]
+    over = np.maximum(deviation, 0.0)
+    under = np.maximum(-deviation, 0.0)
+    first_over = (params["w1_bar_arr"] <= params["w2_bar_arr"])[:, None, None]
+    first_under = (params["w1_arr"] <= params["w2_arr"])[:, None, None]
+    e1_bar = np.where(first_over, np.minimum(over, 1.0), 0.0)
+    e1 = np.where(first_under, np.minimum(under, 1.0), 0.0)
+    values[columns["E1_bar"]] = e1_bar
+    values[columns["E2_bar"]] = over - e1_bar
+    values[columns["E1"]] = e1
+    values[columns["E2"]] = under - e1
+
+    if len(columns["pair_i"]):
+        together = (assignment[columns["pair_i"]] == assignment[columns["pair_j"]]).astype(np.float64)
+        values[columns["P"]] = together
+        values[columns["H"]] = together.max(axis=1) if num_r else 0.0
+    if len(columns["met_i"]):
+        values[columns["Q"]] = assignment[columns["met_i"]] == assignment[columns["met_j"]]
+    return values
+
+
+# Pairs that share a table in two or more rounds of the schedule encoded by col_value without the matching
+# excess-meeting column paying for it. Returns the assignment plus (i, j, required_excess) for each such pair.
+# Pairs the model already prices per meeting (met_pairs of _build_model) are left out.
+def _unpaid_repeat_meetings(
+    col_value: np.ndarray,
+    columns: dict,
+    excess_columns: dict[tuple[int, int], int],
+) -> tuple[np.ndarray, list[tuple[int, int, float]]]:
+    assignment = _assignment_from_solution(col_value, columns)
+    meetings = np.triu(_pair_meeting_counts(assignment), k=1)
+    meetings[columns["met_i"], columns["met_j"]] = 0
+    unpaid = []
+    for i, j in zip(*np.nonzero(meetings >= 2)):
+        required = float(meetings[i, j] - 1)
+        column = excess_columns.get((int(i), int(j)))
+        if column is None or col_value[column] < required - 0.5:
+            unpaid.append((int(i), int(j), required))
+    return assignment, unpaid
+
+
+# Solves the compact formulation by lazy cut generation. The initial model has no pair terms. Whenever HiGHS finds
+# an improving schedule in which some pair shares a table in two or more rounds without paying for it, the solve
+# is interrupted and that pair gets an excess-meeting column X[i, j] >= 0 (cost lambda) plus the cut
+#     X[i, j] >= sum over the shared rounds r of (Y[i, t_r, r] + Y[j, t_r, r] - 1) - 1,
+# where t_r is the table they shared in round r. The cuts hold for every schedule, so each restricted model is
+# a relaxation of the full formulation and its dual bound is valid for it; once a solve finishes with no unpaid
+# repeat meeting, the incumbent is optimal for the full formulation. Each re-solve is warm-started from the best
+# schedule found so far, which start_assignment seeds when given. Schedules are ranked by objective_fn, which
+# defaults to the full objective of params. The loop ends early once monitor reports a stop request; attaching the
+# monitor to the model is left to the caller. Returns the best schedule, its objective value and the best dual bound.
+# The compact formulation is meant for large events only, where the full formulation's pair rows dominate the model:
+# it reaches the same optimum (tests/test_formulations.py), but on small events each cut round restarts HiGHS and
+# the full formulation solves faster.
+def _solve_with_pair_cuts(
+    model: highspy.Highs,
+    columns: dict,
+    params: dict,
+    *,
+    time_limit_seconds: float | None = None,
+    start_assignment: np.ndarray | None = None,
+    objective_fn=None,
+    monitor: _SolveMonitor | None = None,
+) -> tuple[np.ndarray, float, float]:
+    Y = columns["Y"]
+    lam = float(params["lam"])
+    if objective_fn is None:
+        objective_fn = lambda assignment: _schedule_objective(params, assignment)
+    deadline = None if time_limit_seconds is None else time.monotonic() + float(time_limit_seconds)
+    excess_columns: dict[tuple[int, int], int] = {}
+    best_assignment = None
+    best_objective = float("inf")
+    best_bound = -float("inf")
+
+    interrupt_requested = False
+
+    def _interrupt_on_unpaid_repeat(event) -> None:
+        nonlocal interrupt_requested
+        values = np.asarray(event.data_out.mip_solution, dtype=np.float64)
+        if _unpaid_repeat_meetings(values, columns, excess_columns)[1]:
+            interrupt_requested = True
+            event.interrupt()
+
+    # HiGHS keeps the interrupt flag from one run of the model to the next, which would end every re-solve at
+    # its first interrupt check. This handler, subscribed after any of the caller's, rewrites the flag each time.
+    def _hold_interrupt(event) -> None:
+        event.interrupt(interrupt_requested or (monitor is not None and monitor.stop_requested()))
+
+    # Adds the excess-meeting columns and cuts for the unpaid pairs of assignment.
+    def _add_cuts(assignment: np.ndarray, unpaid: list[tuple[int, int, float]]) -> None:
+        first_new = model.getNumCol()
+        next_column = first_new
+        cut_lower = []
+        cut_starts = []
+        cut_index = []
+        for i, j, _ in unpaid:
+            column = excess_columns.get((i, j))
+            if column is None:
+                column = next_column
+                next_column += 1
+                excess_columns[i, j] = column
+            shared_rounds = np.flatnonzero(assignment[i] == assignment[j]).tolist()
+            cut_starts.append(len(cut_index))
+            cut_index.append(column)
+            for r in shared_rounds:
+                t = int(assignment[i, r])
+                cut_index.extend([int(Y[i, t, r]), int(Y[j, t, r])])
+            cut_lower.append(-float(len(shared_rounds)) - 1.0)
+
+        count = next_column - first_new
+        if count:
+            model.addVars(count, np.zeros(count), np.full(count, highspy.kHighsInf))
+            model.changeColsCost(count, np.arange(first_new, first_new + count, dtype=np.int32), np.full(count, lam))
+        if cut_lower:
+            index = np.array(cut_index, dtype=np.int32)
+            values = -np.ones(len(index), dtype=np.float64)
+            values[np.array(cut_starts, dtype=np.int64)] = 1.0
+            model.addRows(
+                len(cut_lower),
+                np.array(cut_lower, dtype=np.float64),
+                np.full(len(cut_lower), highspy.kHighsInf),
+                len(index),
+                np.array(cut_starts, dtype=np.int32),
+                index,
+                values,
+            )
+
+    # Warm-starts the next solve from a schedule, with every excess-meeting column set to its repeat count.
+    def _set_start(assignment: np.ndarray) -> None:
+        values = _mip_start_values(params, columns, assignment, model.getNumCol())
+        meetings = _pair_meeting_counts(assignment)
+        for (i, j), column in excess_columns.items():
+            values[column] = max(0.0, float(meetings[i, j] - 1))
+        model.setSolution(len(values), np.arange(len(values), dtype=np.int32), values)
+
+    if lam > 0.0:
+        model.cbMipImprovingSolution.subscribe(_interrupt_on_unpaid_repeat)
+        model.cbMipInterrupt.subscribe(_hold_interrupt)
+
+    if start_assignment is not None:
+        best_assignment = start_assignment
+        best_objective = objective_fn(start_assignment)
+        if lam > 0.0:
+            start_values = _mip_start_values(params, columns, start_assignment, model.getNumCol())
+            _add_cuts(start_assignment, _unpaid_repeat_meetings(start_values, columns, excess_columns)[1])
+        _set_start(start_assignment)
+
+    while True:
+        if deadline is not None:
+            model.setOptionValue("time_limit", max(0.0, deadline - time.monotonic()))
+        interrupt_requested = False
+        model.run()
+        status = model.getModelStatus()
+        info = model.getInfo()
+        if status == highspy.HighsModelStatus.kInterrupt:
+            if info.primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+                raise RuntimeError(f"Optimization failed with status {status}")
+        else:
+            _check_solution_status(model)
+
+        col_value = np.asarray(model.getSolution().col_value, dtype=np.float64)
+        assignment, unpaid = _unpaid_repeat_meetings(col_value, columns, excess_columns)
+        best_bound = max(best_bound, float(info.mip_dual_bound))
+        objective = objective_fn(assignment)
+        if objective < best_objective:
+            best_assignment, best_objective = assignment, objective
+
+        if not unpaid or lam <= 0.0:
+            break
+        if status not in (highspy.HighsModelStatus.kOptimal, highspy.HighsModelStatus.kInterrupt):
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if monitor is not None and monitor.stop_requested():
+            break
+        _add_cuts(assignment, unpaid)
+        _set_start(best_assignment)
+
+    return best_assignment, best_objective, best_bound
+
+
+# Re-optimizes the consecutive rounds in `rounds` with every other round of assignment held fixed (rounds that are
+# still -1 are ignored). The window model is the compact formulation over len(rounds) rounds; the no-same-table rule
+# towards the fixed neighbouring rounds becomes zero upper bounds on Y, and pairs that met in a fixed round are
+# priced per meeting through met_pairs, so the window objective matches the full objective of the merged schedule.
+# start_window, when given, must be feasible for the window. Returns a copy of assignment with the window replaced.
+def _solve_round_window(
+    params: dict,
+    assignment: np.ndarray,
+    rounds: list[int],
+    *,
+    time_limit_seconds: float | None = None,
+    start_window: np.ndarray | None = None,
+    debug: bool = False,
+    monitor: _SolveMonitor | None = None,
+) -> np.ndarray:
+    n = len(params["I"])
+    num_r = assignment.shape[1]
+    locked_indices = params["locked_indices"]
+    window_params = dict(params, R=range(len(rounds)))
+    outside = assignment.copy()
+    outside[:, rounds] = -1
+    met_i, met_j = np.nonzero(np.triu(_pair_meeting_counts(outside), k=1))
+    model, columns = _build_model(
+        window_params, formulation="compact", anchor=rounds[0] == 0, met_pairs=(met_i, met_j)
+    )
+    model.setOptionValue("output_flag", bool(debug))
+
+    Y = columns["Y"]
+    movable = np.array([i not in locked_indices for i in range(n)], dtype=bool)
+    blocked = [np.empty(0, dtype=np.int64)]
+    for neighbour, local_round in ((rounds[0] - 1, 0), (rounds[-1] + 1, len(rounds) - 1)):
+        if 0 <= neighbour < num_r:
+            people = np.flatnonzero(movable & (assignment[:, neighbour] >= 0))
+            blocked.append(Y[people, assignment[people, neighbour], local_round])
+    blocked = np.concatenate(blocked).astype(np.int32)
+    if len(blocked):
+        model.changeColsBounds(len(blocked), blocked, np.zeros(len(blocked)), np.zeros(len(blocked)))
+
+    def _merged(window: np.ndarray) -> np.ndarray:
+        merged = assignment.copy()
+        merged[:, rounds] = window
+        return merged
+
+    if monitor is not None:
+        monitor.attach(model, columns, to_schedule=_merged)
+    window, _, _ = _solve_with_pair_cuts(
+        model,
+        columns,
+        window_params,
+        time_limit_seconds=time_limit_seconds,
+        start_assignment=start_window,
+        objective_fn=lambda window: _schedule_objective(params, _merged(window)),
+        monitor=monitor,
+    )
+    return _merged(window)
+
+
+# Round-by-round decomposition for events with many rounds, where the joint model grows too large to solve.
+# Rounds are seated one at a time, each by a single-round MIP that pays lambda for seating a pair that already met
+# and forbids everyone's previous table. With repair=True a rolling-horizon pass then re-optimizes each pair of
+# adjacent rounds jointly with the rest held fixed, starting from the current schedule, so it never gets worse.
+# start_assignment (a feasible schedule, e.g. from the heuristic) replaces the forward pass result when better.
+# The time limit is shared evenly between the window solves that remain, and a stop request through monitor
+# skips the repair windows still to come. Raises RuntimeError when a round cannot be seated given the rounds
+# before it.
+def _solve_by_decomposition(
+    params: dict,
+    *,
+    time_limit_seconds: float | None = None,
+    start_assignment: np.ndarray | None = None,
+    repair: bool = True,
+    debug: bool = False,
+    monitor: _SolveMonitor | None = None,
+) -> np.ndarray:
+    n = len(params["I"])
+    num_r = len(params["R"])
+    deadline = None if time_limit_seconds is None else time.monotonic() + float(time_limit_seconds)
+    windows = [[r] for r in range(num_r)]
+    if repair:
+        windows += [[r, r + 1] for r in range(num_r - 1)]
+
+    def _window_seconds(position: int) -> float | None:
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic()) / (len(windows) - position)
+
+    assignment = np.full((n, num_r), -1, dtype=np.int64)
+    for r in range(num_r):
+        assignment = _solve_round_window(
+            params, assignment, [r], time_limit_seconds=_window_seconds(r), debug=debug, monitor=monitor
+        )
+    if start_assignment is not None and _schedule_objective(params, start_assignment) < _schedule_objective(
+        params, assignment
+    ):
+        assignment = start_assignment.copy()
+
+    for position in range(num_r, len(windows)):
+        if monitor is not None and monitor.stop_requested():
+            break
+        rounds = windows[position]
+        assignment = _solve_round_window(
+            params,
+            assignment,
+            rounds,
+            time_limit_seconds=_window_seconds(position),
+            start_window=assignment[:, rounds],
+            debug=debug,
+            monitor=monitor,
+        )
+    return assignment
+
+
+# Share of the time limit kept for seating individuals after the profile model (method="profiles"), and its cap.
+_PROFILE_SEATING_TIME_SHARE = 0.2
+_PROFILE_SEATING_MAX_SECONDS = 30.0
+
+# Reductions of _presolve_bounds that apply to the profile model, which has no per-person seat columns.
+_PROFILE_MODEL_REDUCTIONS = (
+    "used_tables_fixed",
+    "unused_tables_fixed",
+    "deviation_bounds_tightened",
+    "trait_rows_dropped",
+)
+
+
+# Participants grouped by trait profile: unlocked participants whose rows of the incidence matrix B are identical
+# are interchangeable to every balance term. Returns the profile of every participant (-1 for locked ones), the
+# profiles' rows of B and the number of members of each.
+def _trait_profiles(params: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n = len(params["I"])
+    incidence = params["B"]
+    profile_of = np.full(n, -1, dtype=np.int64)
+    unlocked = np.array([i not in params["locked_indices"] for i in range(n)], dtype=bool)
+    if not unlocked.any():
+        return profile_of, np.zeros((0, incidence.shape[1])), np.zeros(0, dtype=np.int64)
+    profiles, inverse, sizes = np.unique(incidence[unlocked], axis=0, return_inverse=True, return_counts=True)
+    profile_of[unlocked] = inverse.ravel()
+    return profile_of, profiles, sizes
+
+
+# Balance-only model over trait profiles (method="profiles"). X[p, t, r] counts the members of profile p seated at
+# table t in round r; W and the E* deviations are those of _build_model, with the presolve bounds, and locked
+# participants enter through the right-hand sides as in _build_model's presolve. Each profile seats all its members
+# every round, the members at a table must all move in the next round (X[p, t, r] + X[p, t, r + 1] <= members),
+# members separated from someone locked at a table are kept out of it, and the anchored participant's profile has
+# someone at table 1 in round 1. Any schedule of individuals maps onto a feasible X of the same deviation cost, so
+# the model's dual bound plus the repeat meetings every schedule pays (pairs locked to the same table, in the
+# objective offset) bounds the event's objective. Repeat meetings and separations between unlocked participants
+# are left to _seat_profiles. Returns the model and a dict with the X, W and E* columns.
+def _build_profile_model(
+    params: dict, profile_of: np.ndarray, profiles: np.ndarray, sizes: np.ndarray
+) -> tuple[highspy.Highs, dict]:
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+    l = params["l"]
+    u = params["u"]
+    v_bar = params["v_bar_arr"]
+    v_under = params["v_under_arr"]
+    num_p = len(sizes)
+    num_traits = profiles.shape[1]
+    trait_shape = (num_traits, num_t, num_r)
+    inf = highspy.kHighsInf
+    integer = highspy.HighsVarType.kInteger
+    builder = _ColumnarModel()
+
+    bounds = _presolve_bounds(params)
+    unlocked = profile_of >= 0
+    membership = np.zeros((n, num_p))
+    membership[np.flatnonzero(unlocked), profile_of[unlocked]] = 1.0
+    barred = membership.T @ ((bounds["seat_upper"] == 0.0) & (bounds["w_upper"] > 0.0)[None, :])
+    x_upper = np.minimum(np.maximum(sizes[:, None] - barred, 0.0), u) * bounds["w_upper"][None, :]
+    x_lower = np.zeros((num_p, num_t, num_r))
+    if n and unlocked[0]:
+        x_lower[profile_of[0], 0, 0] = 1.0
+    locked_count = np.repeat(bounds["locked_count"], num_r)
+    locked_traits = np.repeat(bounds["locked_traits"], num_r, axis=1)
+    always_meet = float((bounds["locked_count"] * (bounds["locked_count"] - 1) / 2).sum())
+    builder.offset += params["lam"] * max(num_r - 1, 0) * always_meet
+
+    def _per_trait(values: np.ndarray) -> np.ndarray:
+        return values[:, None, None]
+
+    over_cap = bounds["over_cap"][:, :, None]
+    under_cap = bounds["under_cap"][:, :, None]
+    X = builder.add_vars((num_p, num_t, num_r), x_lower, x_upper[:, :, None], integrality=integer)
+    W = builder.add_vars((num_t, num_r), bounds["w_lower"][:, None], bounds["w_upper"][:, None], integrality=integer)
+    E1_bar = builder.add_vars(
+        trait_shape, 0.0, np.minimum(over_cap, 1.0), cost=_per_trait(params["w1_bar_arr"]), integrality=integer
+    )
+    E2_bar = builder.add_vars(trait_shape, 0.0, over_cap, cost=_per_trait(params["w2_bar_arr"]), integrality=integer)
+    E1 = builder.add_vars(
+        trait_shape, 0.0, np.minimum(under_cap, 1.0), cost=_per_trait(params["w1_arr"]), integrality=integer
+    )
+    E2 = builder.add_vars(trait_shape, 0.0, under_cap, cost=_per_trait(params["w2_arr"]), integrality=integer)
+
+    # Formulation constraints (2) and (3) over profile counts.
+    table_rows = np.concatenate([X.transpose(1, 2, 0), W[:, :, None]], axis=2).reshape(num_t * num_r, num_p + 1)
+    builder.add_rows(-locked_count, inf, table_rows, np.append(np.ones(num_p), -float(l)), family="table_size")
+    builder.add_rows(-inf, -locked_count, table_rows, np.append(np.ones(num_p), -float(u)), family="table_size")
+
+    # Formulation constraint (4) per profile: every member is seated once per round.
+    seated = np.repeat(sizes, num_r)
+    builder.add_rows(seated, seated, X.transpose(0, 2, 1).reshape(num_p * num_r, num_t), 1.0, family="profile_sizes")
+
+    # Extension: nobody stays at the same table in consecutive rounds, summed over a profile.
+    if num_r > 1:
+        consecutive = np.stack([X[:, :, :-1], X[:, :, 1:]], axis=-1).reshape(-1, 2)
+        builder.add_rows(-inf, np.repeat(sizes, num_t * (num_r - 1)), consecutive, 1.0, family="consecutive_rounds")
+
+    # Formulation constraint (6): used tables fill sequentially.
+    if num_t > 1:
+        order_rows = np.stack([W[:-1, :], W[1:, :]], axis=-1).reshape(-1, 2)
+        builder.add_rows(0.0, inf, order_rows, [1.0, -1.0], family="table_order")
+
+    # Formulation constraint (7) and the optional hard trait bounds over the profiles holding each trait.
+    holders = [np.flatnonzero(profiles[:, c]) for c in range(num_traits)]
+
+    def _trait_count_columns(c: int) -> np.ndarray:
+        return X[holders[c]].transpose(1, 2, 0).reshape(num_t * num_r, len(holders[c]))
+
+    deviation_values = np.array([-1.0, -1.0, 1.0, 1.0])
+    for c in range(num_traits):
+        deviations = np.stack([E1_bar[c], E2_bar[c], E1[c], E2[c]], axis=-1).reshape(num_t * num_r, 4)
+        target = params["v_arr"][c] - locked_traits[c]
+        builder.add_rows(
+            target,
+            target,
+            np.concatenate([_trait_count_columns(c), deviations], axis=1),
+            np.concatenate([profiles[holders[c], c], deviation_values]),
+            family="trait_targets",
+        )
+    for hard_bounds, implied, family in (
+        (v_bar, bounds["upper_implied"], "trait_upper_bounds"),
+        (v_under, bounds["lower_implied"], "trait_lower_bounds"),
+    ):
+        if hard_bounds is None:
+            continue
+        for c in range(num_traits):
+            bound = np.repeat(hard_bounds[c], num_r)
+            bounded = np.isfinite(bound) & ~np.repeat(implied[c], num_r)
+            if (len(holders[c]) or locked_traits[c].any()) and bounded.any():
+                rhs = bound[bounded] - locked_traits[c][bounded]
+                lower, upper = (-inf, rhs) if family == "trait_upper_bounds" else (rhs, inf)
+                builder.add_rows(
+                    lower, upper, _trait_count_columns(c)[bounded], profiles[holders[c], c], family=family
+                )
 
-    schedule_df = pd.DataFrame(round_table_rows)
-    if not schedule_df.empty:
-        schedule_df = schedule_df.sort_values(["Round", "Table", "Participant_ID"], kind="stable")
+    columns = {
+        "X": X,
+        "W": W,
+        "E1_bar": E1_bar,
+        "E2_bar": E2_bar,
+        "E1": E1,
+        "E2": E2,
+        "trait_keys": params["trait_keys"],
+        "row_families": builder.row_families,
+        "presolve": {
+            key: value for key, value in bounds["reductions"].items() if key in _PROFILE_MODEL_REDUCTIONS
+        },
+    }
+    return builder.to_highs(), columns
+
+
+# Seats individuals into the profile counts of _build_profile_model's solution (counts[p, t, r]), so the schedule
+# keeps the model's deviation cost. Rounds are seated in order: locked participants and the anchor first, then every
+# profile's members at its tables, each where they meet the fewest people they met before and break no separation
+# or consecutive-round rule. Simulated annealing then proposes swaps of a costly seat with a member of the same
+# profile at another table of that round (which leaves every table's trait counts unchanged), cooling from lambda
+# to lambda / 20 over time_limit_seconds, and keeps the cheapest seating seen. The schedule is time-based, so the
+# search runs for the whole time_limit_seconds unless the seating reaches zero repeat meetings and broken rules or
+# stop_event is set. Returns an (n, R) table-index matrix, or None when the best seating breaks a hard constraint.
+def _seat_profiles(
+    params: dict,
+    profile_of: np.ndarray,
+    counts: np.ndarray,
+    *,
+    time_limit_seconds: float | None = None,
+    seed: int = 0,
+    stop_event=None,
+) -> np.ndarray | None:
+    budget = _HEURISTIC_DEFAULT_SECONDS if time_limit_seconds is None else max(0.0, float(time_limit_seconds))
+    deadline = time.monotonic() + budget
+
+    def _out_of_time() -> bool:
+        return time.monotonic() >= deadline or (stop_event is not None and stop_event.is_set())
+    rng = np.random.default_rng(seed)
+
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+    lam = float(params["lam"])
+    locked_indices = params["locked_indices"]
+    members = [np.flatnonzero(profile_of == p) for p in range(counts.shape[0])]
+    partners: list[list[int]] = [[] for _ in range(n)]
+    for i, j in params["separation_pairs_indices"]:
+        partners[i].append(j)
+        partners[j].append(i)
 
-    objective = getattr(info, "objective_function_value", None)
-    if objective is None:
-        objective = 0.0
+    assignment = np.full((n, num_r), -1, dtype=np.int64)
+    for i, locked_table_idx in locked_indices.items():
+        assignment[i, :] = locked_table_idx
+    anchored = n > 0 and 0 not in locked_indices
+    meet = np.zeros((n, n), dtype=np.int32)
+
+    # Cost of person i sitting at table t in round r: lambda for everyone already there (other than exclude) whom i
+    # meets in another round, plus a hard penalty per broken separation or consecutive-round rule.
+    def _seat_cost(i: int, r: int, t: int, exclude: int = -1) -> float:
+        cost = 0.0
+        if i not in locked_indices:
+            for neighbour in (r - 1, r + 1):
+                if 0 <= neighbour < num_r and assignment[i, neighbour] == t:
+                    cost += _HEURISTIC_HARD_PENALTY
+        for j in partners[i]:
+            if j != exclude and assignment[j, r] == t:
+                cost += _HEURISTIC_HARD_PENALTY
+        if lam > 0.0:
+            table_members = assignment[:, r] == t
+            table_members[[i, exclude] if exclude >= 0 else i] = False
+            shared = 1 if assignment[i, r] == t else 0
+            cost += lam * float(np.count_nonzero(meet[i, table_members] > shared))
+        return cost
+
+    for r in range(num_r):
+        slots = counts[:, :, r].copy()
+        if anchored and r == 0:
+            assignment[0, 0] = 0
+            slots[profile_of[0], 0] -= 1
+        for i in rng.permutation(np.flatnonzero(assignment[:, r] < 0)):
+            p = profile_of[i]
+            options = np.flatnonzero(slots[p] > 0)
+            costs = np.zeros(len(options))
+            if r > 0:
+                costs += _HEURISTIC_HARD_PENALTY * (options == assignment[i, r - 1])
+            for j in partners[i]:
+                costs += _HEURISTIC_HARD_PENALTY * (options == assignment[j, r])
+            if lam > 0.0:
+                seated = assignment[:, r] >= 0
+                met_before = np.bincount(
+                    assignment[seated, r], weights=(meet[i, seated] >= 1).astype(np.float64), minlength=num_t
+                )
+                costs += lam * met_before[options]
+            t = int(options[np.lexsort((rng.random(len(options)), costs))[0]])
+            assignment[i, r] = t
+            slots[p, t] -= 1
+        tables = assignment[:, r]
+        meet += (tables[:, None] == tables[None, :]).astype(np.int32)
+    np.fill_diagonal(meet, 0)
+
+    def _move(i: int, r: int, t_new: int) -> None:
+        members_old = np.flatnonzero(assignment[:, r] == assignment[i, r])
+        members_old = members_old[members_old != i]
+        members_new = np.flatnonzero(assignment[:, r] == t_new)
+        meet[i, members_old] -= 1
+        meet[members_old, i] -= 1
+        meet[i, members_new] += 1
+        meet[members_new, i] += 1
+        assignment[i, r] = t_new
+
+    # Repeat-meeting cost plus hard penalties of the current seating (its deviation cost never changes).
+    def _seating_cost() -> float:
+        cost = lam * float(np.maximum(np.triu(meet, k=1) - 1, 0).sum())
+        unlocked = profile_of >= 0
+        cost += _HEURISTIC_HARD_PENALTY * float(((assignment[:, 1:] == assignment[:, :-1]) & unlocked[:, None]).sum())
+        for i, j in params["separation_pairs_indices"]:
+            cost += _HEURISTIC_HARD_PENALTY * float((assignment[i] == assignment[j]).sum())
+        return cost
+
+    # Members of i's profile at other tables in round r, the partners of a same-profile swap.
+    def _swap_candidates(i: int, r: int) -> np.ndarray:
+        same_profile = members[profile_of[i]]
+        candidates = same_profile[assignment[same_profile, r] != assignment[i, r]]
+        if anchored and r == 0:
+            candidates = candidates[candidates != 0]
+        return candidates
+
+    seats = [(i, r) for i in np.flatnonzero(profile_of >= 0) for r in range(num_r)]
+    if anchored:
+        seats.remove((0, 0))
+    cost = _seating_cost()
+    best_cost = cost
+    best_assignment = assignment.copy()
+    started = time.monotonic()
+    # Simulated annealing over same-profile swaps of seats that cost something, cooling from lambda (or the hard
+    # penalty when repeats are free) to a twentieth of it over the time budget.
+    temperature_scale = lam if lam > 0.0 else _HEURISTIC_HARD_PENALTY
+    while seats and best_cost > 0.0 and not _out_of_time():
+        i, r = seats[rng.integers(len(seats))]
+        t = int(assignment[i, r])
+        current = _seat_cost(i, r, t)
+        if current <= 0.0:
+            continue
+        candidates = _swap_candidates(i, r)
+        if not len(candidates):
+            continue
+        j = int(rng.choice(candidates))
+        t_j = int(assignment[j, r])
+        delta = _seat_cost(i, r, t_j, exclude=j) + _seat_cost(j, r, t, exclude=i) - current - _seat_cost(j, r, t_j)
+        progress = min(1.0, (time.monotonic() - started) / max(budget, 1e-9))
+        temperature = temperature_scale * 20.0 ** -progress
+        if delta <= 0.0 or rng.random() < np.exp(-delta / temperature):
+            _move(i, r, t_j)
+            _move(j, r, t)
+            cost += delta
+            if cost < best_cost - 1e-9:
+                best_cost, best_assignment = cost, assignment.copy()
+
+    if not _is_feasible_assignment(params, best_assignment):
+        return None
+    return best_assignment
+
+
+# Portfolio solving: independent HiGHS runs of the same model in a process pool, each with its own random_seed and
+# one of these option sets (cycled when there are more workers than sets). Each worker runs single-threaded.
+_PORTFOLIO_STRATEGIES = (
+    {},
+    {"mip_heuristic_effort": 0.3},
+    {"mip_allow_restart": False},
+    {"mip_heuristic_effort": 0.15, "mip_heuristic_run_zi_round": True},
+    {"presolve": "off"},
+    {"mip_lp_age_limit": 20},
+)
+_PORTFOLIO_MAX_DEFAULT_WORKERS = 8
+
+# Objects shared by the portfolio workers of one solve, set in each worker process by _portfolio_init:
+# the best objective found by any worker, the best dual bound proven by any worker and the stop flag.
+_PORTFOLIO_SHARED: dict = {}
+
+
+def _portfolio_init(best_objective, best_bound, stop) -> None:
+    _PORTFOLIO_SHARED.update(best_objective=best_objective, best_bound=best_bound, stop=stop)
+
+
+# One portfolio run, executed in a worker process. Improving schedules lower the shared best objective and dual
+# bounds raise the shared best bound; since every worker solves the same model, the run stops everyone as soon as
+# the shared bound meets the shared objective (within the HiGHS relative gap) or the stop flag is set.
+# Returns the worker's statistics, with its best schedule under "assignment".
+def _portfolio_worker(
+    problem_inputs: dict,
+    formulation: str,
+    worker: int,
+    options: dict,
+    deadline: float | None,
+    start_assignment: np.ndarray | None,
+    symmetry_breaking: tuple[str, ...] = (),
+) -> dict:
+    started = time.monotonic()
+    best_objective = _PORTFOLIO_SHARED["best_objective"]
+    best_bound = _PORTFOLIO_SHARED["best_bound"]
+    stop = _PORTFOLIO_SHARED["stop"]
+    params = _prepare_parameters(**problem_inputs)
+    model, columns = _build_model(params, formulation=formulation, symmetry_breaking=symmetry_breaking)
+    model.setOptionValue("threads", 1)
+    model.setOptionValue("random_seed", worker)
+    for name, value in options.items():
+        model.setOptionValue(name, value)
+    if deadline is not None:
+        model.setOptionValue("time_limit", max(0.0, deadline - time.time()))
+    rel_gap = model.getOptionValue("mip_rel_gap")[1]
+    incumbents = 0
+
+    def _share_incumbent(event) -> None:
+        nonlocal incumbents
+        incumbents += 1
+        objective = _schedule_objective(params, _assignment_from_solution(event.data_out.mip_solution, columns))
+        with best_objective.get_lock():
+            best_objective.value = min(best_objective.value, objective)
+
+    def _share_bound(event) -> None:
+        with best_bound.get_lock():
+            best_bound.value = max(best_bound.value, float(event.data_out.mip_dual_bound))
+        best = best_objective.value
+        if np.isfinite(best) and best_bound.value >= best - rel_gap * abs(best):
+            stop.set()
+        if stop.is_set():
+            event.interrupt()
+
+    model.cbMipImprovingSolution.subscribe(_share_incumbent)
+    model.cbMipInterrupt.subscribe(_share_bound)
+
+    stats = {"worker": worker, "random_seed": worker, "options": dict(options)}
+    try:
+        if formulation == "compact" and _pair_terms_matter(params):
+            assignment, objective, bound = _solve_with_pair_cuts(
+                model,
+                columns,
+                params,
+                time_limit_seconds=None if deadline is None else max(0.0, deadline - time.time()),
+                start_assignment=start_assignment,
+                monitor=_SolveMonitor(params, stop_event=stop),
+            )
+        else:
+            if start_assignment is not None:
+                start = _mip_start_values(params, columns, start_assignment, model.getNumCol())
+                model.setSolution(len(start), np.arange(len(start), dtype=np.int32), start)
+            model.run()
+            _check_solution_status(model)
+            assignment = _assignment_from_solution(model.getSolution().col_value, columns)
+            objective = _schedule_objective(params, assignment)
+            bound = float(model.getInfo().mip_dual_bound)
+    except RuntimeError as exc:
+        assignment, objective, bound = None, float("inf"), -float("inf")
+        if not stop.is_set():
+            stats["error"] = str(exc)
+
+    # A worker that finishes without being stopped has solved the model to optimality or run out of time.
+    if model.getModelStatus() == highspy.HighsModelStatus.kOptimal:
+        stop.set()
+    with best_bound.get_lock():
+        best_bound.value = max(best_bound.value, bound)
+    stats.update(
+        status=str(model.getModelStatus()).rsplit(".", 1)[-1],
+        objective=objective,
+        dual_bound=bound,
+        incumbents=incumbents,
+        mip_nodes=int(model.getInfo().mip_node_count),
+        elapsed_seconds=time.monotonic() - started,
+        assignment=assignment,
+    )
+    return stats
+
+
+# Runs num_workers portfolio workers (default: one per core, at most _PORTFOLIO_MAX_DEFAULT_WORKERS) in spawned
+# processes and returns the best schedule, its objective, the gap against the best bound of any worker and the
+# per-worker statistics (without schedules; the winner is flagged). A stop request through monitor is forwarded to
+# the workers. start_assignment, when given, seeds every worker and is the fallback if none finds a schedule.
+def _solve_portfolio(
+    problem_inputs: dict,
+    params: dict,
+    *,
+    formulation: str = "full",
+    num_workers: int | None = None,
+    time_limit_seconds: float | None = None,
+    start_assignment: np.ndarray | None = None,
+    monitor: _SolveMonitor | None = None,
+    symmetry_breaking: tuple[str, ...] = (),
+) -> tuple[np.ndarray, float, float | None, list[dict]]:
+    if num_workers is None:
+        num_workers = min(_PORTFOLIO_MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+    num_workers = max(1, int(num_workers))
+    deadline = None if time_limit_seconds is None else time.time() + float(time_limit_seconds)
+
+    context = multiprocessing.get_context("spawn")
+    best_objective = context.Value("d", float("inf"))
+    best_bound = context.Value("d", -float("inf"))
+    stop = context.Event()
+    if start_assignment is not None:
+        best_objective.value = _schedule_objective(params, start_assignment)
+
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=context,
+        initializer=_portfolio_init,
+        initargs=(best_objective, best_bound, stop),
+    ) as pool:
+        futures = [
+            pool.submit(
+                _portfolio_worker,
+                problem_inputs,
+                formulation,
+                worker,
+                _PORTFOLIO_STRATEGIES[worker % len(_PORTFOLIO_STRATEGIES)],
+                deadline,
+                start_assignment,
+                symmetry_breaking,
+            )
+            for worker in range(num_workers)
+        ]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=0.25)
+            if monitor is not None and monitor.stop_requested():
+                stop.set()
+
+    worker_stats = []
+    for worker, future in enumerate(futures):
+        try:
+            worker_stats.append(future.result())
+        except Exception as exc:
+            worker_stats.append({"worker": worker, "error": str(exc), "objective": float("inf"), "assignment": None})
+
+    best_assignment = start_assignment
+    best = float("inf") if start_assignment is None else _schedule_objective(params, start_assignment)
+    winner = None
+    for entry in worker_stats:
+        if entry["assignment"] is not None and entry["objective"] < best:
+            best_assignment, best, winner = entry["assignment"], entry["objective"], entry["worker"]
+    if best_assignment is None:
+        errors = "; ".join(entry["error"] for entry in worker_stats if "error" in entry)
+        raise RuntimeError(f"No portfolio worker found a feasible schedule. {errors}".strip())
+    for entry in worker_stats:
+        entry.pop("assignment")
+        entry["winner"] = entry["worker"] == winner
+    gap = _relative_gap(best, best_bound.value) if np.isfinite(best_bound.value) else None
+    return best_assignment, best, gap, worker_stats
+
+
+# Disk cache of solve results, keyed by a canonical hash of everything that defines the problem (see _cache_key).
+# An entry is one small Parquet file holding the assignment matrix (one int16 column per round) with objective, gap
+# and optimality in the file metadata; the result frames are rebuilt from it with _result_frames. Non-optimal
+# entries are kept too, and a later solve of the same problem starts from them instead of the heuristic.
+# Reads refresh an entry's modification time, and writes evict the least recently used entries once the
+# directory grows past _CACHE_MAX_BYTES.
+CACHE_DIR = Path(__file__).parent / ".solve_cache"
+_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_CACHE_FORMAT_VERSION = 1
+
+# Results within HiGHS' default relative MIP gap are served from the cache without solving again.
+_CACHE_OPTIMAL_GAP = 1.0e-4
+
+
+# Canonical hash of a prepared problem: the participant table (values, dtypes, column names and index), the trait
+# incidence and target/weight/bound arrays, the event setup, lambda, locks and separation pairs.
+def _cache_key(params: dict) -> str:
+    digest = hashlib.sha256()
+    df = params["df"]
+    digest.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(
+        json.dumps(
+            [
+                _CACHE_FORMAT_VERSION,
+                [list(key) for key in params["trait_keys"]],
+                [len(params["I"]), len(params["T"]), len(params["R"]), params["l"], params["u"], params["lam"]],
+                sorted(params["locked_indices"].items()),
+                sorted(sorted(pair) for pair in params["separation_pairs_indices"]),
+            ]
+        ).encode()
+    )
+    for name in ("B", "v_arr", "w1_bar_arr", "w2_bar_arr", "w1_arr", "w2_arr", "v_bar_arr", "v_under_arr"):
+        values = params[name]
+        digest.update(name.encode())
+        if values is not None:
+            digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+# Returns the cached entry for key as a dict (assignment, objective, gap, optimal), or None on a miss.
+# Unreadable or mismatched files are dropped.
+def _cache_load(cache_dir: Path, key: str, params: dict) -> dict | None:
+    path = Path(cache_dir) / f"{key}.parquet"
+    try:
+        table = pq.read_table(path)
+        meta = json.loads(table.schema.metadata[b"solve_result"])
+        assignment = np.column_stack([table.column(f"round_{r + 1}").to_numpy() for r in params["R"]])
+        assignment = assignment.astype(np.int64)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        path.unlink(missing_ok=True)
+        return None
+    if assignment.shape != (len(params["I"]), len(params["R"])):
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)
+    return {
+        "assignment": assignment,
+        "objective": float(meta["objective"]),
+        "gap": meta["gap"],
+        "optimal": bool(meta["optimal"]),
+    }
 
-    mip_gap = getattr(info, "mip_gap", None)
-    gap_value = None if mip_gap is None else float(mip_gap)
 
-    return work_df, schedule_df, float(objective), gap_value
+# Writes an entry unless the cache already holds one at least as good, then evicts least recently used files.
+def _cache_store(
+    cache_dir: Path,
+    key: str,
+    params: dict,
+    assignment: np.ndarray,
+    objective: float,
+    gap: float | None,
+) -> None:
+    cache_dir = Path(cache_dir)
+    existing = _cache_load(cache_dir, key, params)
+    if existing is not None and (existing["optimal"] or existing["objective"] <= objective):
+        return
+    optimal = gap is not None and gap <= _CACHE_OPTIMAL_GAP
+    table = pa.table({f"round_{r + 1}": pa.array(assignment[:, r], type=pa.int16()) for r in params["R"]})
+    metadata = {"objective": float(objective), "gap": None if gap is None else float(gap), "optimal": optimal}
+    table = table.replace_schema_metadata({"solve_result": json.dumps(metadata)})
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{key}.parquet"
+    partial = cache_dir / f"{key}.{os.getpid()}.partial"
+    pq.write_table(table, partial)
+    os.replace(partial, path)
+
+    entries = sorted(cache_dir.glob("*.parquet"), key=lambda entry: entry.stat().st_mtime)
+    total = sum(entry.stat().st_size for entry in entries)
+    for entry in entries:
+        if total <= _CACHE_MAX_BYTES:
+            break
+        if entry != path:
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+
+
+# Preflight limits for method="auto" (see preflight_estimate). On single-core runs the full MIP only closes its gap
+# within minutes on events up to about 12 people and 3 rounds; larger events are left to the decomposition, whose
+# two-round windows keep improving on the warm start up to roughly 100-150 people (90 people over 15 tables and
+# 4 rounds: decomposition 960 in 22 s against 1020 for a 60 s heuristic), beyond which the heuristic does as well.
+_PREFLIGHT_MIP_MAX_NONZEROS = 8_000
+_PREFLIGHT_WINDOW_MAX_NONZEROS = 250_000
+
+# Events too large for the full MIP are solved over trait profiles (method="profiles") when the unlocked
+# participants average at least this many per profile; the profile model then stays small whatever the roster size.
+_PREFLIGHT_PROFILE_MIN_MEMBERS = 5
+
+
+# Predicts the size of the model _build_model would build, from the event's dimensions alone. trait_cardinality
+# lists the number of traits of each characteristic, num_trait_bounds counts hard upper plus lower trait bounds,
+# and num_met_pairs prices pairs met outside the model's rounds (decomposition windows). Columns and rows are exact
+# except for the anchor row (absent when the first participant is locked), bounded traits nobody holds and
+# separated pairs that are also both locked (see _open_pairs); nonzeros assume every participant holds one trait
+# of each characteristic.
+def estimate_model_size(
+    num_people: int,
+    num_tables: int,
+    num_rounds: int,
+    trait_cardinality: list[int] | tuple[int, ...],
+    *,
+    num_locks: int = 0,
+    num_separations: int = 0,
+    num_trait_bounds: int = 0,
+    num_met_pairs: int = 0,
+    formulation: str = "full",
+) -> dict:
+    if formulation not in _FORMULATIONS:
+        raise ValueError(f"Unknown formulation {formulation!r}; expected one of {', '.join(_FORMULATIONS)}.")
+    n, num_t, num_r = int(num_people), int(num_tables), int(num_rounds)
+    num_traits = int(sum(trait_cardinality))
+    # Locked participants are substituted out of every row (see _presolve_bounds).
+    movable = max(0, n - int(num_locks))
+    holdings = movable * len(trait_cardinality)
+    cells = num_t * num_r
+    num_pairs = half_locked = 0
+    if formulation == "full":
+        num_pairs = max(0, n * (n - 1) // 2 - num_locks * (num_locks - 1) // 2 - num_separations)
+        half_locked = min(num_pairs, int(num_locks) * movable)
+
+    integer_columns = n * cells + cells + 4 * num_traits * cells + num_pairs * (num_r + 1)
+    continuous_columns = num_met_pairs * num_r
+    # (rows, nonzeros per row) for every row family of _build_model, in the same order.
+    families = [
+        (2 * cells, movable + 1),
+        (movable * num_r, num_t),
+        (movable * num_t * (num_r - 1) if num_r > 1 else 0, 2),
+        (1 if n > 0 else 0, 1),
+        (num_separations * cells, 2),
+        ((num_t - 1) * num_r if num_t > 1 else 0, 2),
+        (num_traits * cells, 4),
+        (half_locked * num_r, 2),
+        ((num_pairs - half_locked) * num_t * num_r * 3, 3),
+        (num_pairs * num_r, 2),
+        (num_pairs, num_r + 1),
+        (num_met_pairs * cells, 3),
+    ]
+    rows = sum(count for count, _ in families)
+    nonzeros = sum(count * width for count, width in families) + holdings * cells
+    if num_traits:
+        rows += num_trait_bounds * cells
+        nonzeros += num_trait_bounds * cells * holdings / num_traits
+    return {
+        "columns": integer_columns + continuous_columns,
+        "integer_columns": integer_columns,
+        "rows": rows,
+        "nonzeros": int(round(nonzeros)),
+    }
+
+
+# Sizes the full model and the largest decomposition window (two rounds, with the pairs that met in the other
+# rounds priced per meeting) without building either, and picks the solve method for method="auto": the full MIP
+# when it is small enough to close, the profile aggregation when participants share few trait profiles (num_profiles,
+# the number of distinct trait combinations among unlocked participants, when known), the decomposition when its
+# windows stay tractable, and the heuristic otherwise.
+# Takes the same dimensions as estimate_model_size; max_people_per_table bounds the number of pairs met per round.
+# Returns {"full", "window": size dicts, "difficulty": "small" | "medium" | "large", "method", "reason"}.
+def preflight_estimate(
+    num_people: int,
+    num_tables: int,
+    num_rounds: int,
+    trait_cardinality: list[int] | tuple[int, ...],
+    *,
+    max_people_per_table: int | None = None,
+    num_locks: int = 0,
+    num_separations: int = 0,
+    num_trait_bounds: int = 0,
+    repeat_penalty: bool = True,
+    num_profiles: int | None = None,
+) -> dict:
+    dimensions = {
+        "trait_cardinality": trait_cardinality,
+        "num_locks": num_locks,
+        "num_separations": num_separations,
+        "num_trait_bounds": num_trait_bounds,
+    }
+    # Without repeat-meeting terms (one round, or repeat_penalty=False for lam = 0) the full model has no pair
+    # columns; see _pair_terms_matter.
+    formulation = "full" if repeat_penalty and num_rounds > 1 else "compact"
+    full = estimate_model_size(num_people, num_tables, num_rounds, **dimensions, formulation=formulation)
+
+    table_size = max_people_per_table or -(-num_people // max(1, num_tables))
+    window_rounds = min(2, num_rounds)
+    pairs_per_round = num_people * max(0, table_size - 1) // 2
+    met_pairs = min(num_people * (num_people - 1) // 2, pairs_per_round * (num_rounds - window_rounds))
+    window = estimate_model_size(
+        num_people, num_tables, window_rounds, **dimensions, num_met_pairs=met_pairs, formulation="compact"
+    )
+
+    if full["nonzeros"] <= _PREFLIGHT_MIP_MAX_NONZEROS:
+        difficulty, method = "small", "mip"
+        reason = "The full model is small enough for the MIP to prove an optimal seating."
+    elif num_profiles is not None and num_profiles * _PREFLIGHT_PROFILE_MIN_MEMBERS <= num_people - num_locks:
+        difficulty = "medium" if window["nonzeros"] <= _PREFLIGHT_WINDOW_MAX_NONZEROS else "large"
+        method = "profiles"
+        reason = "Participants share few trait profiles, so tables are balanced over profiles before people are seated."
+    elif window["nonzeros"] <= _PREFLIGHT_WINDOW_MAX_NONZEROS:
+        difficulty, method = "medium", "decomposition"
+        reason = "The full model is too large to close, so rounds are optimized a window at a time."
+    else:
+        difficulty, method = "large", "heuristic"
+        reason = "Even a single decomposition window is too large, so the seating heuristic is used."
+    return {"full": full, "window": window, "difficulty": difficulty, "method": method, "reason": reason}
+
+
+# preflight_estimate for prepared parameters, as used by method="auto".
+def _preflight_from_params(params: dict) -> dict:
+    bounded = [bounds for bounds in (params["v_bar_arr"], params["v_under_arr"]) if bounds is not None]
+    return preflight_estimate(
+        len(params["I"]),
+        len(params["T"]),
+        len(params["R"]),
+        [len(traits) for traits in params["Ak"].values()],
+        max_people_per_table=params["u"],
+        num_locks=len(params["locked_indices"]),
+        num_separations=len(params["separation_pairs_indices"]),
+        num_trait_bounds=int(sum(np.isfinite(bounds).any(axis=1).sum() for bounds in bounded)),
+        repeat_penalty=params["lam"] != 0.0,
+        num_profiles=len(_trait_profiles(params)[2]),
+    )
+
+
+def solve_solver_v2(
+    df: pd.DataFrame,
+    debug: bool = False,
+    time_limit_seconds: float | None = None,
+    v_target: float = 5.0,
+    lam: float = 100.0,
+    w1_value: float = 10.0,
+    w2_value: float = 20.0,
+    w1_bar_value: float | None = None,
+    w2_bar_value: float | None = None,
+    v_bar: dict | None = None,
+    v_under: dict | None = None,
+    characteristics: list[str] | None = None,
+    num_tables: int = 6,
+    num_rounds: int = 3,
+    min_people_per_table: int = 4,
+    max_people_per_table: int = 6,
+    trait_targets: dict | None = None,
+    trait_max_allowed: dict | None = None,
+    trait_min_required: dict | None = None,
+    locked_tables: dict | None = None,
+    separation_pairs: list | None = None,
+    formulation: str = "full",
+    method: str = "mip",
+    warm_start: bool = True,
+    decomposition_repair: bool = True,
+    on_incumbent: Callable[[dict], None] | None = None,
+    stop_event=None,
+    use_cache: bool = False,
+    cache_dir: str | Path | None = None,
+    portfolio_workers: int | None = None,
+    stats: dict | None = None,
+    symmetry_breaking: tuple[str, ...] = (),
+    stats_log: str | Path | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, float, float | None]:
+    if formulation not in _FORMULATIONS:
+        raise ValueError(f"Unknown formulation {formulation!r}; expected one of {', '.join(_FORMULATIONS)}.")
+    if method not in _METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {', '.join(_METHODS)}.")
+    unknown = set(symmetry_breaking) - set(_SYMMETRY_BREAKING)
+    if unknown:
+        raise ValueError(
+            f"Unknown symmetry breaking {', '.join(sorted(unknown))}; expected any of {', '.join(_SYMMETRY_BREAKING)}."
+        )
+    started = time.monotonic()
+    # stats and stats_log receive phase timings, the model size, the bound history and the HiGHS log (see
+    # _SolveStats).
+    instrument = _SolveStats(stats, stats_log)
+    problem_inputs = {
+        "df": df,
+        "v_target": v_target,
+        "lam": lam,
+        "w1_value": w1_value,
+        "w2_value": w2_value,
+        "w1_bar_value": w1_bar_value,
+        "w2_bar_value": w2_bar_value,
+        "v_bar": v_bar,
+        "v_under": v_under,
+        "characteristics": characteristics,
+        "num_tables": num_tables,
+        "num_rounds": num_rounds,
+        "min_people_per_table": min_people_per_table,
+        "max_people_per_table": max_people_per_table,
+        "trait_targets": trait_targets,
+        "trait_max_allowed": trait_max_allowed,
+        "trait_min_required": trait_min_required,
+        "locked_tables": locked_tables,
+        "separation_pairs": separation_pairs,
+    }
+    with instrument.phase("prepare"):
+        params = _prepare_parameters(**problem_inputs)
+    if method == "auto":
+        method = _preflight_from_params(params)["method"]
+    instrument.method(method)
+    # on_incumbent and stop_event let a caller follow a long solve and end it early (see _SolveMonitor);
+    # a stopped solve returns the best schedule found so far.
+    monitor = _SolveMonitor(params, on_incumbent=on_incumbent, stop_event=stop_event)
+
+    # With use_cache, an optimal cached result is returned as is and a non-optimal one becomes the warm start.
+    cache_key = None
+    cached = None
+    if use_cache:
+        cache_dir = CACHE_DIR if cache_dir is None else Path(cache_dir)
+        with instrument.phase("cache"):
+            cache_key = _cache_key(params)
+            cached = _cache_load(cache_dir, cache_key, params)
+        if cached is not None and cached["optimal"]:
+            monitor.publish(cached["assignment"])
+            with instrument.phase("extract"):
+                work_df, schedule_df = _result_frames(params, cached["assignment"])
+            instrument.result(cached["objective"], cached["gap"])
+            return work_df, schedule_df, cached["objective"], cached["gap"]
+
+    def _finish(assignment: np.ndarray, objective: float, gap: float | None):
+        with instrument.phase("extract"):
+            if cache_key is not None:
+                _cache_store(cache_dir, cache_key, params, assignment, objective, gap)
+            work_df, schedule_df = _result_frames(params, assignment)
+        instrument.result(objective, gap)
+        return work_df, schedule_df, objective, gap
+
+    if method == "heuristic":
+        with instrument.phase("run"):
+            assignment = _heuristic_assignment(
+                params, time_limit_seconds=time_limit_seconds, stop_event=stop_event, monitor=monitor
+            )
+        if assignment is None:
+            raise RuntimeError("Heuristic could not find a seating that satisfies every hard constraint.")
+        monitor.publish(assignment)
+        return _finish(assignment, _schedule_objective(params, assignment), None)
+
+    # Trait-profile aggregation: the balance model over profile counts, then individuals seated into its counts;
+    # the profile model's dual bound bounds the whole objective. Seating gets its share of the time limit first.
+    if method == "profiles":
+        profile_of, profiles, sizes = _trait_profiles(params)
+        with instrument.phase("build"):
+            model, columns = _build_profile_model(params, profile_of, profiles, sizes)
+        model.setOptionValue("output_flag", bool(debug))
+        seating_seconds = _HEURISTIC_DEFAULT_SECONDS
+        if time_limit_seconds is not None:
+            seating_seconds = min(_PROFILE_SEATING_MAX_SECONDS, _PROFILE_SEATING_TIME_SHARE * float(time_limit_seconds))
+            remaining = float(time_limit_seconds) - (time.monotonic() - started) - seating_seconds
+            model.setOptionValue("time_limit", max(0.0, remaining))
+        if stop_event is not None:
+
+            def _interrupt_on_stop(event) -> None:
+                if monitor.stop_requested():
+                    event.interrupt()
+
+            model.cbMipInterrupt.subscribe(_interrupt_on_stop)
+        instrument.attach(model, debug=debug)
+        instrument.model(model, columns)
+        with instrument.phase("run"):
+            model.run()
+        _check_solution_status(model)
+        bound = float(model.getInfo().mip_dual_bound)
+        counts = np.rint(model.getSolution().col_value)[columns["X"]].astype(np.int64)
+        # Repeat meetings the counts force (or a seating that breaks a hard constraint) are left to the heuristic's
+        # local search, which may trade some balance for them, for the rest of the seating time.
+        with instrument.phase("seating"):
+            seating_deadline = time.monotonic() + seating_seconds
+            assignment = _seat_profiles(
+                params, profile_of, counts, time_limit_seconds=seating_seconds / 2, stop_event=stop_event
+            )
+            objective = float("inf") if assignment is None else _schedule_objective(params, assignment)
+            if not objective <= bound + 1e-9:
+                polished = _heuristic_assignment(
+                    params,
+                    time_limit_seconds=max(0.0, seating_deadline - time.monotonic()),
+                    stop_event=stop_event,
+                    start_assignment=assignment,
+                )
+                if polished is not None and _schedule_objective(params, polished) < objective:
+                    assignment, objective = polished, _schedule_objective(params, polished)
+        if assignment is None:
+            raise RuntimeError("Could not seat the profile counts without breaking a hard constraint.")
+        monitor.publish(assignment, bound)
+        return _finish(assignment, objective, _relative_gap(objective, bound) if np.isfinite(bound) else None)
+
+    # Seed HiGHS with the cached or heuristic schedule; the heuristic's time comes out of the overall time limit. The
+    # heuristic stops at its first local optimum: HiGHS improves on it from there. Pair-free models (see
+    # _pair_terms_matter) solve in about the time a full descent takes, so their warm start is capped tighter.
+    start_assignment = None
+    if warm_start and cached is not None and _is_feasible_assignment(params, cached["assignment"]):
+        start_assignment = cached["assignment"]
+        monitor.publish(start_assignment)
+    elif warm_start:
+        warm_start_seconds = _WARM_START_MAX_SECONDS if _pair_terms_matter(params) else _WARM_START_PAIR_FREE_SECONDS
+        if time_limit_seconds is not None:
+            warm_start_seconds = min(warm_start_seconds, _WARM_START_TIME_SHARE * float(time_limit_seconds))
+        with instrument.phase("warm_start"):
+            start_assignment = _heuristic_assignment(
+                params, time_limit_seconds=warm_start_seconds, stop_event=stop_event, max_stale_kicks=0, monitor=monitor
+            )
+        if start_assignment is not None:
+            monitor.publish(start_assignment)
+
+    remaining_seconds = None
+    if time_limit_seconds is not None:
+        remaining_seconds = max(0.0, float(time_limit_seconds) - (time.monotonic() - started))
+
+    # symmetry_breaking (see _build_model) applies to the whole-event models of the mip and portfolio methods;
+    # the warm start is relabeled so it satisfies the extra constraints.
+    symmetry_breaking = tuple(symmetry_breaking)
+    if start_assignment is not None and symmetry_breaking and method != "decomposition":
+        start_assignment = _canonical_assignment(params, start_assignment, symmetry_breaking)
+
+    # Single-round events (and lam = 0) are solved as a trait-balance-only model (see _pair_terms_matter).
+    if not _pair_terms_matter(params):
+        formulation = "compact"
+
+    # stats, when given, receives the per-worker statistics and the winning worker (None if no worker improved
+    # on the warm start).
+    if method == "portfolio":
+        with instrument.phase("run"):
+            assignment, objective, gap, worker_stats = _solve_portfolio(
+                problem_inputs,
+                params,
+                formulation=formulation,
+                num_workers=portfolio_workers,
+                time_limit_seconds=remaining_seconds,
+                start_assignment=start_assignment,
+                monitor=monitor,
+                symmetry_breaking=symmetry_breaking,
+            )
+        if stats is not None:
+            stats["portfolio_workers"] = worker_stats
+            stats["portfolio_winner"] = next((w["worker"] for w in worker_stats if w["winner"]), None)
+        monitor.publish(assignment)
+        return _finish(assignment, objective, gap)
+
+    # The decomposition has no global dual bound, so it reports no gap.
+    if method == "decomposition":
+        try:
+            with instrument.phase("run"):
+                assignment = _solve_by_decomposition(
+                    params,
+                    time_limit_seconds=remaining_seconds,
+                    start_assignment=start_assignment,
+                    repair=decomposition_repair,
+                    debug=debug,
+                    monitor=monitor,
+                )
+        except RuntimeError:
+            if start_assignment is None:
+                if monitor.stop_requested():
+                    raise RuntimeError("Solve was stopped before a feasible schedule was found.") from None
+                raise
+            assignment = start_assignment
+        return _finish(assignment, _schedule_objective(params, assignment), None)
+
+    with instrument.phase("build"):
+        model, columns = _build_model(params, formulation=formulation, symmetry_breaking=symmetry_breaking)
+    model.setOptionValue("output_flag", bool(debug))
+    if remaining_seconds is not None:
+        model.setOptionValue("time_limit", remaining_seconds)
+    monitor.attach(model, columns)
+    instrument.attach(model, debug=debug)
+
+    if formulation == "compact" and _pair_terms_matter(params):
+        with instrument.phase("run"):
+            assignment, objective, bound = _solve_with_pair_cuts(
+                model,
+                columns,
+                params,
+                time_limit_seconds=remaining_seconds,
+                start_assignment=start_assignment,
+                monitor=monitor,
+            )
+        instrument.model(model, columns)
+        return _finish(assignment, objective, _relative_gap(objective, bound))
+
+    instrument.model(model, columns)
+    if start_assignment is not None:
+        start = _mip_start_values(params, columns, start_assignment, model.getNumCol())
+        model.setSolution(len(start), np.arange(len(start), dtype=np.int32), start)
+    with instrument.phase("run"):
+        model.run()
+    found_schedule = model.getInfo().primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible
+    if monitor.stop_requested() and not found_schedule:
+        raise RuntimeError("Solve was stopped before a feasible schedule was found.")
+    _check_solution_status(model)
+
+    # An incumbent that is not yet optimal may leave slack in the deviation columns, so the objective is
+    # re-evaluated on the schedule itself; it then matches what the incumbent stream reported.
+    with instrument.phase("extract"):
+        info = model.getInfo()
+        assignment = _assignment_from_solution(model.getSolution().col_value, columns)
+        objective = _schedule_objective(params, assignment)
+    return _finish(assignment, objective, _relative_gap(objective, float(info.mip_dual_bound)))
+
+
+# Keyword arguments of solve_solver_v2 that define the problem itself (as opposed to how it is solved).
+_PROBLEM_INPUTS = (
+    "df",
+    "v_target",
+    "lam",
+    "w1_value",
+    "w2_value",
+    "w1_bar_value",
+    "w2_bar_value",
+    "v_bar",
+    "v_under",
+    "characteristics",
+    "num_tables",
+    "num_rounds",
+    "min_people_per_table",
+    "max_people_per_table",
+    "trait_targets",
+    "trait_max_allowed",
+    "trait_min_required",
+    "locked_tables",
+    "separation_pairs",
+)
+
+
+# Applies roster changes to solve inputs and returns the new inputs. Each change is a dict with an "action":
+#   {"action": "remove_participant", "participant_id": ...}
+#   {"action": "add_participant", "participant": {column: value, ...}}   (must include Participant_ID)
+#   {"action": "lock", "participant_id": ..., "table": <1-based table number>}
+#   {"action": "separate", "participant_ids": (first_id, second_id)}
+def _apply_roster_changes(inputs: dict, changes: list[dict]) -> dict:
+    df = inputs["df"].copy()
+    locked_tables = dict(inputs.get("locked_tables") or {})
+    separation_pairs = list(inputs.get("separation_pairs") or [])
+    for change in changes:
+        action = change.get("action")
+        if action == "remove_participant":
+            pid = _clean_text(change["participant_id"])
+            keep = df["Participant_ID"].map(_clean_text) != pid
+            if keep.all():
+                raise ValueError(f"Cannot remove unknown participant {pid!r}.")
+            df = df[keep]
+        elif action == "add_participant":
+            row = dict(change["participant"])
+            pid = _clean_text(row.get("Participant_ID"))
+            if not pid:
+                raise ValueError("A new participant needs a Participant_ID.")
+            if (df["Participant_ID"].map(_clean_text) == pid).any():
+                raise ValueError(f"Participant {pid!r} is already on the roster.")
+            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+        elif action == "lock":
+            locked_tables[_clean_text(change["participant_id"])] = int(change["table"])
+        elif action == "separate":
+            first, second = change["participant_ids"]
+            separation_pairs.append((_clean_text(first), _clean_text(second)))
+        else:
+            raise ValueError(f"Unknown roster change {action!r}.")
+    return dict(inputs, df=df.reset_index(drop=True), locked_tables=locked_tables, separation_pairs=separation_pairs)
+
+
+# Re-solves a finished event after small roster edits instead of starting over.
+#
+# previous_result is a dict with "inputs" (the problem keyword arguments of solve_solver_v2, including df) and
+# "participant_results" (the frame that solve returned). changes is a list of roster edits in the format of
+# _apply_roster_changes. The previous schedule, matched by Participant_ID, seeds the MIP for everyone it still
+# fits. Seats that an edit touches are freed: added people, newly locked people, separated pairs in the rounds they
+# meet, and everyone at a table that loses or gains a member through an edit. With fix_unaffected=True every
+# other seat is fixed, which shrinks the model to the changed tables; if that model is infeasible the solve is
+# repeated with those seats only as a warm start. Returns a dict in the same shape as previous_result, plus
+# schedule_results, objective and gap, so calls can be chained.
+def resolve_incremental(
+    previous_result: dict,
+    changes: list[dict],
+    *,
+    fix_unaffected: bool = True,
+    formulation: str = "full",
+    time_limit_seconds: float | None = None,
+    debug: bool = False,
+) -> dict:
+    started = time.monotonic()
+    inputs = _apply_roster_changes(previous_result["inputs"], changes)
+    params = _prepare_parameters(**{name: inputs[name] for name in _PROBLEM_INPUTS if name in inputs})
+    n = len(params["I"])
+    num_t = len(params["T"])
+    num_r = len(params["R"])
+
+    # Previous seats by participant, as 0-based table indices (-1 for people who were not seated).
+    previous = previous_result["participant_results"]
+    previous_ids = previous["Participant_ID"].map(_clean_text).tolist()
+    previous_tables = np.full((len(previous), num_r), -1, dtype=np.int64)
+    for r in params["R"]:
+        column = f"Round_{r + 1}_Table"
+        if column in previous.columns:
+            previous_tables[:, r] = pd.to_numeric(previous[column], errors="coerce").fillna(0).to_numpy() - 1
+    previous_tables[(previous_tables < 0) | (previous_tables >= num_t)] = -1
+    row_by_id = {pid: row for row, pid in enumerate(previous_ids)}
+    current_ids = params["df"]["Participant_ID"].map(_clean_text).tolist()
+    assignment = np.full((n, num_r), -1, dtype=np.int64)
+    for i, pid in enumerate(current_ids):
+        if pid in row_by_id:
+            assignment[i] = previous_tables[row_by_id[pid]]
+
+    free = assignment < 0
+    for i, table in params["locked_indices"].items():
+        if (assignment[i] != table).any():
+            free[i] = True
+            free |= assignment == table
+    for i, j in params["separation_pairs_indices"]:
+        free[[i, j]] |= assignment[i] == assignment[j]
+    removed_ids = set(previous_ids) - set(current_ids)
+    for pid in removed_ids:
+        for r, table in enumerate(previous_tables[row_by_id[pid]]):
+            if table >= 0:
+                free[:, r] |= assignment[:, r] == table
+    # Everyone sharing a table with a freed person in that round is freed too.
+    for r in params["R"]:
+        for table in np.unique(assignment[free[:, r], r]):
+            if table >= 0:
+                free[:, r] |= assignment[:, r] == table
+    assignment[free] = -1
+
+    # As in solve_solver_v2, single-round events (and lam = 0) need no pair columns (see _pair_terms_matter).
+    if not _pair_terms_matter(params):
+        formulation = "compact"
+    model, columns = _build_model(params, formulation=formulation, anchor=False)
+    model.setOptionValue("output_flag", bool(debug))
+    Y = columns["Y"]
+    person, round_idx = np.nonzero(assignment >= 0)
+    kept_seats = Y[person, assignment[person, round_idx], round_idx].astype(np.int32)
+    kept_seats.sort()
+    _, _, _, kept_lower, kept_upper, _ = model.getCols(len(kept_seats), kept_seats)
+
+    def _run(fixed: bool) -> tuple[np.ndarray, float, float]:
+        if fixed and len(kept_seats):
+            model.changeColsBounds(len(kept_seats), kept_seats, np.ones(len(kept_seats)), np.ones(len(kept_seats)))
+        remaining = None
+        if time_limit_seconds is not None:
+            remaining = max(0.0, float(time_limit_seconds) - (time.monotonic() - started))
+            model.setOptionValue("time_limit", remaining)
+        if len(kept_seats):
+            model.setSolution(len(kept_seats), kept_seats, np.ones(len(kept_seats)))
+        if formulation == "compact" and _pair_terms_matter(params):
+            return _solve_with_pair_cuts(model, columns, params, time_limit_seconds=remaining)
+        model.run()
+        _check_solution_status(model)
+        result = _assignment_from_solution(model.getSolution().col_value, columns)
+        return result, _schedule_objective(params, result), float(model.getInfo().mip_dual_bound)
+
+    fixed = fix_unaffected and len(kept_seats) > 0
+    try:
+        new_assignment, objective, bound = _run(fixed)
+    except RuntimeError:
+        if not fixed:
+            raise
+        fixed = False
+        model.changeColsBounds(len(kept_seats), kept_seats, kept_lower, kept_upper)
+        new_assignment, objective, bound = _run(False)
+
+    # With seats fixed the dual bound only covers the restricted model, so no gap is reported.
+    gap = None if fixed else _relative_gap(objective, bound)
+    participant_results, schedule_results = _result_frames(params, new_assignment)
+    return {
+        "inputs": inputs,
+        "participant_results": participant_results,
+        "schedule_results": schedule_results,
+        "objective": objective,
+        "gap": gap,
+    }
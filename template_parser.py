@@ -1,13 +1,37 @@
+import io
+import os
+import pickle
 import re
+import sys
+import threading
+import zipfile
+from collections import OrderedDict
 from pathlib import Path
 
+import numpy as np
+import openpyxl
 import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES
+from openpyxl.utils.exceptions import InvalidFileException
+from pandas.io.parsers import TextParser
 
 
 # Path to the sample template included with the app that facilitators download and fill out.
 TEMPLATE_PATH = Path(__file__).parent / "User_Input_Template_SAMPLE.xlsx"
 
 
+# After this many blank rows in a row, the streaming reader checks whether the rest of the sheet holds any value and
+# stops reading if it does not. Templates are often formatted down to the last Excel row (the sample's TRAITS sheet
+# reaches row 1,048,576), and reading those empty rows is what made parsing slow; a sheet with values further down is
+# still read to the end, as pd.read_excel reads it.
+_STREAM_BLANK_ROW_LIMIT = 1000
+
+# Cell values in worksheet XML (cached values and inline strings), row elements and their row numbers.
+_SHEET_VALUE_TAG = re.compile(rb"<(?:\w+:)?(?:v|is)>")
+_SHEET_ROW_TAG = re.compile(rb"<(?:\w+:)?row\b([^>]*)>")
+_SHEET_ROW_NUMBER = re.compile(rb'\br="(\d+)"')
+
+
 # Utility functions for parsing and normalizing the uploaded Excel template data.
 def _normalize_label(value) -> str:
     return re.sub(r"[^a-z0-9]+", "_", str(value).strip().lower()).strip("_")
@@ -41,8 +65,90 @@ def _to_float_or_none(value) -> float | None:
         return None
 
 
+# Opens a workbook once in openpyxl read-only mode and reads each sheet row by row (values only), handing back the
+# same DataFrame pd.read_excel would: cells are converted as pandas' openpyxl reader converts them and the rows go
+# through the same TextParser, so both parser modes see identical frames.
+class _StreamingWorkbook:
+    def __init__(self, uploaded_file) -> None:
+        self._book = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True, keep_links=False)
+        self.sheet_names = self._book.sheetnames
+
+    def close(self) -> None:
+        self._book.close()
+
+    def read_sheet(self, sheet_name: str, *, header: int | None) -> pd.DataFrame:
+        rows = self._sheet_rows(sheet_name)
+        if not rows:
+            return pd.DataFrame()
+        return TextParser(rows, header=header, skip_blank_lines=False).read()
+
+    def _sheet_rows(self, sheet_name: str) -> list[list]:
+        worksheet = self._book[sheet_name]
+        worksheet.reset_dimensions()
+        rows: list[list] = []
+        blank_run = 0
+        last_value_row = None
+        for row_number, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+            converted = [_stream_cell(value) for value in row]
+            while converted and converted[-1] == "":
+                converted.pop()
+            if converted:
+                blank_run = 0
+            else:
+                blank_run += 1
+                if blank_run == _STREAM_BLANK_ROW_LIMIT:
+                    if last_value_row is None:
+                        last_value_row = _last_value_row(worksheet)
+                    if last_value_row < row_number:
+                        break
+            rows.append(converted)
+        while rows and not rows[-1]:
+            rows.pop()
+        width = max((len(row) for row in rows), default=0)
+        return [row + [""] * (width - len(row)) for row in rows]
+
+
+# Row number of the last cell value in the worksheet's XML (0 if there is none), found by scanning the raw part rather
+# than parsing every row. If that row element carries no number it returns sys.maxsize, so the reader keeps going.
+# The raw part comes from openpyxl's ReadOnlyWorksheet._get_source(), which is not public API; requirements.txt pins
+# openpyxl to the 3.1 series for it and tests/test_template_parser.py covers it directly.
+def _last_value_row(worksheet) -> int:
+    with worksheet._get_source() as source:
+        data = source.read()
+    last_value = None
+    for last_value in _SHEET_VALUE_TAG.finditer(data):
+        pass
+    if last_value is None:
+        return 0
+    row_tag = None
+    for row_tag in _SHEET_ROW_TAG.finditer(data, 0, last_value.start()):
+        pass
+    row_number = None if row_tag is None else _SHEET_ROW_NUMBER.search(row_tag.group(1))
+    return sys.maxsize if row_number is None else int(row_number.group(1))
+
+
+# Cell conversion of pandas' openpyxl reader for a values-only cell: blanks become "", integral numbers int and
+# Excel error values NaN.
+def _stream_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, str) and value in ERROR_CODES:
+        return float("nan")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+# Reads one sheet as a DataFrame from either parser mode's workbook.
+def _read_sheet(workbook: "pd.ExcelFile | _StreamingWorkbook", sheet_name: str, *, header: int | None) -> pd.DataFrame:
+    if isinstance(workbook, _StreamingWorkbook):
+        return workbook.read_sheet(sheet_name, header=header)
+    return pd.read_excel(workbook, sheet_name=sheet_name, header=header)
+
+
 # Finds the sheet that best matches any of the provided candidate names, using normalization and partial matching.
-def _find_sheet_name(workbook: pd.ExcelFile, *candidate_names: str) -> str | None:
+def _find_sheet_name(workbook: "pd.ExcelFile | _StreamingWorkbook", *candidate_names: str) -> str | None:
     normalized = {_normalize_label(name): name for name in workbook.sheet_names}
     for candidate in candidate_names:
         key = _normalize_label(candidate)
@@ -55,7 +161,7 @@ def _find_sheet_name(workbook: pd.ExcelFile, *candidate_names: str) -> str | Non
 
 
 # Parses the event_setup sheet to extract configuration values, applying defaults and normalization as needed.
-def _parse_event_setup(workbook: pd.ExcelFile) -> dict:
+def _parse_event_setup(workbook: "pd.ExcelFile | _StreamingWorkbook") -> dict:
     defaults = {
         "number_of_tables": 6,
         "min_people_per_table": 4,
@@ -68,7 +174,7 @@ def _parse_event_setup(workbook: pd.ExcelFile) -> dict:
     if sheet is None:
         return defaults
 
-    raw = pd.read_excel(workbook, sheet_name=sheet, header=None)
+    raw = _read_sheet(workbook, sheet, header=None)
     values = {}
     for _, row in raw.iterrows():
         key = _normalize_label(row.iloc[0])
@@ -89,7 +195,7 @@ def _parse_event_setup(workbook: pd.ExcelFile) -> dict:
 
 
 # Parses the traits sheet to extract characteristics and trait constraints.
-def _parse_traits_sheet(workbook: pd.ExcelFile) -> dict:
+def _parse_traits_sheet(workbook: "pd.ExcelFile | _StreamingWorkbook") -> dict:
     sheet = _find_sheet_name(workbook, "traits")
     if sheet is None:
         return {
@@ -99,7 +205,7 @@ def _parse_traits_sheet(workbook: pd.ExcelFile) -> dict:
             "trait_min_required": {},
         }
 
-    traits_df = pd.read_excel(workbook, sheet_name=sheet, header=1)
+    traits_df = _read_sheet(workbook, sheet, header=1)
     traits_df.columns = [str(col).strip() for col in traits_df.columns]
 
     trait_indices = sorted(
@@ -165,14 +271,14 @@ def _parse_traits_sheet(workbook: pd.ExcelFile) -> dict:
 
 
 # Reads the participants sheet from the workbook as a DataDrame.
-def _read_participants_sheet(workbook: pd.ExcelFile) -> pd.DataFrame:
+def _read_participants_sheet(workbook: "pd.ExcelFile | _StreamingWorkbook") -> pd.DataFrame:
     sheet = _find_sheet_name(workbook, "participants")
     if sheet is None:
         raise ValueError(
             "Could not find a 'participants' sheet in the uploaded file. "
             f"Available sheets: {', '.join(workbook.sheet_names)}"
         )
-    return pd.read_excel(workbook, sheet_name=sheet, header=1)
+    return _read_sheet(workbook, sheet, header=1)
 
 
 # Parses the table_lock sheet to extract any participants locked to specific tables, returning a mapping of Participant_ID to locked table number.
@@ -188,12 +294,12 @@ def _parse_locked_table_value(value) -> int | None:
     return None
 
 
-def _parse_table_lock_sheet(workbook: pd.ExcelFile, table_count: int) -> dict[str, int]:
+def _parse_table_lock_sheet(workbook: "pd.ExcelFile | _StreamingWorkbook", table_count: int) -> dict[str, int]:
     sheet = _find_sheet_name(workbook, "table_lock", "table locks")
     if sheet is None:
         return {}
 
-    locks_df = pd.read_excel(workbook, sheet_name=sheet, header=1)
+    locks_df = _read_sheet(workbook, sheet, header=1)
     if locks_df.empty:
         return {}
 
@@ -221,12 +327,12 @@ def _parse_table_lock_sheet(workbook: pd.ExcelFile, table_count: int) -> dict[st
     return locks
 
 
-def _parse_participant_lock_sheet(workbook: pd.ExcelFile) -> list[tuple[str, str]]:
+def _parse_participant_lock_sheet(workbook: "pd.ExcelFile | _StreamingWorkbook") -> list[tuple[str, str]]:
     sheet = _find_sheet_name(workbook, "participant_lock", "participant locks")
     if sheet is None:
         return []
 
-    locks_df = pd.read_excel(workbook, sheet_name=sheet, header=1)
+    locks_df = _read_sheet(workbook, sheet, header=1)
     if locks_df.empty:
         return []
 
@@ -258,6 +364,19 @@ def _parse_participant_lock_sheet(workbook: pd.ExcelFile) -> list[tuple[str, str
     return separation_pairs
 
 
+# _clean_text applied to a whole column: blanks become "" and everything else its stripped text.
+def _clean_column(values: pd.Series) -> pd.Series:
+    return values.where(values.notna(), "").astype(str).str.strip()
+
+
+# The cleaned text of the given columns flattened row by row (all columns of the first row, then the second, ...).
+def _melt_pairs(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    if not columns:
+        return np.array([], dtype=object)
+    cleaned = np.column_stack([_clean_column(df[col]).to_numpy(dtype=object) for col in columns])
+    return cleaned.ravel()
+
+
 # Normalizes and transforms the raw participants DataFrame, extracting Participant_ID, Name, and characteristic-trait pairs
 # into a clean format suitable for the solver. Also returns the list of characteristics and count of generated IDs.
 def _transform_participants(raw_df: pd.DataFrame, characteristics_from_traits: list[str]) -> tuple[pd.DataFrame, list[str], int]:
@@ -321,32 +440,37 @@ def _transform_participants(raw_df: pd.DataFrame, characteristics_from_traits: l
             seen_characteristics.add(c_text)
             characteristics.append(c_text)
 
-    records = []
-    for _, row in df.iterrows():
-        participant_id = _clean_text(row.get("Participant_ID", ""))
-        name = _clean_text(row.get("Name", ""))
-        trait_map = {}
-
-        for idx in pair_indices:
-            characteristic = _clean_text(row.get(characteristic_cols[idx], ""))
-            trait = _clean_text(row.get(trait_cols[idx], ""))
-            if not characteristic or not trait:
-                continue
-            trait_map[characteristic] = trait
-            if characteristic not in seen_characteristics:
-                seen_characteristics.add(characteristic)
-                characteristics.append(characteristic)
-
-        if not participant_id and not name and not trait_map:
-            continue
+    participant_ids = _clean_column(df["Participant_ID"])
+    names = _clean_column(df["Name"])
 
-        record = {"Participant_ID": participant_id, "Name": name}
-        record.update(trait_map)
-        records.append(record)
+    # Wide to long: one entry per participant and Characteristic_N/Trait_N pair, in row-major order so that
+    # characteristics keep the order they are first seen in. A repeated characteristic keeps its last trait.
+    pairs = pd.DataFrame(
+        {
+            "row": np.repeat(np.arange(len(df)), len(pair_indices)),
+            "characteristic": _melt_pairs(df, [characteristic_cols[idx] for idx in pair_indices]),
+            "trait": _melt_pairs(df, [trait_cols[idx] for idx in pair_indices]),
+        }
+    )
+    pairs = pairs[pairs["characteristic"].ne("") & pairs["trait"].ne("")]
+    for characteristic in pairs["characteristic"].drop_duplicates():
+        if characteristic not in seen_characteristics:
+            seen_characteristics.add(characteristic)
+            characteristics.append(characteristic)
+    pairs = pairs.drop_duplicates(["row", "characteristic"], keep="last")
 
-    out = pd.DataFrame(records)
-    if out.empty:
+    # Rows with no ID, name or trait are dropped.
+    kept = np.flatnonzero(participant_ids.ne("").to_numpy() | names.ne("").to_numpy())
+    kept = np.union1d(kept, pairs["row"].unique())
+    if len(kept) == 0:
         out = pd.DataFrame(columns=["Participant_ID", "Name", *characteristics])
+    else:
+        traits = pairs.pivot(index="row", columns="characteristic", values="trait")
+        out = pd.DataFrame(
+            {"Participant_ID": participant_ids.to_numpy()[kept], "Name": names.to_numpy()[kept]},
+            index=kept,
+        ).join(traits)
+        out.columns.name = None
 
     for characteristic in characteristics:
         if characteristic not in out.columns:
@@ -362,10 +486,30 @@ def _transform_participants(raw_df: pd.DataFrame, characteristics_from_traits: l
     return out.reset_index(drop=True), characteristics, generated_ids
 
 
+# Opens the uploaded file for _parse_template: streaming through openpyxl when asked for and possible, otherwise (or
+# for legacy .xls files openpyxl cannot read) through pd.ExcelFile.
+def _open_workbook(uploaded_file, *, streaming: bool) -> "pd.ExcelFile | _StreamingWorkbook":
+    if streaming:
+        try:
+            return _StreamingWorkbook(uploaded_file)
+        except (InvalidFileException, zipfile.BadZipFile, KeyError):
+            if hasattr(uploaded_file, "seek"):
+                uploaded_file.seek(0)
+    return pd.ExcelFile(uploaded_file)
+
+
 # Parses the uploaded template file to extract event setup, traits configuration,
 # participant data, table locks, and participant separation locks. Returns a structured dictionary of all parsed information.
-def _parse_template(uploaded_file) -> dict:
-    workbook = pd.ExcelFile(uploaded_file)
+# streaming=False reads every sheet with pd.read_excel instead; both modes give the same result.
+def _parse_template(uploaded_file, *, streaming: bool = True) -> dict:
+    workbook = _open_workbook(uploaded_file, streaming=streaming)
+    try:
+        return _parse_workbook(workbook)
+    finally:
+        workbook.close()
+
+
+def _parse_workbook(workbook: "pd.ExcelFile | _StreamingWorkbook") -> dict:
     event_setup = _parse_event_setup(workbook)
     traits_config = _parse_traits_sheet(workbook)
     raw_participants = _read_participants_sheet(workbook)
@@ -389,6 +533,90 @@ def _parse_template(uploaded_file) -> dict:
     }
 
 
+# Cache of parsed templates, keyed by a hash of the uploaded bytes, so Streamlit reruns of the
+# setup page do not parse the same workbook again. Entries live in a bounded in-memory LRU shared by all sessions and,
+# when a cache_dir is given, also as pickle files there that outlive the process; the directory is trimmed to
+# _PARSED_CACHE_MAX_BYTES by least recent use like the solve cache. Cached results are shared, so callers must not
+# modify them in place.
+_PARSED_CACHE: OrderedDict[str, dict] = OrderedDict()
+_PARSED_CACHE_LOCK = threading.Lock()
+_PARSED_CACHE_MAX_ENTRIES = 8
+_PARSED_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_PARSED_CACHE_FORMAT_VERSION = 1
+
+
+# Parsed template for the workbook bytes data, parsing it only on a cache miss. key is a content hash of data, such as
+# solve_jobs.workbook_key gives.
+def parse_template_cached(key: str, data: bytes, *, cache_dir: str | Path | None = None) -> dict:
+    parsed = cached_template(key, cache_dir=cache_dir)
+    if parsed is not None:
+        return parsed
+    parsed = _parse_template(io.BytesIO(data))
+    _remember_template(key, parsed)
+    if cache_dir is not None:
+        _store_template(Path(cache_dir), key, parsed)
+    return parsed
+
+
+# Parsed template for key if it is cached in memory or in cache_dir, otherwise None.
+def cached_template(key: str, *, cache_dir: str | Path | None = None) -> dict | None:
+    with _PARSED_CACHE_LOCK:
+        parsed = _PARSED_CACHE.get(key)
+        if parsed is not None:
+            _PARSED_CACHE.move_to_end(key)
+            return parsed
+    if cache_dir is None:
+        return None
+    parsed = _load_template(Path(cache_dir), key)
+    if parsed is not None:
+        _remember_template(key, parsed)
+    return parsed
+
+
+def _remember_template(key: str, parsed: dict) -> None:
+    with _PARSED_CACHE_LOCK:
+        _PARSED_CACHE[key] = parsed
+        _PARSED_CACHE.move_to_end(key)
+        while len(_PARSED_CACHE) > _PARSED_CACHE_MAX_ENTRIES:
+            _PARSED_CACHE.popitem(last=False)
+
+
+# Unreadable files and files written by another cache format version are dropped.
+def _load_template(cache_dir: Path, key: str) -> dict | None:
+    path = cache_dir / f"{key}.pkl"
+    try:
+        with open(path, "rb") as handle:
+            version, parsed = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        path.unlink(missing_ok=True)
+        return None
+    if version != _PARSED_CACHE_FORMAT_VERSION:
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)
+    return parsed
+
+
+def _store_template(cache_dir: Path, key: str, parsed: dict) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{key}.pkl"
+    partial = cache_dir / f"{key}.{os.getpid()}.partial"
+    with open(partial, "wb") as handle:
+        pickle.dump((_PARSED_CACHE_FORMAT_VERSION, parsed), handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+
+    entries = sorted(cache_dir.glob("*.pkl"), key=lambda entry: entry.stat().st_mtime)
+    total = sum(entry.stat().st_size for entry in entries)
+    for entry in entries:
+        if total <= _PARSED_CACHE_MAX_BYTES:
+            break
+        if entry != path:
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+
+
 # Diversity score for each table.
 def table_diversity_score(table_df: pd.DataFrame, diversity_cols: list[str]) -> int:
     score = 0
@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks.synthetic import synthetic_event
+from solver_backend import solve_solver_v2
+
+
+# The compact formulation (see _solve_with_pair_cuts) must reach the full formulation's optimum. The events are
+# small enough for both to prove optimality, and have more rounds than a table can seat without repeat meetings,
+# so the pair cuts are exercised. The warm start is off so the cut loop itself finds the schedule.
+@pytest.mark.parametrize(
+    "num_people, num_tables, num_rounds, options",
+    [
+        (6, 2, 3, {}),
+        (8, 2, 3, {}),
+        (8, 2, 3, {"num_locks": 2, "num_separations": 1}),
+    ],
+)
+def test_compact_formulation_reaches_full_optimum(num_people, num_tables, num_rounds, options):
+    inputs = synthetic_event(num_people, num_tables, num_rounds, seed=2, **options)
+
+    results = {}
+    for formulation in ("full", "compact"):
+        _, _, objective, gap = solve_solver_v2(**inputs, formulation=formulation, warm_start=False)
+        assert gap == pytest.approx(0.0, abs=1e-9), formulation
+        results[formulation] = objective
+    assert results["compact"] == pytest.approx(results["full"])
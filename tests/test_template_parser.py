@@ -0,0 +1,121 @@
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from template_parser import _STREAM_BLANK_ROW_LIMIT, TEMPLATE_PATH, _last_value_row, _parse_template
+
+
+# The streaming openpyxl reader must parse a template exactly as the pd.read_excel path does.
+
+pytestmark = pytest.mark.filterwarnings("ignore:Data Validation extension:UserWarning")
+
+
+_TRAITS = {
+    "Expertise": ["Social Science", "Computational/Math", "Real World"],
+    "Lived Experience?": ["Yes", "No"],
+    "Minnesota?": ["Yes", "No"],
+}
+
+
+# A filled-in template with num_people participants in the sample's layout. After the first num_people - 50 of them
+# comes a run of blank rows longer than the streaming reader's blank-row check, then the rest.
+def _generated_template(num_people: int) -> bytes:
+    book = openpyxl.Workbook()
+    setup = book.active
+    setup.title = "EVENT_SETUP"
+    setup.append(["Fill BLUE cells only. Defines event constraints and generates Table_List"])
+    setup.append([])
+    setup.append(["Number_of_Tables", 40, None, "Table_List (auto)"])
+    setup.append(["Min_People_Per_Table", 8, None, "Table_1"])
+    setup.append(["Max_People_Per_Table", 12, None, "Table_2"])
+    setup.append(["Optimization_Stage", "Multi"])
+    setup.append(["Number_of_Rounds (if Multi)", 4])
+
+    traits = book.create_sheet("TRAITS")
+    traits.append(["Each row = one characteristic."])
+    fields = ("Trait", "Target", "MaxAllowed", "MinRequired")
+    traits.append(["Characteristics"] + [f"{field}_{k}" for k in range(1, 4) for field in fields])
+    for characteristic, values in _TRAITS.items():
+        traits.append([characteristic] + [cell for value in values for cell in (value, 2, 12, 0)])
+
+    participants = book.create_sheet("PARTICIPANTS")
+    participants.append(["Enter Participant_ID, Name here and Characteristics"])
+    fields = ("Characteristic", "Trait")
+    participants.append(["Participant_ID*", "Name"] + [f"{field}_{c}" for c in range(1, 4) for field in fields])
+    gap_after = num_people - 50
+    for i in range(num_people):
+        if i == gap_after:
+            for _ in range(_STREAM_BLANK_ROW_LIMIT + 500):
+                participants.append([])
+        participant_id = None if i % 997 == 5 else (i + 1 if i % 3 else f" P{i + 1} ")
+        row = [participant_id, f"Person {i}"]
+        for c, (characteristic, values) in enumerate(_TRAITS.items()):
+            row += [characteristic, values[(i * (c + 2)) % len(values)] if i % 101 != 7 else None]
+        participants.append(row)
+
+    locks = book.create_sheet("TABLE_LOCK")
+    locks.append(["Optional: lock participants to a table"])
+    locks.append(["Participant_ID", "Locked_Table"])
+    for i in range(1, 30, 3):
+        locks.append([i + 1, f"Table_{i % 40 + 1}"])
+
+    separations = book.create_sheet("PARTICIPANT_LOCK")
+    separations.append(["Optional: block participants from sitting with eachother"])
+    separations.append(["Participant_ID1", "Participant_ID2"])
+    for i in range(10, 40, 4):
+        separations.append([i + 1, i + 2])
+
+    buffer = io.BytesIO()
+    book.save(buffer)
+    return buffer.getvalue()
+
+
+def _assert_same_parse(streamed: dict, read: dict) -> None:
+    assert streamed.keys() == read.keys()
+    for name, expected in read.items():
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(streamed[name], expected, obj=name)
+        else:
+            assert streamed[name] == expected, name
+
+
+def test_streaming_parse_matches_read_excel_on_packaged_template():
+    _assert_same_parse(_parse_template(TEMPLATE_PATH, streaming=True), _parse_template(TEMPLATE_PATH, streaming=False))
+
+
+def test_streaming_parse_matches_read_excel_on_large_template():
+    data = _generated_template(4000)
+    streamed = _parse_template(io.BytesIO(data), streaming=True)
+    read = _parse_template(io.BytesIO(data), streaming=False)
+    _assert_same_parse(streamed, read)
+    # Participants after the long blank gap are read too.
+    assert streamed["participants_df"]["Participant_ID"].iloc[-1] == "P4000"
+
+
+# _last_value_row reads the raw sheet XML through openpyxl's private ReadOnlyWorksheet._get_source().
+def test_last_value_row_on_packaged_template():
+    book = openpyxl.load_workbook(TEMPLATE_PATH, read_only=True, data_only=True, keep_links=False)
+    try:
+        last_rows = {name: _last_value_row(book[name]) for name in book.sheetnames}
+    finally:
+        book.close()
+    # TRAITS is formatted down to the last Excel row but holds values only in its first five.
+    assert last_rows == {"EVENT_SETUP": 9, "TRAITS": 5, "PARTICIPANTS": 32, "TABLE_LOCK": 8, "PARTICIPANT_LOCK": 2}
+
+
+def test_last_value_row_on_generated_sheets():
+    book = openpyxl.Workbook()
+    book.active.title = "Empty"
+    sheet = book.create_sheet("Far")
+    sheet["A5"] = 3
+    sheet["C2000"] = "x"
+    buffer = io.BytesIO()
+    book.save(buffer)
+    book = openpyxl.load_workbook(buffer, read_only=True, data_only=True, keep_links=False)
+    try:
+        assert _last_value_row(book["Empty"]) == 0
+        assert _last_value_row(book["Far"]) == 2000
+    finally:
+        book.close()
@@ -1,7 +1,18 @@
+import uuid
+
+import pandas as pd
 import streamlit as st
 
-from solver_backend import solve_solver_v2
-from template_parser import TEMPLATE_PATH, _parse_template
+from solve_jobs import discard_solve, get_solve, solve_key, start_solve, workbook_key
+from solver_backend import _preflight_from_params, _prepare_parameters
+from template_parser import TEMPLATE_PATH, parse_template_cached
+
+_STRATEGY_LABELS = {
+    "mip": "Full optimization",
+    "decomposition": "Round by round",
+    "profiles": "Profile balancing",
+    "heuristic": "Fast heuristic",
+}
 
 
 # Template upload and participant setup page. Users download the template, fill it out, and upload it.
@@ -53,8 +64,11 @@ def render(go_to) -> None:
         st.info("Download the template above, fill it out, then upload the completed Excel file.")
         st.stop()
 
+    # Parsed once per workbook; reruns of this page find it in the template cache under its content hash.
+    workbook_bytes = uploaded.getvalue()
+    workbook_hash = workbook_key(workbook_bytes)
     try:
-        parsed = _parse_template(uploaded)
+        parsed = parse_template_cached(workbook_hash, workbook_bytes)
     except ValueError as exc:
         st.error(str(exc))
         st.stop()
@@ -71,8 +85,7 @@ def render(go_to) -> None:
     if parsed["generated_ids"] > 0:
         st.warning(f"Generated {parsed['generated_ids']} missing Participant_ID values as AUTO_*.")
 
-    st.session_state["uploaded_df"] = parsed["raw_participants"]
-    st.session_state["df"] = participants_df
+    # The participant frames stay in the template cache; the results page only needs the small settings below.
     st.session_state["event_setup"] = event_setup
     st.session_state["characteristics"] = characteristics
     st.session_state["trait_targets"] = parsed["trait_targets"]
@@ -97,9 +110,25 @@ def render(go_to) -> None:
     )
 
     st.subheader("Current Participant Data")
-    st.dataframe(st.session_state["uploaded_df"], use_container_width=True, hide_index=True)
+    st.dataframe(parsed["raw_participants"], use_container_width=True, hide_index=True)
 
+    # The solve's problem inputs; the preflight estimate is computed from the same prepared parameters the solver builds
+    # its model from.
+    problem = {
+        "df": participants_df,
+        "characteristics": characteristics,
+        "num_tables": event_setup["number_of_tables"],
+        "num_rounds": event_setup["number_of_rounds"],
+        "min_people_per_table": event_setup["min_people_per_table"],
+        "max_people_per_table": event_setup["max_people_per_table"],
+        "trait_targets": parsed["trait_targets"],
+        "trait_max_allowed": parsed["trait_max_allowed"],
+        "trait_min_required": parsed["trait_min_required"],
+        "locked_tables": locks,
+        "separation_pairs": participant_locks,
+    }
     invalid_count = len(participants_df) < min_total or len(participants_df) > max_total
+    estimate = None
     if invalid_count:
         st.error(
             f"Participant count must be between {min_total} and {max_total} "
@@ -107,37 +136,123 @@ def render(go_to) -> None:
             f"{event_setup['min_people_per_table']}-{event_setup['max_people_per_table']}."
         )
     else:
-        st.info("Group assignments can take up to 10 minutes to generate.")
+        try:
+            estimate = _preflight_from_params(_prepare_parameters(**problem))
+        except ValueError as exc:
+            st.error(str(exc))
+        else:
+            _render_preflight(estimate)
+            st.info("Group assignments can take up to 10 minutes to generate.")
+
+    job_key = solve_key(_session_id(), workbook_hash)
+    job = get_solve(job_key)
 
     left, right = st.columns(2)
     with left:
         if st.button("Back to Landing"):
             go_to(1)
     with right:
-        if st.button("Generate Groupings", type="primary", disabled=invalid_count):
-            with st.spinner("Solving group assignments..."):
-                try:
-                    participant_results, schedule_results, objective_value, optimality_gap = solve_solver_v2(
-                        participants_df,
-                        debug=True,
-                        time_limit_seconds=600.0,
-                        characteristics=characteristics,
-                        num_tables=event_setup["number_of_tables"],
-                        num_rounds=event_setup["number_of_rounds"],
-                        min_people_per_table=event_setup["min_people_per_table"],
-                        max_people_per_table=event_setup["max_people_per_table"],
-                        trait_targets=parsed["trait_targets"],
-                        trait_max_allowed=parsed["trait_max_allowed"],
-                        trait_min_required=parsed["trait_min_required"],
-                        locked_tables=locks,
-                        separation_pairs=participant_locks,
-                    )
-                except Exception as exc:
-                    st.error(f"Solver failed: {exc}")
-                    st.stop()
-
-            st.session_state["participant_results"] = participant_results
-            st.session_state["schedule_results"] = schedule_results
-            st.session_state["objective_value"] = objective_value
-            st.session_state["optimality_gap"] = optimality_gap
+        if job is None and st.button("Generate Groupings", type="primary", disabled=estimate is None):
+            start_solve(
+                job_key,
+                debug=True,
+                time_limit_seconds=600.0,
+                method=estimate["method"],
+                use_cache=True,
+                **problem,
+            )
+            st.session_state["awaiting_solve"] = job_key
+            st.rerun()
+
+    if job is not None:
+        _render_solve_status(job, go_to)
+
+
+# Random token identifying this browser session's solves. It is kept in session state and mirrored in the page URL,
+# so a browser refresh (which starts a new Streamlit session) reconnects to the same background solve.
+def _session_id() -> str:
+    session_id = st.session_state.get("solve_session") or st.query_params.get("session") or uuid.uuid4().hex
+    st.session_state["solve_session"] = session_id
+    if st.query_params.get("session") != session_id:
+        st.query_params["session"] = session_id
+    return session_id
+
+
+# Predicted model size and the solve strategy picked for it, shown before the user starts the solve.
+def _render_preflight(estimate: dict) -> None:
+    full = estimate["full"]
+    st.subheader("Solve Plan")
+    variables_col, constraints_col, strategy_col = st.columns(3)
+    variables_col.metric("Model variables", f"{full['columns']:,}")
+    constraints_col.metric("Model constraints", f"{full['rows']:,}")
+    strategy_col.metric("Strategy", _STRATEGY_LABELS[estimate["method"]])
+    st.caption(f"{estimate['difficulty'].capitalize()} model ({full['nonzeros']:,} nonzeros). {estimate['reason']}")
+
+
+def _accept_result(result, stats: dict | None = None) -> None:
+    participant_results, schedule_results, objective_value, optimality_gap = result
+    st.session_state["participant_results"] = participant_results
+    st.session_state["schedule_results"] = schedule_results
+    st.session_state["objective_value"] = objective_value
+    st.session_state["optimality_gap"] = optimality_gap
+    st.session_state["solve_stats"] = stats
+
+
+# Shows the background solve for the uploaded workbook. A run that finishes while this session waits on it opens
+# the results page; a run found finished later (e.g. after a refresh and re-upload) offers its results instead.
+def _render_solve_status(job, go_to) -> None:
+    snapshot = job.snapshot()
+    if snapshot["status"] == "running":
+        st.session_state["awaiting_solve"] = job.key
+        _render_solve_progress(job)
+        return
+
+    if snapshot["status"] == "failed":
+        st.session_state.pop("awaiting_solve", None)
+        st.error(f"Solver failed: {snapshot['error']}")
+        if st.button("Try Again"):
+            discard_solve(job.key)
+            st.rerun()
+        return
+
+    if st.session_state.pop("awaiting_solve", None) == job.key:
+        _accept_result(snapshot["result"], snapshot["stats"])
+        go_to(3)
+
+    st.success("Group assignments for this file are ready.")
+    left, right = st.columns(2)
+    with left:
+        if st.button("View Results", type="primary"):
+            _accept_result(snapshot["result"], snapshot["stats"])
             go_to(3)
+    with right:
+        if st.button("Solve Again"):
+            discard_solve(job.key)
+            st.rerun()
+
+
+# Live view of a running solve, refreshed every second without rerunning the whole page.
+@st.fragment(run_every=1.0)
+def _render_solve_progress(job) -> None:
+    snapshot = job.snapshot()
+    if snapshot["status"] != "running":
+        st.rerun()
+
+    incumbent = snapshot["incumbent"]
+    st.info("Solving group assignments in the background. Stop at any time to keep the best schedule found so far.")
+    elapsed_col, objective_col, gap_col = st.columns(3)
+    elapsed_col.metric("Elapsed", f"{snapshot['elapsed_seconds']:.0f} s")
+    objective_col.metric("Best objective", "-" if incumbent is None else f"{incumbent['objective']:,.0f}")
+    gap = None if incumbent is None else incumbent["gap"]
+    gap_col.metric("Optimality gap", "-" if gap is None else f"{gap:.1%}")
+    if len(snapshot["history"]) > 1:
+        history = pd.DataFrame(snapshot["history"]).set_index("elapsed_seconds")
+        st.line_chart(history["objective"], x_label="Seconds", y_label="Objective")
+
+    if snapshot["stopping"]:
+        st.caption("Stopping the solver...")
+        return
+    if incumbent is None:
+        st.caption("No schedule found yet. Stopping now ends the solve without results.")
+    if st.button("Stop and Use Best Schedule"):
+        job.stop()
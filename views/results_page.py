@@ -1,11 +1,21 @@
+import hashlib
+import json
+import threading
+import zipfile
+from collections import OrderedDict
 from copy import copy
+from functools import partial
 from io import BytesIO
 from pathlib import Path
+import numpy as np
+import pandas as pd
 import streamlit as st
 from openpyxl import load_workbook
-from openpyxl.styles import Border, Side
+from openpyxl.styles import Border, NamedStyle, Side
 from openpyxl.utils import get_column_letter
-from template_parser import _clean_text, table_diversity_score
+import scoring
+from solver_backend import _prepare_parameters
+from template_parser import _clean_text
 
 
 OUTPUT_TEMPLATE_CANDIDATES = [
@@ -22,41 +32,43 @@ def _get_output_template_path() -> Path | None:
     return None
 
 
-def _normalized_table_diversity_score(table_df, diversity_cols: list[str]) -> float:
-    characteristic_count = max(1, len(diversity_cols))
-    participant_count = max(1, len(table_df))
-    raw_score = float(table_diversity_score(table_df, diversity_cols))
-    return raw_score / characteristic_count / participant_count
+# Builds the solver parameter object for the solved roster. Table scores and trait counts on this page are read
+# from its participants x trait-values incidence matrix B, so they match what the model optimized.
+def _scoring_parameters(
+    participant_results,
+    diversity_cols: list[str],
+    trait_targets: dict,
+    trait_max_allowed: dict,
+    trait_min_required: dict,
+) -> dict:
+    return _prepare_parameters(
+        participant_results,
+        characteristics=diversity_cols,
+        trait_targets=trait_targets,
+        trait_max_allowed=trait_max_allowed,
+        trait_min_required=trait_min_required,
+    )
 
 
-def _calculate_total_balance_std_dev(schedule_results, participant_results, diversity_cols: list[str]) -> float:
-    all_rounds = sorted(schedule_results["Round"].unique().tolist())
-    round_average_scores = []
+# Scores of every table of the schedule (see scoring): the assignment matrix, table sizes, trait counts and
+# diversity scores, the latter counting the traits of the diversity characteristics present at each table.
+def _schedule_scores(schedule_results, scoring_params: dict, diversity_cols: list[str]) -> dict:
+    num_tables = int(schedule_results["Table"].max()) if not schedule_results.empty else 0
+    assignment = scoring.schedule_assignment(schedule_results, len(scoring_params["I"]))
+    wanted = {_clean_text(col) for col in diversity_cols}
+    characteristic_names = np.array(scoring_params["K"], dtype=object)[scoring_params["trait_characteristic"]]
+    in_scope = np.array([name in wanted for name in characteristic_names], dtype=bool)
+    trait_counts = scoring.table_trait_counts(scoring_params["B"], assignment, num_tables)
+    return {
+        "assignment": assignment,
+        "sizes": scoring.table_sizes(assignment, num_tables),
+        "trait_counts": trait_counts,
+        "diversity": scoring.diversity_scores(trait_counts, in_scope),
+    }
 
-    for round_number in all_rounds:
-        round_df = schedule_results[schedule_results["Round"] == round_number]
-        table_numbers = sorted(round_df["Table"].unique().tolist())
-        table_scores = []
-        for table_number in table_numbers:
-            table_rows = round_df[round_df["Table"] == table_number]
-            person_indices = table_rows["Person_Index"].astype(int).tolist()
-            table_df = participant_results.iloc[person_indices]
-            table_scores.append(_normalized_table_diversity_score(table_df, diversity_cols))
-
-        if table_scores:
-            round_average_scores.append(sum(table_scores) / len(table_scores))
-
-    if not round_average_scores:
-        return 0.0
-
-    if len(round_average_scores) == 1:
-        std_dev = 0.0
-    else:
-        mean_score = sum(round_average_scores) / len(round_average_scores)
-        variance = sum((score - mean_score) ** 2 for score in round_average_scores) / len(round_average_scores)
-        std_dev = variance ** 0.5
 
-    return max(0.0, float(std_dev))
+def _calculate_total_balance_std_dev(scores: dict, diversity_cols: list[str]) -> float:
+    return scoring.balance_std_dev(scores["diversity"], scores["sizes"], len(diversity_cols))
 
 
 def _total_balance_status(total_balance_std_dev: float) -> str:
@@ -77,28 +89,43 @@ def _find_row_by_first_cell(worksheet, label: str) -> int | None:
     return None
 
 
-def _copy_cell_format(source_cell, target_cell) -> None:
-    target_cell.font = copy(source_cell.font)
-    target_cell.fill = copy(source_cell.fill)
-    target_cell.border = copy(source_cell.border)
-    target_cell.alignment = copy(source_cell.alignment)
-    target_cell.number_format = source_cell.number_format
-    target_cell.protection = copy(source_cell.protection)
+# Gives target_cell the format of source_cell (plus an optional border and number format). Setting fonts, fills and
+# borders through openpyxl's style proxies registers each of them with the workbook again, which made large exports
+# take tens of seconds; each distinct format is registered once as a NamedStyle, whose name styles caches, and later
+# cells are assigned that style by name. A template cell's format is read when it is first used, as before.
+def _format_cell(styles: dict, source_cell, target_cell, *, border: Border | None = None, number_format=None) -> None:
+    key = (source_cell.parent.title, source_cell.coordinate, id(border), number_format)
+    name = styles.get(key)
+    if name is None:
+        name = f"Results format {len(styles) + 1}"
+        target_cell.parent.parent.add_named_style(
+            NamedStyle(
+                name=name,
+                font=copy(source_cell.font),
+                fill=copy(source_cell.fill),
+                border=copy(source_cell.border) if border is None else border,
+                alignment=copy(source_cell.alignment),
+                number_format=source_cell.number_format if number_format is None else number_format,
+                protection=copy(source_cell.protection),
+            )
+        )
+        styles[key] = name
+    target_cell.style = name
 
 
+# Clears the values of the sheet's cells from start_row down, keeping their formatting. Only cells that exist are
+# visited, so no empty cells are added to the sheet.
 def _clear_sheet_rows(worksheet, start_row: int) -> None:
     for merged_range in list(worksheet.merged_cells.ranges):
         if merged_range.max_row >= start_row:
             worksheet.unmerge_cells(str(merged_range))
 
-    clear_end_row = max(worksheet.max_row, start_row + 500)
-    clear_end_col = max(worksheet.max_column, 200)
-    for row_idx in range(start_row, clear_end_row + 1):
-        for col_idx in range(1, clear_end_col + 1):
-            worksheet.cell(row=row_idx, column=col_idx).value = None
+    for row in worksheet.iter_rows(min_row=start_row, max_row=worksheet.max_row):
+        for cell in row:
+            cell.value = None
 
 
-def _write_current_assignments_view(workbook, display_schedule, event_setup: dict) -> None:
+def _write_current_assignments_view(workbook, display_schedule, event_setup: dict, styles: dict) -> None:
     if "Current Assignments" not in workbook.sheetnames:
         raise ValueError("Output template is missing the 'Current Assignments' sheet.")
 
@@ -127,20 +154,16 @@ def _write_current_assignments_view(workbook, display_schedule, event_setup: dic
     table_count = configured_table_count or detected_table_count
 
     max_col = max(1, len(display_schedule.columns))
-    clear_end_row = max(worksheet.max_row, 6 + participant_count + 50)
-    clear_end_col = max(worksheet.max_column, max_col + 5)
-    for row_idx in range(1, clear_end_row + 1):
-        for col_idx in range(1, clear_end_col + 1):
-            worksheet.cell(row=row_idx, column=col_idx).value = None
+    _clear_sheet_rows(worksheet, 1)
 
     worksheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=max_col)
     title_cell = worksheet.cell(row=1, column=1)
-    _copy_cell_format(title_template, title_cell)
+    _format_cell(styles, title_template, title_cell)
     title_cell.value = "Seating Assignments (by Round)"
 
     worksheet.merge_cells(start_row=3, start_column=1, end_row=3, end_column=max_col)
     summary_cell = worksheet.cell(row=3, column=1)
-    _copy_cell_format(text_body_template, summary_cell)
+    _format_cell(styles, text_body_template, summary_cell)
     summary_cell.value = (
         f"Participants: {participant_count} | "
         f"Rounds: {round_count} | "
@@ -150,18 +173,17 @@ def _write_current_assignments_view(workbook, display_schedule, event_setup: dic
     worksheet.column_dimensions["A"].width = 22
     for col_idx, column_name in enumerate(display_schedule.columns, start=1):
         header_cell = worksheet.cell(row=5, column=col_idx)
-        _copy_cell_format(header_template, header_cell)
+        _format_cell(styles, header_template, header_cell)
         header_cell.value = column_name
         if col_idx > 1:
             worksheet.column_dimensions[get_column_letter(col_idx)].width = 14
 
-    for row_offset, (_, row) in enumerate(display_schedule.iterrows(), start=1):
+    for row_offset, row in enumerate(display_schedule.itertuples(index=False), start=1):
         target_row = 5 + row_offset
-        for col_idx, column_name in enumerate(display_schedule.columns, start=1):
-            value = row[column_name]
+        for col_idx, value in enumerate(row, start=1):
             cell = worksheet.cell(row=target_row, column=col_idx)
             template_cell = text_body_template if col_idx == 1 else number_body_template
-            _copy_cell_format(template_cell, cell)
+            _format_cell(styles, template_cell, cell)
             cell.value = value
 
     worksheet.freeze_panes = "A6"
@@ -229,35 +251,19 @@ def _trait_goal_text(
     return "No goal configured"
 
 
-def _trait_deviation(
-    actual_count: int,
-    key: tuple[str, str],
-    trait_targets: dict,
-    trait_max_allowed: dict,
-    trait_min_required: dict,
-) -> float:
-    min_required = trait_min_required.get(key)
-    max_allowed = trait_max_allowed.get(key)
-
-    lower = None if min_required is None else float(min_required)
-    upper = None if max_allowed is None else float(max_allowed)
-
-    deviation = 0.0
-    if lower is not None and actual_count < lower:
-        deviation += lower - float(actual_count)
-    if upper is not None and actual_count > upper:
-        deviation += float(actual_count) - upper
-    return deviation
+# One bound per trait in ordered_traits for scoring.bound_deviations, NaN where the trait has none.
+def _trait_bounds(ordered_traits: list[tuple[str, str]], bounds: dict) -> np.ndarray:
+    return np.array([np.nan if bounds.get(key) is None else float(bounds[key]) for key in ordered_traits])
 
 
 def _write_trait_deviation_view(
     workbook,
-    participant_results,
-    schedule_results,
-    characteristics: list[str],
+    deviations: pd.DataFrame,
+    ordered_traits: list[tuple[str, str]],
     trait_targets: dict,
     trait_max_allowed: dict,
     trait_min_required: dict,
+    styles: dict,
 ) -> None:
     if "Trait Deviation View" not in workbook.sheetnames:
         raise ValueError("Output template is missing the 'Trait Deviation View' sheet.")
@@ -276,37 +282,28 @@ def _write_trait_deviation_view(
     thin_side = Side(style="thin", color="FF000000")
     outlined_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
 
-    ordered_traits = _ordered_trait_keys(
-        participant_results,
-        characteristics,
-        trait_targets,
-        trait_max_allowed,
-        trait_min_required,
-    )
-
     if not ordered_traits:
         empty_title = worksheet.cell(row=start_row, column=1)
-        _copy_cell_format(dark_header_template, empty_title)
+        _format_cell(styles, dark_header_template, empty_title)
         empty_title.value = "No trait data available"
         worksheet.merge_cells(start_row=start_row, start_column=1, end_row=start_row, end_column=4)
 
         empty_message = worksheet.cell(row=start_row + 1, column=1)
-        _copy_cell_format(body_label_template, empty_message)
+        _format_cell(styles, body_label_template, empty_message)
         empty_message.value = "No characteristic-trait combinations were found in the solver output."
         worksheet.merge_cells(start_row=start_row + 1, start_column=1, end_row=start_row + 1, end_column=4)
         return
 
-    rounds = sorted(schedule_results["Round"].dropna().astype(int).unique().tolist())
     max_col = 1 + (2 * len(ordered_traits))
 
     worksheet.merge_cells(start_row=start_row, start_column=1, end_row=start_row, end_column=max_col)
     title_cell = worksheet.cell(row=start_row, column=1)
-    _copy_cell_format(dark_header_template, title_cell)
+    _format_cell(styles, dark_header_template, title_cell)
     title_cell.value = "Trait counts and deviations by round and table"
 
     worksheet.merge_cells(start_row=start_row + 1, start_column=1, end_row=start_row + 1, end_column=max_col)
     description_cell = worksheet.cell(row=start_row + 1, column=1)
-    _copy_cell_format(body_label_template, description_cell)
+    _format_cell(styles, body_label_template, description_cell)
     description_cell.value = (
         "Count shows the number of assigned participants with each trait. "
         "Deviation is 0 inside the configured min/max range and equals the distance outside that range."
@@ -322,17 +319,16 @@ def _write_trait_deviation_view(
     current_row = start_row + 3
     overall_deviations = {key: 0.0 for key in ordered_traits}
 
-    for round_number in rounds:
+    for round_number, round_rows in deviations.groupby("Round", sort=False):
         worksheet.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=max_col)
         round_title_cell = worksheet.cell(row=current_row, column=1)
-        _copy_cell_format(dark_header_template, round_title_cell)
+        _format_cell(styles, dark_header_template, round_title_cell)
         round_title_cell.value = f"Round {round_number}"
         current_row += 1
 
         table_header_cell = worksheet.cell(row=current_row, column=1)
-        _copy_cell_format(light_header_template, table_header_cell)
+        _format_cell(styles, light_header_template, table_header_cell, border=outlined_border)
         table_header_cell.value = "Table"
-        table_header_cell.border = outlined_border
         worksheet.merge_cells(start_row=current_row, start_column=1, end_row=current_row + 1, end_column=1)
 
         for trait_idx, key in enumerate(ordered_traits):
@@ -346,61 +342,36 @@ def _write_trait_deviation_view(
                 end_column=deviation_col,
             )
             trait_header_cell = worksheet.cell(row=current_row, column=count_col)
-            _copy_cell_format(light_header_template, trait_header_cell)
+            _format_cell(styles, light_header_template, trait_header_cell, border=outlined_border)
             trait_header_cell.value = f"{key[0]}: {key[1]}"
-            trait_header_cell.border = outlined_border
 
             count_header_cell = worksheet.cell(row=current_row + 1, column=count_col)
-            _copy_cell_format(light_header_template, count_header_cell)
+            _format_cell(styles, light_header_template, count_header_cell, border=outlined_border)
             count_header_cell.value = "Count"
-            count_header_cell.border = outlined_border
 
             deviation_header_cell = worksheet.cell(row=current_row + 1, column=deviation_col)
-            _copy_cell_format(light_header_template, deviation_header_cell)
+            _format_cell(styles, light_header_template, deviation_header_cell, border=outlined_border)
             deviation_header_cell.value = "Deviation"
-            deviation_header_cell.border = outlined_border
 
         current_row += 2
-        round_df = schedule_results[schedule_results["Round"] == round_number]
-        tables = sorted(round_df["Table"].dropna().astype(int).unique().tolist())
         round_deviations = {key: 0.0 for key in ordered_traits}
 
-        for table_number in tables:
+        for table_number, table_rows in round_rows.groupby("Table", sort=False):
             table_label_cell = worksheet.cell(row=current_row, column=1)
-            _copy_cell_format(body_label_template, table_label_cell)
+            _format_cell(styles, body_label_template, table_label_cell, border=outlined_border)
             table_label_cell.value = f"Table {table_number}"
-            table_label_cell.border = outlined_border
-
-            table_rows = schedule_results[
-                (schedule_results["Round"] == round_number) & (schedule_results["Table"] == table_number)
-            ]
-            person_indices = table_rows["Person_Index"].astype(int).tolist()
-            table_df = participant_results.iloc[person_indices] if person_indices else participant_results.iloc[0:0]
 
-            for trait_idx, key in enumerate(ordered_traits):
+            table_values = zip(ordered_traits, table_rows["Count"].tolist(), table_rows["Deviation"].tolist())
+            for trait_idx, (key, actual_count, deviation) in enumerate(table_values):
                 count_col = 2 + (trait_idx * 2)
                 deviation_col = count_col + 1
-                characteristic, trait = key
-                if characteristic in table_df.columns:
-                    actual_count = int(table_df[characteristic].astype(str).str.strip().eq(trait).sum())
-                else:
-                    actual_count = 0
-                deviation = _trait_deviation(
-                    actual_count,
-                    key,
-                    trait_targets,
-                    trait_max_allowed,
-                    trait_min_required,
-                )
                 count_cell = worksheet.cell(row=current_row, column=count_col)
-                _copy_cell_format(body_value_template, count_cell)
+                _format_cell(styles, body_value_template, count_cell, border=outlined_border)
                 count_cell.value = actual_count
-                count_cell.border = outlined_border
 
                 deviation_cell = worksheet.cell(row=current_row, column=deviation_col)
-                _copy_cell_format(body_value_template, deviation_cell)
+                _format_cell(styles, body_value_template, deviation_cell, border=outlined_border)
                 deviation_cell.value = round(float(deviation), 4)
-                deviation_cell.border = outlined_border
 
                 round_deviations[key] += float(deviation)
                 overall_deviations[key] += float(deviation)
@@ -408,84 +379,203 @@ def _write_trait_deviation_view(
             current_row += 1
 
         total_label_cell = worksheet.cell(row=current_row, column=1)
-        _copy_cell_format(total_label_template, total_label_cell)
+        _format_cell(styles, total_label_template, total_label_cell, border=outlined_border)
         total_label_cell.value = f"Total Dev. in R{round_number}"
-        total_label_cell.border = outlined_border
 
         for trait_idx, key in enumerate(ordered_traits):
             count_col = 2 + (trait_idx * 2)
             deviation_col = count_col + 1
 
             total_count_cell = worksheet.cell(row=current_row, column=count_col)
-            _copy_cell_format(total_value_template, total_count_cell)
+            _format_cell(styles, total_value_template, total_count_cell, border=outlined_border)
             total_count_cell.value = None
-            total_count_cell.border = outlined_border
 
             total_deviation_cell = worksheet.cell(row=current_row, column=deviation_col)
-            _copy_cell_format(total_value_template, total_deviation_cell)
+            _format_cell(styles, total_value_template, total_deviation_cell, border=outlined_border)
             total_deviation_cell.value = round(round_deviations[key], 4)
-            total_deviation_cell.border = outlined_border
 
         current_row += 2
 
     total_deviation_all_traits = sum(overall_deviations.values())
     worksheet.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=4)
     summary_title_cell = worksheet.cell(row=current_row, column=1)
-    _copy_cell_format(dark_header_template, summary_title_cell)
+    _format_cell(styles, dark_header_template, summary_title_cell)
     summary_title_cell.value = "Overall trait deviation summary"
     current_row += 1
 
     summary_headers = ["Trait", "Total Deviation", "Share of Total", "Goal"]
     for col_idx, header_text in enumerate(summary_headers, start=1):
         header_cell = worksheet.cell(row=current_row, column=col_idx)
-        _copy_cell_format(light_header_template, header_cell)
+        _format_cell(styles, light_header_template, header_cell, border=outlined_border)
         header_cell.value = header_text
-        header_cell.border = outlined_border
     current_row += 1
 
     for key in ordered_traits:
         overall_dev = float(overall_deviations[key])
         share = 0.0 if total_deviation_all_traits == 0 else overall_dev / total_deviation_all_traits
         label_cell = worksheet.cell(row=current_row, column=1)
-        _copy_cell_format(body_label_template, label_cell)
+        _format_cell(styles, body_label_template, label_cell, border=outlined_border)
         label_cell.value = f"{key[0]}: {key[1]}"
-        label_cell.border = outlined_border
 
         deviation_total_cell = worksheet.cell(row=current_row, column=2)
-        _copy_cell_format(body_value_template, deviation_total_cell)
+        _format_cell(styles, body_value_template, deviation_total_cell, border=outlined_border)
         deviation_total_cell.value = round(overall_dev, 4)
-        deviation_total_cell.border = outlined_border
 
         share_cell = worksheet.cell(row=current_row, column=3)
-        _copy_cell_format(body_value_template, share_cell)
+        _format_cell(styles, body_value_template, share_cell, number_format="0.0%", border=outlined_border)
         share_cell.value = share
-        share_cell.number_format = "0.0%"
-        share_cell.border = outlined_border
 
         goal_cell = worksheet.cell(row=current_row, column=4)
-        _copy_cell_format(body_value_template, goal_cell)
+        _format_cell(styles, body_value_template, goal_cell, border=outlined_border)
         goal_cell.value = _trait_goal_text(
             key,
             trait_targets,
             trait_max_allowed,
             trait_min_required,
         )
-        goal_cell.border = outlined_border
 
         current_row += 1
 
 
-def _build_output_workbook(
-    display_schedule,
-    total_balance_std_dev: float,
-    participant_results,
-    schedule_results,
+# Trait counts and deviations of every table: one row per round, table and trait (in ordered_traits order), rounds
+# and tables ascending. The Excel trait view and the data exports are both written from it.
+def _trait_deviation_table(
+    scores: dict,
+    scoring_params: dict,
+    ordered_traits: list[tuple[str, str]],
+    trait_max_allowed: dict,
+    trait_min_required: dict,
+) -> pd.DataFrame:
+    columns = ["Round", "Table", "Characteristic", "Trait", "Count", "Deviation"]
+    round_idx, table_idx = np.nonzero(scores["sizes"] > 0)
+    if not ordered_traits or len(round_idx) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Traits the solver has no column for (e.g. configured but held by nobody) count 0 everywhere.
+    trait_position = {key: c for c, key in enumerate(scoring_params["trait_keys"])}
+    positions = np.array([trait_position.get(key, -1) for key in ordered_traits], dtype=np.int64)
+    counts = scores["trait_counts"][round_idx, table_idx][:, positions].astype(np.int64)
+    counts[:, positions < 0] = 0
+    deviations = scoring.bound_deviations(
+        counts.astype(np.float64),
+        _trait_bounds(ordered_traits, trait_min_required),
+        _trait_bounds(ordered_traits, trait_max_allowed),
+    )
+
+    num_traits = len(ordered_traits)
+    return pd.DataFrame(
+        {
+            "Round": np.repeat(round_idx + 1, num_traits),
+            "Table": np.repeat(table_idx + 1, num_traits),
+            "Characteristic": [key[0] for key in ordered_traits] * len(round_idx),
+            "Trait": [key[1] for key in ordered_traits] * len(round_idx),
+            "Count": counts.ravel(),
+            "Deviation": deviations.ravel(),
+        },
+        columns=columns,
+    )
+
+
+# Seating in long form: one row per round, table and participant with the participant's name and traits.
+def _schedule_table(participant_results, schedule_results, characteristics: list[str]) -> pd.DataFrame:
+    detail_cols = [col for col in ["Name", *characteristics] if col in participant_results.columns]
+    if schedule_results.empty:
+        return pd.DataFrame(columns=["Round", "Table", "Participant_ID", *detail_cols])
+
+    people = participant_results.iloc[schedule_results["Person_Index"].astype(int).to_numpy()]
+    table = pd.DataFrame(
+        {
+            "Round": schedule_results["Round"].astype(int).to_numpy(),
+            "Table": schedule_results["Table"].astype(int).to_numpy(),
+            "Participant_ID": schedule_results["Participant_ID"].to_numpy(),
+        }
+    )
+    for col in detail_cols:
+        table[col] = people[col].to_numpy()
+    return table
+
+
+# Everything the page and its exports are built from: the solved frames, the event settings, the scoring
+# parameters and table scores, and the participant-by-round display_schedule. Also used by batch_solve to write
+# output workbooks outside the app.
+def _export_inputs(
+    participant_results: pd.DataFrame,
+    schedule_results: pd.DataFrame,
     event_setup: dict,
     characteristics: list[str],
     trait_targets: dict,
     trait_max_allowed: dict,
     trait_min_required: dict,
-):
+) -> dict:
+    scoring_params = _scoring_parameters(
+        participant_results,
+        characteristics,
+        trait_targets,
+        trait_max_allowed,
+        trait_min_required,
+    )
+
+    round_count = int(event_setup.get("number_of_rounds", 3))
+    participant_label_col = "Name" if "Name" in participant_results.columns else "Participant_ID"
+    round_table_cols = [f"Round_{r}_Table" for r in range(1, round_count + 1)]
+    schedule_cols = [participant_label_col, *round_table_cols]
+    available_schedule_cols = [col for col in schedule_cols if col in participant_results.columns]
+
+    sort_cols = [col for col in round_table_cols if col in participant_results.columns]
+    if participant_label_col in participant_results.columns:
+        sort_cols.append(participant_label_col)
+
+    if sort_cols:
+        display_schedule = participant_results.sort_values(sort_cols)[available_schedule_cols].reset_index(drop=True)
+    else:
+        display_schedule = participant_results[available_schedule_cols].reset_index(drop=True)
+
+    if participant_label_col == "Name":
+        display_schedule = display_schedule.rename(columns={"Name": "Participant_Name"})
+
+    return {
+        "participant_results": participant_results,
+        "schedule_results": schedule_results,
+        "display_schedule": display_schedule,
+        "scoring_params": scoring_params,
+        "scores": _schedule_scores(schedule_results, scoring_params, characteristics),
+        "event_setup": event_setup,
+        "characteristics": characteristics,
+        "trait_targets": trait_targets,
+        "trait_max_allowed": trait_max_allowed,
+        "trait_min_required": trait_min_required,
+    }
+
+
+# The tables every export is written from, built once per schedule (see _export_bytes). inputs holds the solved
+# frames, the page's display_schedule, scoring parameters and table scores, and the event's characteristics and
+# trait settings.
+def _export_tables(inputs: dict) -> dict:
+    ordered_traits = _ordered_trait_keys(
+        inputs["participant_results"],
+        inputs["characteristics"],
+        inputs["trait_targets"],
+        inputs["trait_max_allowed"],
+        inputs["trait_min_required"],
+    )
+    return {
+        "assignments": inputs["display_schedule"],
+        "schedule": _schedule_table(
+            inputs["participant_results"], inputs["schedule_results"], inputs["characteristics"]
+        ),
+        "traits": ordered_traits,
+        "trait_deviations": _trait_deviation_table(
+            inputs["scores"],
+            inputs["scoring_params"],
+            ordered_traits,
+            inputs["trait_max_allowed"],
+            inputs["trait_min_required"],
+        ),
+        "total_balance_std_dev": _calculate_total_balance_std_dev(inputs["scores"], inputs["characteristics"]),
+    }
+
+
+def _build_output_workbook(tables: dict, inputs: dict) -> bytes:
     template_path = _get_output_template_path()
     if template_path is None:
         raise FileNotFoundError(
@@ -493,11 +583,13 @@ def _build_output_workbook(
         )
 
     workbook = load_workbook(template_path)
-    _write_current_assignments_view(workbook, display_schedule, event_setup)
+    styles = {}
+    _write_current_assignments_view(workbook, tables["assignments"], inputs["event_setup"], styles)
 
     if "Total Balance Score" not in workbook.sheetnames:
         raise ValueError("Output template is missing the 'Total Balance Score' sheet.")
 
+    total_balance_std_dev = tables["total_balance_std_dev"]
     score_sheet = workbook["Total Balance Score"]
     value_row = _find_row_by_first_cell(score_sheet, "Value")
     status_row = _find_row_by_first_cell(score_sheet, "Status")
@@ -509,18 +601,167 @@ def _build_output_workbook(
 
     _write_trait_deviation_view(
         workbook,
-        participant_results,
-        schedule_results,
-        characteristics,
-        trait_targets,
-        trait_max_allowed,
-        trait_min_required,
+        tables["trait_deviations"],
+        tables["traits"],
+        inputs["trait_targets"],
+        inputs["trait_max_allowed"],
+        inputs["trait_min_required"],
+        styles,
     )
 
     output = BytesIO()
     workbook.save(output)
     output.seek(0)
-    return output.getvalue(), OUTPUT_DOWNLOAD_NAME
+    return output.getvalue()
+
+
+# A zip archive with one CSV of the seating per round.
+def _build_round_csv_archive(tables: dict, inputs: dict) -> bytes:
+    output = BytesIO()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for round_number, round_rows in tables["schedule"].groupby("Round"):
+            archive.writestr(f"round_{round_number}.csv", round_rows.drop(columns="Round").to_csv(index=False))
+    return output.getvalue()
+
+
+def _build_schedule_parquet(tables: dict, inputs: dict) -> bytes:
+    output = BytesIO()
+    tables["schedule"].to_parquet(output, index=False)
+    return output.getvalue()
+
+
+def _build_schedule_json(tables: dict, inputs: dict) -> bytes:
+    document = {
+        "event_setup": inputs["event_setup"],
+        "total_balance_std_dev": tables["total_balance_std_dev"],
+        "schedule": tables["schedule"].to_dict(orient="records"),
+        "trait_deviations": tables["trait_deviations"].to_dict(orient="records"),
+    }
+    return json.dumps(document, indent=2, default=str).encode("utf-8")
+
+
+# Download formats offered on the page: button label, file name, MIME type and builder.
+_EXPORT_FORMATS = {
+    "excel": (
+        "Download Group Assignments (Excel)",
+        OUTPUT_DOWNLOAD_NAME,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        _build_output_workbook,
+    ),
+    "csv": ("Download CSV per Round", "Model_Output_Rounds.zip", "application/zip", _build_round_csv_archive),
+    "parquet": (
+        "Download Parquet",
+        "Model_Output_Schedule.parquet",
+        "application/octet-stream",
+        _build_schedule_parquet,
+    ),
+    "json": ("Download JSON", "Model_Output.json", "application/json", _build_schedule_json),
+}
+
+# Exports are built only when a download is requested and cached by the schedule's content hash (see _schedule_key),
+# so reruns of the page do no export work and a second download of the same schedule is served from memory. The
+# export tables are cached the same way and shared by every format. Both caches are small LRUs shared by all sessions;
+# downloads are built on Streamlit's download thread, hence the lock.
+_EXPORT_TABLES: OrderedDict[str, dict] = OrderedDict()
+_EXPORTS: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+_EXPORT_CACHE_LOCK = threading.Lock()
+_EXPORT_TABLES_MAX_ENTRIES = 4
+_EXPORTS_MAX_ENTRIES = 16
+
+
+# Content hash of everything an export is written from.
+def _schedule_key(inputs: dict) -> str:
+    digest = hashlib.sha256()
+    for name in ("participant_results", "schedule_results", "display_schedule"):
+        frame = inputs[name]
+        digest.update(json.dumps([list(map(str, frame.columns)), list(map(str, frame.dtypes))]).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    settings = [
+        inputs["event_setup"],
+        list(inputs["characteristics"]),
+        *(
+            sorted([list(key), value] for key, value in inputs[name].items())
+            for name in ("trait_targets", "trait_max_allowed", "trait_min_required")
+        ),
+    ]
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _cache_lookup(cache: OrderedDict, key):
+    with _EXPORT_CACHE_LOCK:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _cache_insert(cache: OrderedDict, key, value, max_entries: int) -> None:
+    with _EXPORT_CACHE_LOCK:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+
+# The bytes of one export format for the schedule whose _schedule_key is key, built on first request.
+def _export_bytes(key: str, export_format: str, inputs: dict) -> bytes:
+    data = _cache_lookup(_EXPORTS, (key, export_format))
+    if data is not None:
+        return data
+    tables = _cache_lookup(_EXPORT_TABLES, key)
+    if tables is None:
+        tables = _export_tables(inputs)
+        _cache_insert(_EXPORT_TABLES, key, tables, _EXPORT_TABLES_MAX_ENTRIES)
+    build = _EXPORT_FORMATS[export_format][3]
+    data = build(tables, inputs)
+    _cache_insert(_EXPORTS, (key, export_format), data, _EXPORTS_MAX_ENTRIES)
+    return data
+
+
+# Solver details of the run that produced the schedule (see solver_backend._SolveStats): the bound history as a
+# convergence chart, phase timings, model size per constraint family and the captured HiGHS log. Cached results and
+# methods without a MIP have no bound history, so only what the run recorded is shown.
+def _render_solve_stats(stats: dict | None) -> None:
+    if not stats or not stats.get("timings"):
+        return
+    with st.expander("Solver Details"):
+        convergence_tab, timings_tab, model_tab, log_tab = st.tabs(["Convergence", "Timings", "Model", "Log"])
+        with convergence_tab:
+            progress = pd.DataFrame(stats["progress"])
+            if len(progress) > 1:
+                bounds = progress.set_index("elapsed_seconds")[["primal_bound", "dual_bound"]]
+                bounds.columns = ["Best schedule", "Lower bound"]
+                st.line_chart(bounds, x_label="Seconds", y_label="Objective")
+                final_gap = progress["gap"].dropna()
+                if not final_gap.empty:
+                    st.caption(f"Final optimality gap: {final_gap.iloc[-1]:.1%}")
+            else:
+                st.caption("This run recorded no bound history.")
+        with timings_tab:
+            timings = pd.DataFrame({"Phase": list(stats["timings"]), "Seconds": list(stats["timings"].values())})
+            st.dataframe(timings, hide_index=True)
+        with model_tab:
+            model = stats.get("model")
+            if model is None:
+                st.caption("This run solved no whole-event model.")
+            else:
+                st.caption(f"{model['rows']:,} rows, {model['columns']:,} columns, {model['nonzeros']:,} nonzeros.")
+                families = pd.DataFrame.from_dict(model["row_families"], orient="index").rename_axis("Constraints")
+                st.dataframe(families.reset_index(), hide_index=True)
+                if model.get("presolve"):
+                    reductions = pd.DataFrame(
+                        {
+                            "Presolve reduction": [name.replace("_", " ").capitalize() for name in model["presolve"]],
+                            "Count": list(model["presolve"].values()),
+                        }
+                    )
+                    st.dataframe(reductions, hide_index=True)
+        with log_tab:
+            if stats.get("highs_log"):
+                st.code("\n".join(stats["highs_log"]), language=None)
+            else:
+                st.caption("This run produced no HiGHS log.")
 
 
 # Step 4: Results page showing the generated group assignments, diversity scores, and allowing users to download the results as CSV.
@@ -565,76 +806,59 @@ def render(go_to) -> None:
         st.error("No grouping results found. Go back and click Generate Groupings.")
         st.stop()
 
-    total_balance_std_dev = _calculate_total_balance_std_dev(schedule_results, participant_results, diversity_cols)
-
-    round_count = int(event_setup.get("number_of_rounds", 3))
-    participant_label_col = "Name" if "Name" in participant_results.columns else "Participant_ID"
-    round_table_cols = [f"Round_{r}_Table" for r in range(1, round_count + 1)]
-    schedule_cols = [participant_label_col, *round_table_cols]
-    available_schedule_cols = [col for col in schedule_cols if col in participant_results.columns]
-
-    sort_cols = [col for col in round_table_cols if col in participant_results.columns]
-    if participant_label_col in participant_results.columns:
-        sort_cols.append(participant_label_col)
-
-    if sort_cols:
-        display_schedule = participant_results.sort_values(sort_cols)[available_schedule_cols].reset_index(drop=True)
-    else:
-        display_schedule = participant_results[available_schedule_cols].reset_index(drop=True)
-
-    if participant_label_col == "Name":
-        display_schedule = display_schedule.rename(columns={"Name": "Participant_Name"})
-
-    try:
-        workbook_bytes, workbook_name = _build_output_workbook(
-            display_schedule,
-            total_balance_std_dev,
-            participant_results,
-            schedule_results,
-            event_setup,
-            diversity_cols,
-            trait_targets,
-            trait_max_allowed,
-            trait_min_required,
-        )
-    except Exception as exc:
-        st.error(f"Could not build Excel output: {exc}")
-        workbook_bytes = None
-        workbook_name = None
-
-    if workbook_bytes is not None:
-        download_col, info_col = st.columns([1.2, 1])
-        with download_col:
+    export_inputs = _export_inputs(
+        participant_results,
+        schedule_results,
+        event_setup,
+        diversity_cols,
+        trait_targets,
+        trait_max_allowed,
+        trait_min_required,
+    )
+    scores = export_inputs["scores"]
+
+    # Exports are only built when a download button is clicked (on Streamlit's download thread) and then cached.
+    export_key = _schedule_key(export_inputs)
+    export_formats = list(_EXPORT_FORMATS)
+    if _get_output_template_path() is None:
+        st.error("Could not build Excel output: the packaged output template is missing from the repo.")
+        export_formats.remove("excel")
+
+    download_col, info_col = st.columns([1.2, 1])
+    with download_col:
+        for export_format in export_formats:
+            label, file_name, mime, _ = _EXPORT_FORMATS[export_format]
             st.download_button(
-                "Download Group Assignments (Excel)",
-                data=workbook_bytes,
-                file_name=workbook_name,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                label,
+                data=partial(_export_bytes, export_key, export_format, export_inputs),
+                file_name=file_name,
+                mime=mime,
+                on_click="ignore",
+                key=f"download_{export_format}",
             )
-        with info_col:
-            st.info("Download the Excel file to see a detailed summary of group assignments.")
+    with info_col:
+        st.info("Download the Excel file to see a detailed summary of group assignments.")
+    _render_solve_stats(st.session_state.get("solve_stats"))
 
+    names = participant_results["Name"].map(_clean_text).tolist() if "Name" in participant_results.columns else None
+    members = schedule_results.groupby(["Round", "Table"], sort=False)["Person_Index"].agg(list)
     all_rounds = sorted(schedule_results["Round"].unique().tolist())
     for round_number in all_rounds:
         st.subheader(f"Round {round_number}")
-        round_df = schedule_results[schedule_results["Round"] == round_number]
-        table_numbers = sorted(round_df["Table"].unique().tolist())
+        round_members = members.loc[round_number]
+        table_numbers = sorted(round_members.index.tolist())
         cols = st.columns(max(1, min(3, len(table_numbers))))
 
         for idx, table_number in enumerate(table_numbers):
-            table_rows = round_df[round_df["Table"] == table_number]
-            person_indices = table_rows["Person_Index"].astype(int).tolist()
-            table_df = participant_results.iloc[person_indices]
-            score = table_diversity_score(table_df, diversity_cols)
+            score = int(scores["diversity"][round_number - 1, table_number - 1])
 
             with cols[idx % len(cols)]:
                 with st.container(border=True):
                     st.markdown(f"**Table {table_number}**")
                     st.caption(f"Diversity score: {score}")
-                    for _, person_row in table_df.iterrows():
-                        person_name = _clean_text(person_row.get("Name", ""))
-                        if person_name:
-                            st.write(f"- {person_name}")
+                    for person_index in round_members.loc[table_number] if names is not None else []:
+                        if names[int(person_index)]:
+                            st.write(f"- {names[int(person_index)]}")
 
     left, right = st.columns(2)
     with left: